@@ -1,11 +1,77 @@
-from flask import Flask, render_template, jsonify, request, session
+from flask import Flask, render_template, jsonify, request, session, Response, send_from_directory, make_response
 from datetime import datetime
+import os
+import atexit
+import threading
+from cart_store import create_cart_store, make_item_key, add_line, set_line_quantity
+from menu_catalog import MenuCatalog
+from image_manifest import load_manifest, apply_to_menu, THUMBS_DIR, MANIFEST_PATH
+from transaction_writer import TransactionWriter, QueueFull
+from transaction_id import new_transaction_id
+from metrics import Metrics
+from query_profiler import install_from_env as install_query_profiler
+from idempotency import create_idempotency_store, RequestInProgress
 
 app = Flask(__name__)
 app.secret_key = 'kedai-hauna-secret-key-2024'
 
+# Backend keranjang: memory (dev), sqlite atau mysql (multi-worker)
+app.config['CART_BACKEND'] = os.environ.get('KEDAI_CART_BACKEND', 'memory')
+app.config['CART_DB_PATH'] = os.environ.get('KEDAI_CART_DB', 'carts.db')
+# Keranjang yang tidak diubah selama ini (detik) dianggap ditinggal dan dihapus
+app.config['CART_TTL'] = int(os.environ.get('KEDAI_CART_TTL', 24 * 3600))
+cart_store = create_cart_store(app.config['CART_BACKEND'], path=app.config['CART_DB_PATH'],
+                               ttl=app.config['CART_TTL'])
+
+def connect_db():
+    """Buka koneksi database baru (KEDAI_DB_BACKEND), None jika tidak tersedia"""
+    from db_config import create_database
+    db = create_database()
+    return db if db.connect() else None
+
+# Transaksi checkout disimpan ke database lewat write-behind queue
+checkout_writer = TransactionWriter(
+    connect_db,
+    journal_path=os.environ.get('KEDAI_CHECKOUT_JOURNAL', 'checkout_journal.jsonl')
+)
+checkout_writer.start()
+atexit.register(checkout_writer.stop)
+
+# Database untuk membaca riwayat transaksi, dibuka saat pertama dipakai
+history_db = None
+history_db_lock = threading.Lock()
+
+def get_history_db():
+    """Return the shared read database, or None if MySQL is unavailable"""
+    global history_db
+    with history_db_lock:
+        if history_db is None:
+            history_db = connect_db()
+        return history_db
+
+# Response checkout per Idempotency-Key, supaya retry tidak membuat transaksi ganda.
+# Key disimpan sebagai "<cart_id>:<key>" (kolom VARCHAR(100), cart_id 32 karakter)
+IDEMPOTENCY_KEY_MAX_LENGTH = 64
+app.config['IDEMPOTENCY_BACKEND'] = os.environ.get('KEDAI_IDEMPOTENCY_BACKEND', 'sqlite')
+idempotency_store = create_idempotency_store(
+    app.config['IDEMPOTENCY_BACKEND'],
+    path=os.environ.get('KEDAI_IDEMPOTENCY_DB', 'idempotency.db')
+)
+
+# Instrumentasi per route, diekspos di /metrics
+metrics = Metrics()
+metrics.init_app(app)
+metrics.add_collector("kedai_checkout_writer", "Statistik write-behind checkout", checkout_writer.metrics)
+metrics.add_collector("kedai_db_pool", "Statistik connection pool database", checkout_writer.pool_stats)
+
+# Profil query per statement + log query lambat, aktif jika KEDAI_QUERY_PROFILE diisi
+query_profiler = install_query_profiler()
+
+# Thumbnail hasil build_images.py (kosong jika belum di-build, pakai gambar asli)
+image_manifest = load_manifest(os.path.join(app.root_path, MANIFEST_PATH))
+
 # Data menu makanan
-menu_items = [
+menu_catalog = MenuCatalog(apply_to_menu([
     {"id": 1, "name": "Bakso Malang", "price": 23000, "image": "/static/images/Bakso malang.jpg"},
     {"id": 2, "name": "Seblak Special", "price": 16000, "image": "/static/images/Seblak special.jpg"},
     {"id": 3, "name": "Mie Ayam", "price": 18000, "image": "/static/images/Mie Ayam.jpg"},
@@ -13,22 +79,55 @@ menu_items = [
     {"id": 5, "name": "Tea", "price": 6000, "image": "/static/images/Tea.jpg", "has_variant": True, "variants": ["Dingin", "Hangat"]},
     {"id": 6, "name": "Ayam Crispy", "price": 17000, "image": "/static/images/Ayam Crispy.jpg"},
     {"id": 7, "name": "Nasi", "price": 5000, "image": "/static/images/Nasi.jpg"},
-]
+], image_manifest))
+
+def get_cart_id():
+    """Ambil cart_id dari session, buat baru jika belum ada"""
+    cart_id = session.get('cart_id')
+    if not cart_id:
+        cart_id = cart_store.new_cart_id()
+        session['cart_id'] = cart_id
+    return cart_id
+
+def get_item_key(data):
+    """Ambil item_key dari request, fallback ke id (+ variant) untuk klien lama"""
+    item_key = data.get('item_key')
+    if item_key is None:
+        item_key = make_item_key(data.get('id'), data.get('variant', ''))
+    return str(item_key)
+
+def cached_response(body, etag, mimetype):
+    """Kirim body dengan strong ETag, atau 304 jika klien sudah punya versi ini"""
+    if etag in request.if_none_match:
+        response = Response(status=304)
+    else:
+        response = Response(body, mimetype=mimetype)
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+@app.route('/thumbs/<path:filename>')
+def thumbnail(filename):
+    """Thumbnail bernama hash isi, jadi aman di-cache selamanya"""
+    response = send_from_directory(os.path.join(app.root_path, THUMBS_DIR), filename)
+    response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    return response
 
 @app.route('/')
 def index():
-    if 'cart' not in session:
-        session['cart'] = []
-    return render_template('index.html', menu_items=menu_items)
+    get_cart_id()
+    page, etag = menu_catalog.render_cached(
+        'index', lambda items: render_template('index.html', menu_items=items))
+    return cached_response(page, etag, 'text/html')
 
 @app.route('/api/menu')
 def get_menu():
-    return jsonify(menu_items)
+    return cached_response(menu_catalog.json_bytes, menu_catalog.etag, 'application/json')
 
 @app.route('/api/cart', methods=['GET'])
 def get_cart():
-    cart = session.get('cart', [])
-    return jsonify(cart)
+    cart = cart_store.load(get_cart_id())
+    return jsonify(list(cart.values()))
 
 @app.route('/api/cart/add', methods=['POST'])
 def add_to_cart():
@@ -37,96 +136,181 @@ def add_to_cart():
     variant = data.get('variant', '')
     
     # Cari item di menu
-    menu_item = next((item for item in menu_items if item['id'] == item_id), None)
+    menu_item = menu_catalog.get(item_id)
     if not menu_item:
         return jsonify({'error': 'Item tidak ditemukan'}), 404
     
-    # Ambil cart dari session
-    cart = session.get('cart', [])
-    
-    # Buat unique key untuk item dengan varian
-    item_key = f"{item_id}_{variant}" if variant else str(item_id)
-    
-    # Cek apakah item dengan varian yang sama sudah ada di cart
-    existing_item = next((item for item in cart if item.get('item_key') == item_key), None)
-    
-    if existing_item:
-        existing_item['quantity'] += 1
-    else:
-        item_name = f"{menu_item['name']} ({variant})" if variant else menu_item['name']
-        cart.append({
-            'id': menu_item['id'],
-            'item_key': item_key,
-            'name': item_name,
-            'price': menu_item['price'],
-            'image': menu_item['image'],
-            'quantity': 1,
-            'variant': variant
-        })
-    
-    session['cart'] = cart
-    return jsonify({'success': True, 'cart': cart})
+    try:
+        cart = cart_store.add_item(get_cart_id(), menu_item, variant)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({'success': True, 'cart': list(cart.values())})
 
 @app.route('/api/cart/update', methods=['POST'])
 def update_cart():
     data = request.json
-    item_id = data.get('id')
     quantity = data.get('quantity')
     
-    cart = session.get('cart', [])
-    item = next((item for item in cart if item['id'] == item_id), None)
-    
-    if item:
-        if quantity <= 0:
-            cart.remove(item)
-        else:
-            item['quantity'] = quantity
-    
-    session['cart'] = cart
-    return jsonify({'success': True, 'cart': cart})
+    cart = cart_store.update_item(get_cart_id(), get_item_key(data), quantity)
+    return jsonify({'success': True, 'cart': list(cart.values())})
 
 @app.route('/api/cart/remove', methods=['POST'])
 def remove_from_cart():
     data = request.json
-    item_id = data.get('id')
     
-    cart = session.get('cart', [])
-    cart = [item for item in cart if item['id'] != item_id]
+    cart = cart_store.remove_item(get_cart_id(), get_item_key(data))
+    return jsonify({'success': True, 'cart': list(cart.values())})
+
+def apply_cart_operation(items, operation):
+    """Terapkan satu operasi batch (add/update/remove/clear) ke dict cart"""
+    op = operation.get('op')
+    if op == 'add':
+        menu_item = menu_catalog.get(operation.get('id'))
+        if not menu_item:
+            raise LookupError('Item tidak ditemukan')
+        quantity = int(operation.get('quantity', 1))
+        if quantity > 0:
+            add_line(items, menu_item, operation.get('variant', ''), quantity)
+    elif op == 'update':
+        set_line_quantity(items, get_item_key(operation), int(operation.get('quantity', 0)))
+    elif op == 'remove':
+        items.pop(get_item_key(operation), None)
+    elif op == 'clear':
+        items.clear()
+    else:
+        raise ValueError(f'Operasi tidak dikenal: {op}')
+
+def batch_operations(data):
+    """Operation list from a /api/cart/batch body; raises ValueError if the shape is wrong"""
+    if data is None:
+        return []
+    if not isinstance(data, dict):
+        raise ValueError('Body harus berupa objek JSON')
+    operations = data.get('operations', [])
+    if not isinstance(operations, list):
+        raise ValueError("'operations' harus berupa list")
+    if not all(isinstance(operation, dict) for operation in operations):
+        raise ValueError('Setiap operasi harus berupa objek JSON')
+    return operations
+
+@app.route('/api/cart/batch', methods=['POST'])
+def batch_cart():
+    """Terapkan daftar operasi cart secara berurutan dan atomik (semua atau tidak sama sekali)"""
+    try:
+        operations = batch_operations(request.json)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     
-    session['cart'] = cart
-    return jsonify({'success': True, 'cart': cart})
+    def apply_all(items):
+        for operation in operations:
+            apply_cart_operation(items, operation)
+    
+    try:
+        cart = cart_store.mutate(get_cart_id(), apply_all)
+    except LookupError as e:
+        return jsonify({'error': str(e)}), 404
+    except (ValueError, TypeError) as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({'success': True, 'cart': list(cart.values())})
 
 @app.route('/api/cart/clear', methods=['POST'])
 def clear_cart():
-    session['cart'] = []
+    cart_store.delete(get_cart_id())
     return jsonify({'success': True})
 
-@app.route('/api/checkout', methods=['POST'])
-def checkout():
-    cart = session.get('cart', [])
-    data = request.json
+# Nilai yang diterima kolom transactions (lihat database.sql)
+PAYMENT_METHODS = ('cash', 'debit', 'credit', 'ewallet', 'qris', 'transfer')
+CUSTOMER_NAME_MAX = 100
+
+def build_transaction(cart, data):
+    """Hitung subtotal, pajak dan total lalu buat record transaksi.
+
+    Raises ValueError for an unknown payment method or invalid customer name,
+    so a checkout the database would reject never reaches the write-behind queue.
+    """
     payment_method = data.get('payment_method', 'cash')
-    
-    if not cart:
-        return jsonify({'error': 'Keranjang kosong'}), 400
+    if payment_method not in PAYMENT_METHODS:
+        raise ValueError(f"Metode pembayaran tidak dikenal: {payment_method}")
+    customer_name = data.get('customer_name') or 'Umum'
+    if not isinstance(customer_name, str) or len(customer_name) > CUSTOMER_NAME_MAX:
+        raise ValueError(f"Nama pelanggan harus teks maksimal {CUSTOMER_NAME_MAX} karakter")
     
     subtotal = sum(item['price'] * item['quantity'] for item in cart)
     tax = subtotal * 0.1
     total = subtotal + tax
     
-    # Simpan transaksi (dalam aplikasi nyata, simpan ke database)
-    transaction = {
-        'id': datetime.now().strftime('%Y%m%d%H%M%S'),
+    return {
+        'id': new_transaction_id(),
         'items': cart,
         'subtotal': subtotal,
         'tax': tax,
         'total': total,
         'payment_method': payment_method,
+        'customer_name': customer_name,
         'date': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
     }
+
+@app.route('/api/checkout', methods=['POST'])
+def checkout():
+    idempotency_key = request.headers.get('Idempotency-Key')
+    if not idempotency_key:
+        return process_checkout()
+    try:
+        idempotency_key = scoped_idempotency_key(get_cart_id(), idempotency_key)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    # Retry dengan key yang sama: kirim ulang response yang tersimpan
+    try:
+        stored = idempotency_store.begin(idempotency_key)
+    except RequestInProgress:
+        return jsonify({'error': 'Checkout dengan key ini sedang diproses'}), 409
+    if stored:
+        status, body = stored
+        response = Response(body, status=status, mimetype='application/json')
+        response.headers['Idempotent-Replayed'] = 'true'
+        return response
+    
+    try:
+        response = process_checkout()
+    except Exception:
+        idempotency_store.release(idempotency_key)
+        raise
+    
+    # Hanya response sukses yang disimpan; error boleh dicoba lagi
+    if response.status_code == 200:
+        idempotency_store.complete(idempotency_key, 200, response.get_data())
+    else:
+        idempotency_store.release(idempotency_key)
+    return response
+
+def scoped_idempotency_key(cart_id, key):
+    """Store key for an Idempotency-Key: per cart, so another session never gets this response"""
+    if len(key) > IDEMPOTENCY_KEY_MAX_LENGTH:
+        raise ValueError(f'Idempotency-Key maksimal {IDEMPOTENCY_KEY_MAX_LENGTH} karakter')
+    return f"{cart_id}:{key}"
+
+def process_checkout():
+    cart_id = get_cart_id()
+    cart = list(cart_store.load(cart_id).values())
+    data = request.json or {}
+    
+    if not cart:
+        return make_response(jsonify({'error': 'Keranjang kosong'}), 400)
+    
+    try:
+        transaction = build_transaction(cart, data)
+    except ValueError as e:
+        return make_response(jsonify({'error': str(e)}), 400)
+    
+    # Simpan transaksi: masuk journal lokal dulu, ke database di background
+    try:
+        checkout_writer.submit(transaction)
+    except QueueFull:
+        return make_response(jsonify({'error': 'Server sedang sibuk, silakan coba lagi'}), 503)
     
     # Clear cart setelah checkout
-    session['cart'] = []
+    cart_store.delete(cart_id)
     
     return jsonify({
         'success': True,
@@ -134,5 +318,92 @@ def checkout():
         'message': 'Pembayaran berhasil!'
     })
 
+@app.route('/api/checkout/metrics')
+def checkout_metrics():
+    return jsonify(checkout_writer.metrics())
+
+@app.route('/api/stats')
+def transaction_stats():
+    from db_config import get_transaction_stats
+    
+    db = get_history_db()
+    if db is None:
+        return jsonify({'error': 'Database tidak tersedia'}), 503
+    stats = get_transaction_stats(db)
+    if stats is None:
+        return jsonify({'error': 'Gagal membaca statistik'}), 503
+    return jsonify(stats_json(stats))
+
+def stats_json(stats):
+    """Stats as JSON numbers: the transaction count stays an int"""
+    return {k: int(v) if k == 'total_transactions' else float(v) for k, v in stats.items()}
+
+def history_args(args):
+    """(limit, cursor, filters) from the /api/transactions query string; raises ValueError"""
+    limit = min(max(int(args.get('limit', 50)), 1), 200)
+    filters = {
+        'date_from': args.get('from') or None,
+        'date_to': args.get('to') or None,
+        'payment_method': args.get('payment_method') or None,
+    }
+    for key in ('date_from', 'date_to'):
+        if filters[key]:
+            datetime.strptime(filters[key], '%Y-%m-%d')
+    return limit, args.get('cursor') or None, filters
+
+def history_json(transactions, next_cursor):
+    for trans in transactions:
+        trans['total'] = float(trans['total'])
+        for item in trans['items']:
+            item['price'] = float(item['price'])
+    return {'transactions': transactions, 'next_cursor': next_cursor}
+
+def summary_args(args):
+    """(date_from, date_to) from the /api/reports/summary query string; raises ValueError"""
+    date_from = args.get('from') or None
+    date_to = args.get('to') or None
+    for value in (date_from, date_to):
+        if value:
+            datetime.strptime(value, '%Y-%m-%d')
+    return date_from, date_to
+
+def summary_json(summary):
+    for rows in summary.values():
+        for row in rows:
+            for key, convert in (('transactions', int), ('quantity', int), ('total', float), ('revenue', float)):
+                if key in row:
+                    row[key] = convert(row[key])
+    return summary
+
+@app.route('/api/transactions')
+def list_transactions():
+    """Riwayat transaksi per halaman (terbaru dulu), lanjutkan dengan ?cursor=next_cursor"""
+    from db_config import get_transactions_page
+    
+    try:
+        limit, cursor, filters = history_args(request.args)
+        db = get_history_db()
+        if db is None:
+            return jsonify({'error': 'Database tidak tersedia'}), 503
+        transactions, next_cursor = get_transactions_page(db, limit, cursor, **filters)
+    except ValueError as e:
+        return jsonify({'error': f'Parameter tidak valid: {e}'}), 400
+    return jsonify(history_json(transactions, next_cursor))
+
+@app.route('/api/reports/summary')
+def sales_summary():
+    """Penjualan per tanggal, metode pembayaran dan item (dari tabel ringkasan harian)"""
+    from db_config import get_sales_summary
+    
+    try:
+        date_from, date_to = summary_args(request.args)
+    except ValueError as e:
+        return jsonify({'error': f'Parameter tidak valid: {e}'}), 400
+    
+    db = get_history_db()
+    if db is None:
+        return jsonify({'error': 'Database tidak tersedia'}), 503
+    return jsonify(summary_json(get_sales_summary(db, date_from, date_to)))
+
 if __name__ == '__main__':
     app.run(debug=True, port=5001)
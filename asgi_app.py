@@ -0,0 +1,264 @@
+# Mode ASGI (async) untuk web API Kedai Hauna
+# Route sama dengan app.py, tapi dilayani oleh Quart sehingga query database
+# yang lambat tidak memblok thread worker.
+#
+#   hypercorn asgi_app:app --bind 0.0.0.0:5001
+
+import asyncio
+import os
+
+from quart import (Quart, render_template, jsonify, request, session, Response,
+                   send_from_directory, make_response)
+
+import app as wsgi
+from app import (cart_store, menu_catalog, checkout_writer, idempotency_store,
+                 apply_cart_operation, batch_operations, build_transaction, get_item_key,
+                 scoped_idempotency_key, history_args, history_json, summary_args, summary_json,
+                 stats_json)
+from async_db import create_async_database, get_transaction_stats, get_transactions_page, get_sales_summary
+from cart_store import MemoryCartStore
+from image_manifest import THUMBS_DIR
+from transaction_writer import QueueFull
+from idempotency import RequestInProgress
+
+app = Quart(__name__)
+app.secret_key = wsgi.app.secret_key
+app.config.update(wsgi.app.config)
+
+# KEDAI_DB_BACKEND sama dengan app.py: aiomysql untuk MySQL, SQLite lewat thread pool
+db = create_async_database()
+
+# Metrics yang sama dengan app.py (collector writer/pool ikut), route /metrics
+wsgi.metrics.init_quart_app(app)
+
+
+# Cart di memory cukup cepat, backend lain (SQLite/MySQL) dijalankan di thread pool
+STORE_IS_BLOCKING = not isinstance(cart_store, MemoryCartStore)
+
+
+async def store_call(func, *args):
+    """Panggil method cart_store tanpa memblok event loop"""
+    if STORE_IS_BLOCKING:
+        return await asyncio.to_thread(func, *args)
+    return func(*args)
+
+
+def get_cart_id():
+    """Ambil cart_id dari session, buat baru jika belum ada"""
+    cart_id = session.get('cart_id')
+    if not cart_id:
+        cart_id = cart_store.new_cart_id()
+        session['cart_id'] = cart_id
+    return cart_id
+
+
+def cached_response(body, etag, mimetype):
+    """Kirim body dengan strong ETag, atau 304 jika klien sudah punya versi ini"""
+    if etag in request.if_none_match:
+        response = Response(b'', status=304)
+    else:
+        response = Response(body, mimetype=mimetype)
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+
+@app.before_serving
+async def startup():
+    if not await db.connect():
+        print("Database tidak tersedia, endpoint laporan dinonaktifkan")
+
+
+@app.after_serving
+async def shutdown():
+    await db.disconnect()
+
+
+@app.route('/thumbs/<path:filename>')
+async def thumbnail(filename):
+    """Thumbnail bernama hash isi, jadi aman di-cache selamanya"""
+    response = await send_from_directory(os.path.join(app.root_path, THUMBS_DIR), filename)
+    response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    return response
+
+
+@app.route('/')
+async def index():
+    get_cart_id()
+    page, etag = await menu_catalog.render_cached_async(
+        'index', lambda items: render_template('index.html', menu_items=items))
+    return cached_response(page, etag, 'text/html')
+
+
+@app.route('/api/menu')
+async def get_menu():
+    return cached_response(menu_catalog.json_bytes, menu_catalog.etag, 'application/json')
+
+
+@app.route('/api/cart', methods=['GET'])
+async def get_cart():
+    cart = await store_call(cart_store.load, get_cart_id())
+    return jsonify(list(cart.values()))
+
+
+@app.route('/api/cart/add', methods=['POST'])
+async def add_to_cart():
+    data = await request.get_json()
+    menu_item = menu_catalog.get(data.get('id'))
+    if not menu_item:
+        return jsonify({'error': 'Item tidak ditemukan'}), 404
+
+    try:
+        cart = await store_call(cart_store.add_item, get_cart_id(), menu_item, data.get('variant', ''))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({'success': True, 'cart': list(cart.values())})
+
+
+@app.route('/api/cart/update', methods=['POST'])
+async def update_cart():
+    data = await request.get_json()
+    cart = await store_call(cart_store.update_item, get_cart_id(), get_item_key(data), data.get('quantity'))
+    return jsonify({'success': True, 'cart': list(cart.values())})
+
+
+@app.route('/api/cart/remove', methods=['POST'])
+async def remove_from_cart():
+    data = await request.get_json()
+    cart = await store_call(cart_store.remove_item, get_cart_id(), get_item_key(data))
+    return jsonify({'success': True, 'cart': list(cart.values())})
+
+
+@app.route('/api/cart/batch', methods=['POST'])
+async def batch_cart():
+    try:
+        operations = batch_operations(await request.get_json())
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    def apply_all(items):
+        for operation in operations:
+            apply_cart_operation(items, operation)
+
+    try:
+        cart = await store_call(cart_store.mutate, get_cart_id(), apply_all)
+    except LookupError as e:
+        return jsonify({'error': str(e)}), 404
+    except (ValueError, TypeError) as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({'success': True, 'cart': list(cart.values())})
+
+
+@app.route('/api/cart/clear', methods=['POST'])
+async def clear_cart():
+    await store_call(cart_store.delete, get_cart_id())
+    return jsonify({'success': True})
+
+
+@app.route('/api/checkout', methods=['POST'])
+async def checkout():
+    idempotency_key = request.headers.get('Idempotency-Key')
+    if not idempotency_key:
+        return await process_checkout()
+    try:
+        idempotency_key = scoped_idempotency_key(get_cart_id(), idempotency_key)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    # Retry dengan key yang sama: kirim ulang response yang tersimpan
+    try:
+        stored = await asyncio.to_thread(idempotency_store.begin, idempotency_key)
+    except RequestInProgress:
+        return jsonify({'error': 'Checkout dengan key ini sedang diproses'}), 409
+    if stored:
+        status, body = stored
+        response = Response(body, status=status, mimetype='application/json')
+        response.headers['Idempotent-Replayed'] = 'true'
+        return response
+
+    try:
+        response = await process_checkout()
+    except Exception:
+        await asyncio.to_thread(idempotency_store.release, idempotency_key)
+        raise
+
+    # Hanya response sukses yang disimpan; error boleh dicoba lagi
+    if response.status_code == 200:
+        await asyncio.to_thread(idempotency_store.complete, idempotency_key, 200, await response.get_data())
+    else:
+        await asyncio.to_thread(idempotency_store.release, idempotency_key)
+    return response
+
+
+async def process_checkout():
+    cart_id = get_cart_id()
+    cart = list((await store_call(cart_store.load, cart_id)).values())
+    data = await request.get_json() or {}
+
+    if not cart:
+        return await make_response(jsonify({'error': 'Keranjang kosong'}), 400)
+
+    try:
+        transaction = build_transaction(cart, data)
+    except ValueError as e:
+        return await make_response(jsonify({'error': str(e)}), 400)
+
+    # Journal di-fsync, jadi jalankan di thread pool
+    try:
+        await asyncio.to_thread(checkout_writer.submit, transaction)
+    except QueueFull:
+        return await make_response(jsonify({'error': 'Server sedang sibuk, silakan coba lagi'}), 503)
+
+    await store_call(cart_store.delete, cart_id)
+
+    return jsonify({
+        'success': True,
+        'transaction': transaction,
+        'message': 'Pembayaran berhasil!'
+    })
+
+
+@app.route('/api/checkout/metrics')
+async def checkout_metrics():
+    return jsonify(checkout_writer.metrics())
+
+
+@app.route('/api/stats')
+async def transaction_stats():
+    if db.pool is None:
+        return jsonify({'error': 'Database tidak tersedia'}), 503
+    stats = await get_transaction_stats(db)
+    if stats is None:
+        return jsonify({'error': 'Gagal membaca statistik'}), 503
+    return jsonify(stats_json(stats))
+
+
+
+@app.route('/api/transactions')
+async def list_transactions():
+    """Riwayat transaksi per halaman (terbaru dulu), lanjutkan dengan ?cursor=next_cursor"""
+    try:
+        limit, cursor, filters = history_args(request.args)
+        if db.pool is None:
+            return jsonify({'error': 'Database tidak tersedia'}), 503
+        transactions, next_cursor = await get_transactions_page(db, limit, cursor, **filters)
+    except ValueError as e:
+        return jsonify({'error': f'Parameter tidak valid: {e}'}), 400
+    return jsonify(history_json(transactions, next_cursor))
+
+
+@app.route('/api/reports/summary')
+async def sales_summary():
+    """Penjualan per tanggal, metode pembayaran dan item (dari tabel ringkasan harian)"""
+    try:
+        date_from, date_to = summary_args(request.args)
+    except ValueError as e:
+        return jsonify({'error': f'Parameter tidak valid: {e}'}), 400
+
+    if db.pool is None:
+        return jsonify({'error': 'Database tidak tersedia'}), 503
+    return jsonify(summary_json(await get_sales_summary(db, date_from, date_to)))
+
+
+if __name__ == '__main__':
+    app.run(debug=True, port=5001)
@@ -0,0 +1,207 @@
+# Async database layer untuk mode ASGI (asgi_app.py)
+# Interface sama dengan db_config.Database, tapi semua method async.
+# Query dan waktu eksekusi dilaporkan ke db_config.query_observers
+# (metrics dan profiler) seperti versi sync.
+
+import asyncio
+import re
+import time
+
+import aiomysql
+
+from db_config import (create_database, notify_query, transactions_page_query, sales_summary_queries,
+                       encode_cursor, ITEMS_CHUNK_SIZE)
+
+# aiomysql memformat query dengan operator % Python kalau ada params, jadi
+# % literal (misalnya di DATE_FORMAT) harus ditulis %%
+LITERAL_PERCENT_RE = re.compile(r"%(?!s)")
+
+
+def pyformat(query, params):
+    """Escape literal % in a db_config query for aiomysql when params are given"""
+    return LITERAL_PERCENT_RE.sub("%%", query) if params is not None else query
+
+
+class AsyncDatabase:
+    def __init__(self, minsize=1, maxsize=10):
+        """Initialize async database settings (same defaults as Database)"""
+        self.host = "localhost"
+        self.user = "root"
+        self.password = ""  # Default XAMPP password kosong
+        self.database = "kedai_hauna"
+        self.minsize = minsize
+        self.maxsize = maxsize
+        self.pool = None
+
+    async def connect(self):
+        """Create the connection pool"""
+        try:
+            self.pool = await aiomysql.create_pool(
+                host=self.host,
+                user=self.user,
+                password=self.password,
+                db=self.database,
+                minsize=self.minsize,
+                maxsize=self.maxsize,
+                # SELECT tidak meninggalkan transaksi terbuka; aiomysql menutup
+                # koneksi yang dikembalikan ke pool dalam keadaan transaksi
+                autocommit=True
+            )
+            return True
+        except Exception as e:
+            print(f"Error connecting to MySQL: {e}")
+            return False
+
+    async def disconnect(self):
+        """Close the connection pool"""
+        if self.pool:
+            self.pool.close()
+            await self.pool.wait_closed()
+            self.pool = None
+
+    async def execute_query(self, query, params=None):
+        """Execute INSERT, UPDATE, DELETE queries"""
+        start = time.perf_counter()
+        rows = 0
+        error = None
+        async with self.pool.acquire() as conn:
+            try:
+                async with conn.cursor() as cursor:
+                    await cursor.execute(pyformat(query, params), params)
+                    await conn.commit()
+                    rows = cursor.rowcount
+                    return cursor.lastrowid
+            except Exception as e:
+                error = e
+                print(f"Error executing query: {e}")
+                await conn.rollback()
+                return None
+            finally:
+                notify_query('execute', query, time.perf_counter() - start, rows, params, error)
+
+    async def fetch_all(self, query, params=None):
+        """Execute SELECT query and return all results"""
+        start = time.perf_counter()
+        rows = 0
+        error = None
+        async with self.pool.acquire() as conn:
+            try:
+                async with conn.cursor(aiomysql.DictCursor) as cursor:
+                    await cursor.execute(pyformat(query, params), params)
+                    result = await cursor.fetchall()
+                    rows = len(result)
+                    return result
+            except Exception as e:
+                error = e
+                print(f"Error fetching data: {e}")
+                return []
+            finally:
+                notify_query('fetch_all', query, time.perf_counter() - start, rows, params, error)
+
+    async def fetch_one(self, query, params=None):
+        """Execute SELECT query and return one result"""
+        start = time.perf_counter()
+        rows = 0
+        error = None
+        async with self.pool.acquire() as conn:
+            try:
+                async with conn.cursor(aiomysql.DictCursor) as cursor:
+                    await cursor.execute(pyformat(query, params), params)
+                    result = await cursor.fetchone()
+                    rows = 1 if result else 0
+                    return result
+            except Exception as e:
+                error = e
+                print(f"Error fetching data: {e}")
+                return None
+            finally:
+                notify_query('fetch_one', query, time.perf_counter() - start, rows, params, error)
+
+
+class ThreadedDatabase:
+    """Async interface over a sync database (SQLite): every call runs in the thread pool"""
+
+    def __init__(self, db):
+        self.db = db
+        self.pool = None  # None = belum terhubung, sama seperti AsyncDatabase
+
+    async def connect(self):
+        """Open the database (creates the SQLite schema if needed)"""
+        if not await asyncio.to_thread(self.db.connect):
+            return False
+        self.pool = self.db
+        return True
+
+    async def disconnect(self):
+        if self.pool is not None:
+            await asyncio.to_thread(self.db.disconnect)
+            self.pool = None
+
+    async def execute_query(self, query, params=None):
+        return await asyncio.to_thread(self.db.execute_query, query, params)
+
+    async def fetch_all(self, query, params=None):
+        return await asyncio.to_thread(self.db.fetch_all, query, params)
+
+    async def fetch_one(self, query, params=None):
+        return await asyncio.to_thread(self.db.fetch_one, query, params)
+
+
+def create_async_database(backend=None, **options):
+    """Async database for KEDAI_DB_BACKEND: aiomysql for MySQL, sync SQLite in threads"""
+    db = create_database(backend, **options)
+    if db.dialect == "mysql":
+        return AsyncDatabase()
+    return ThreadedDatabase(db)
+
+
+# Async helper functions (mirror db_config)
+async def get_transaction_stats(db):
+    """Get transaction statistics (from daily_sales_summary)"""
+    query = """
+    SELECT
+        COALESCE(SUM(transactions), 0) as total_transactions,
+        COALESCE(SUM(total), 0) as total_income,
+        COALESCE(SUM(total) / NULLIF(SUM(transactions), 0), 0) as avg_transaction
+    FROM daily_sales_summary
+    """
+    return await db.fetch_one(query)
+
+
+async def attach_items(db, transactions):
+    """Fill trans['items'] for each transaction using chunked IN (...) queries"""
+    by_id = {}
+    for trans in transactions:
+        trans['items'] = []
+        by_id[trans['id']] = trans['items']
+
+    ids = list(by_id)
+    for i in range(0, len(ids), ITEMS_CHUNK_SIZE):
+        chunk = ids[i:i + ITEMS_CHUNK_SIZE]
+        placeholders = ", ".join(["%s"] * len(chunk))
+        rows = await db.fetch_all(f"""
+        SELECT transaction_id, item_id as id, item_name as name, variant, price, quantity
+        FROM transaction_items
+        WHERE transaction_id IN ({placeholders})
+        ORDER BY transaction_items.id
+        """, chunk)
+        for row in rows:
+            by_id[row.pop('transaction_id')].append(row)
+    return transactions
+
+
+async def get_transactions_page(db, limit=50, cursor=None, date_from=None, date_to=None, payment_method=None):
+    """Get one page of transactions (newest first) with their items, see db_config"""
+    query, params = transactions_page_query(limit, cursor, date_from, date_to, payment_method)
+    transactions = list(await db.fetch_all(query, params))
+    has_more = len(transactions) > limit
+    transactions = transactions[:limit]
+    await attach_items(db, transactions)
+    next_cursor = encode_cursor(transactions[-1]) if has_more else None
+    return transactions, next_cursor
+
+
+async def get_sales_summary(db, date_from=None, date_to=None):
+    """Sales per date, per payment method and per item from the summary tables"""
+    return {name: list(await db.fetch_all(query, params))
+            for name, (query, params) in sales_summary_queries(date_from, date_to).items()}
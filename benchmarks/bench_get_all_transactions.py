@@ -0,0 +1,115 @@
+# Benchmark get_all_transactions: pola N+1 lama (satu query item per transaksi)
+# vs query item per chunk IN (...). Mengisi data sintetis dengan prefix BENCH-,
+# membandingkan hasil keduanya, lalu menghapus data uji.
+# Butuh MySQL (XAMPP) dengan database.sql sudah dijalankan, atau --backend sqlite.
+#
+#   python benchmarks/bench_get_all_transactions.py --count 20000 --items 3
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import db_config
+from db_config import create_database, rebuild_daily_summary, get_all_transactions, save_transactions_batch
+
+MENU = [
+    (1, 'Bakso Malang', 23000), (2, 'Seblak Special', 16000), (3, 'Mie Ayam', 18000),
+    (4, 'Siomay', 11000), (5, 'Tea', 6000), (6, 'Ayam Crispy', 17000), (7, 'Nasi', 5000),
+]
+PREFIX = "BENCH-"
+
+
+def get_all_transactions_legacy(db):
+    """Old get_all_transactions: one item query per transaction (N+1)"""
+    transactions = db.fetch_all("""
+    SELECT
+        t.transaction_id as id,
+        t.customer_name,
+        t.payment_method,
+        t.total,
+        DATE_FORMAT(t.created_at, '%Y-%m-%d %H:%i:%s') as date
+    FROM transactions t
+    ORDER BY t.created_at DESC
+    """)
+    for trans in transactions:
+        trans['items'] = db.fetch_all("""
+        SELECT item_id as id, item_name as name, variant, price, quantity
+        FROM transaction_items
+        WHERE transaction_id = %s
+        """, (trans['id'],))
+    return transactions
+
+
+def seed(db, count, items_per_transaction, rng):
+    batch = []
+    for n in range(count):
+        items = [{'id': item_id, 'name': name, 'price': price, 'quantity': rng.randint(1, 3)}
+                 for item_id, name, price in rng.sample(MENU, items_per_transaction)]
+        batch.append({
+            'id': f"{PREFIX}{n:07d}",
+            'customer_name': 'Benchmark',
+            'payment_method': rng.choice(['cash', 'qris', 'debit']),
+            'items': items,
+            'total': sum(item['price'] * item['quantity'] for item in items) * 1.1,
+        })
+        if len(batch) == 500:
+            save_transactions_batch(db, batch)
+            batch = []
+    if batch:
+        save_transactions_batch(db, batch)
+
+
+def timed(db, load):
+    queries = [0]
+    observer = lambda kind, query, elapsed, rows, **extra: queries.__setitem__(0, queries[0] + 1)
+    db_config.query_observers.append(observer)
+    try:
+        start = time.perf_counter()
+        result = load(db)
+        return result, time.perf_counter() - start, queries[0]
+    finally:
+        db_config.query_observers.remove(observer)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark loading all transactions with items")
+    parser.add_argument("--count", type=int, default=20000, help="Jumlah transaksi sintetis")
+    parser.add_argument("--items", type=int, default=3, help="Jumlah item per transaksi (maks 7)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--backend", choices=["mysql", "sqlite"], help="Default: KEDAI_DB_BACKEND atau mysql")
+    parser.add_argument("--sqlite-path", help="File database untuk --backend sqlite")
+    args = parser.parse_args()
+
+    db = create_database(args.backend, path=args.sqlite_path)
+    if not db.connect():
+        print("Database tidak tersedia, benchmark dibatalkan")
+        return 1
+
+    try:
+        db.execute_query("DELETE FROM transactions WHERE transaction_id LIKE %s", (PREFIX + "%",))
+        print(f"Mengisi {args.count} transaksi x {min(args.items, len(MENU))} item...")
+        seed(db, args.count, min(args.items, len(MENU)), random.Random(args.seed))
+
+        print(f"{'Versi':<10} {'Transaksi':>10} {'Query':>8} {'Detik':>8}")
+        results = {}
+        for name, load in (("n+1", get_all_transactions_legacy), ("chunked", get_all_transactions)):
+            result, elapsed, queries = timed(db, load)
+            results[name] = result
+            print(f"{name:<10} {len(result):>10} {queries:>8} {elapsed:>8.2f}")
+
+        same = results["n+1"] == results["chunked"]
+        print("Hasil identik" if same else "PERINGATAN: hasil berbeda")
+        return 0 if same else 1
+    finally:
+        db.execute_query("DELETE FROM transactions WHERE transaction_id LIKE %s", (PREFIX + "%",))
+        # Ringkasan harian ikut berubah saat insert, hitung ulang tanpa data uji
+        rebuild_daily_summary(db)
+        db.disconnect()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,85 @@
+# Microbenchmark latency insert dan select lewat Database: cursor biasa
+# (query di-parse ulang setiap kali) vs prepared statement yang dipakai ulang.
+# Memakai tabel sementara bench_prepared yang dihapus lagi setelah selesai.
+# Butuh MySQL (XAMPP) dengan database kedai_hauna.
+#
+#   python benchmarks/bench_prepared.py --count 2000
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from db_config import Database
+
+INSERT = "INSERT INTO bench_prepared (name, variant, price, quantity) VALUES (%s, %s, %s, %s)"
+SELECT = "SELECT id, name, variant, price, quantity FROM bench_prepared WHERE id = %s"
+
+
+def percentile(sorted_values, pct):
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def measure(call, count):
+    latencies = []
+    for n in range(count):
+        start = time.perf_counter()
+        call(n)
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    return latencies
+
+
+def report(name, latencies):
+    mean = sum(latencies) / len(latencies)
+    print(f"{name:<18} {mean * 1e6:>10.0f} {percentile(latencies, 50) * 1e6:>10.0f} "
+          f"{percentile(latencies, 95) * 1e6:>10.0f} {percentile(latencies, 99) * 1e6:>10.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark prepared statement reuse")
+    parser.add_argument("--count", type=int, default=2000, help="Jumlah query per mode")
+    args = parser.parse_args()
+
+    db = Database(pool_size=1)
+    if not db.connect():
+        print("MySQL tidak tersedia, benchmark dibatalkan")
+        return 1
+
+    try:
+        db.execute_query("DROP TABLE IF EXISTS bench_prepared")
+        db.execute_query("""
+        CREATE TABLE bench_prepared (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            name VARCHAR(100) NOT NULL,
+            variant VARCHAR(50),
+            price DECIMAL(10, 2) NOT NULL,
+            quantity INT NOT NULL
+        ) ENGINE=InnoDB
+        """)
+
+        print(f"{args.count} query per mode (mikrodetik)")
+        print(f"{'Mode':<18} {'Rata2':>10} {'p50':>10} {'p95':>10} {'p99':>10}")
+        for prepared in (False, True):
+            label = "prepared" if prepared else "biasa"
+            inserts = measure(lambda n: db.execute_query(
+                INSERT, (f"Menu {n}", "Dingin" if n % 2 else None, 6000 + n, n % 5 + 1), prepared=prepared),
+                args.count)
+            report(f"insert {label}", inserts)
+            selects = measure(lambda n: db.fetch_one(SELECT, (n % args.count + 1,), prepared=prepared),
+                              args.count)
+            report(f"select {label}", selects)
+
+        stats = db.pool_stats()
+        print(f"Statement di-prepare: {stats['statements_prepared']}, dipakai ulang: {stats['statement_hits']}")
+    finally:
+        db.execute_query("DROP TABLE IF EXISTS bench_prepared")
+        db.disconnect()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,193 @@
+# Benchmark transaksi sebagai dict vs TransactionRecord (__slots__, rupiah
+# int, string di-intern, baris array JSON ringkas).
+#
+# 1. Per baris: kedua format ditulis dan dibaca satu baris per transaksi
+#    dengan serializer yang sama (json.dumps ringkas), jadi yang dibandingkan
+#    hanya bentuk datanya, bukan cara menyimpan (append vs tulis ulang).
+#    Memori = ukuran objek hasil baca per transaksi (mis. satu halaman riwayat
+#    atau segmen di cache).
+# 2. Working set kasir: RSS proses terpisah yang membuka backup seperti kasir
+#    (SegmentedTransactionStore: totals + satu halaman riwayat), dibandingkan
+#    dengan memuat seluruh riwayat sebagai dict ke memory.
+#
+#   python benchmarks/bench_records.py --counts 100000,1000000
+
+import argparse
+import gc
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+from records import TransactionRecord, decode_line
+
+MENU = [
+    (1, 'Bakso Malang', 23000), (2, 'Seblak Special', 16000), (3, 'Mie Ayam', 18000),
+    (4, 'Siomay', 11000), (5, 'Tea', 6000), (6, 'Ayam Crispy', 17000), (7, 'Nasi', 5000),
+]
+METHODS = ['cash', 'qris', 'debit']
+
+
+def dumps(value):
+    """Serializer used for both formats"""
+    return json.dumps(value, separators=(',', ':'), ensure_ascii=False) + "\n"
+
+
+def make_transactions(count, items_per_transaction, rng):
+    """Transactions as the till used to keep them: nested dicts, float total"""
+    transactions = []
+    for n in range(count):
+        items = []
+        for item_id, name, price in rng.sample(MENU, items_per_transaction):
+            variant = rng.choice(['Dingin', 'Hangat']) if item_id == 5 else ''
+            items.append({'id': item_id, 'item_key': f"{item_id}_{variant}",
+                          'name': f"{name} ({variant})" if variant else name,
+                          'price': price, 'quantity': rng.randint(1, 3), 'variant': variant})
+        transactions.append({
+            'id': f"2025{n:010d}",
+            'items': items,
+            'total': sum(item['price'] * item['quantity'] for item in items) * 1.1,
+            'payment_method': rng.choice(METHODS),
+            'customer_name': 'Umum',
+            'date': f"2025-{n % 12 + 1:02d}-{n % 28 + 1:02d} {n % 24:02d}:{n % 60:02d}:{n % 60:02d}",
+        })
+    return transactions
+
+
+def measure_memory(load):
+    gc.collect()
+    tracemalloc.start()
+    result = load()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current
+
+
+def timed(call):
+    start = time.perf_counter()
+    result = call()
+    return result, time.perf_counter() - start
+
+
+def rss_bytes():
+    """Current resident set size of this process"""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    import resource  # bukan Linux: puncak RSS
+    scale = 1 if sys.platform == "darwin" else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+
+
+def compare_lines(transactions):
+    """Per-line write/read time, size and object memory for dict vs record"""
+    results = []
+    for name, prepare, encode, decode in (
+        ('dict', lambda: transactions, dumps, json.loads),
+        ('record', lambda: [TransactionRecord.from_dict(t) for t in transactions],
+         TransactionRecord.encode, decode_line),
+    ):
+        values = prepare()
+        lines, save_time = timed(lambda: [encode(value) for value in values])
+        del values
+        decoded, memory = measure_memory(lambda: [decode(line) for line in lines])
+        del decoded
+        _, load_time = timed(lambda: [decode(line) for line in lines])
+        size = sum(len(line.encode()) for line in lines)
+        results.append((name, memory, save_time, load_time, size))
+    return results
+
+
+def till_child(mode, path):
+    """Run in a separate process: open the backup like the till and print RSS"""
+    from local_store import SegmentedTransactionStore  # impor dulu, tidak dihitung tambahan
+
+    baseline = rss_bytes()
+    if mode == "dict":
+        # Kasir lama: seluruh riwayat dibaca ke list dict saat start
+        with open(path, encoding="utf-8") as f:
+            transactions = [json.loads(line) for line in f]
+        income = sum(t['total'] for t in transactions)
+        page = sorted(transactions, key=lambda t: (t['date'], t['id']), reverse=True)[:100]
+    else:
+        store = SegmentedTransactionStore(path, legacy_paths=())
+        income, _ = store.totals()
+        page, _ = store.page(100)
+    print(json.dumps({'rss': rss_bytes(), 'baseline': baseline, 'page': len(page), 'income': income}))
+    return 0
+
+
+def measure_till(mode, path):
+    output = subprocess.check_output([sys.executable, os.path.abspath(__file__), "--till", mode, path],
+                                     cwd=ROOT)
+    return json.loads(output)
+
+
+def build_backups(workdir, transactions):
+    """Old single-file dict lines and the till's day-segmented backup for the same data"""
+    from local_store import SegmentedTransactionStore
+
+    dict_path = os.path.join(workdir, "transactions-dict.jsonl")
+    with open(dict_path, "w", encoding="utf-8") as f:
+        f.writelines(dumps(t) for t in transactions)
+    journal = os.path.join(workdir, "transactions.jsonl")
+    with open(journal, "w", encoding="utf-8") as f:
+        f.writelines(TransactionRecord.from_dict(t).encode() for t in transactions)
+    segments = os.path.join(workdir, "backup")
+    SegmentedTransactionStore(segments, legacy_paths=(journal,)).close()
+    return dict_path, segments
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark dict transactions vs TransactionRecord")
+    parser.add_argument("--counts", default="100000,1000000", help="Jumlah transaksi, dipisah koma")
+    parser.add_argument("--items", type=int, default=3, help="Jumlah item per transaksi (maks 7)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--skip-till", action="store_true", help="Lewati pengukuran working set kasir")
+    parser.add_argument("--till", nargs=2, metavar=("MODE", "PATH"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.till:
+        return till_child(*args.till)
+
+    counts = [int(c) for c in args.counts.split(",")]
+    items = min(args.items, len(MENU))
+    print("Per baris (serializer sama)")
+    print(f"{'Transaksi':>10} {'Versi':<8} {'B/transaksi':>12} {'Simpan s':>9} {'Baca s':>8} {'Ukuran MB':>10}")
+    for count in counts:
+        transactions = make_transactions(count, items, random.Random(args.seed))
+        for name, memory, save_time, load_time, size in compare_lines(transactions):
+            print(f"{count:>10} {name:<8} {memory / count:>12.0f} {save_time:>9.2f} {load_time:>8.2f} "
+                  f"{size / 1e6:>10.1f}")
+        del transactions
+
+    if args.skip_till:
+        return 0
+    print("\nWorking set kasir (RSS proses: totals + satu halaman riwayat)")
+    print(f"{'Transaksi':>10} {'Versi':<8} {'RSS MB':>8} {'Tambahan MB':>12}")
+    for count in counts:
+        workdir = tempfile.mkdtemp(prefix="kedai-records-")
+        try:
+            dict_path, segments = build_backups(workdir, make_transactions(count, items, random.Random(args.seed)))
+            for name, path in (('dict', dict_path), ('segmen', segments)):
+                result = measure_till(name, path)
+                print(f"{count:>10} {name:<8} {result['rss'] / 1e6:>8.1f} "
+                      f"{(result['rss'] - result['baseline']) / 1e6:>12.1f}")
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,119 @@
+# Benchmark penyimpanan transaksi ke MySQL: commit per baris (cara lama)
+# vs satu commit per transaksi vs batch banyak transaksi sekaligus.
+# Butuh MySQL (XAMPP) dengan database.sql sudah dijalankan, atau --backend sqlite.
+# Data uji memakai prefix BENCH- dan dihapus lagi setelah selesai.
+#
+#   python benchmarks/bench_save_transaction.py --count 500 --items 10 --batch 50
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from db_config import create_database, rebuild_daily_summary, save_transaction, save_transactions_batch
+
+MENU = [
+    (1, 'Bakso Malang', 23000), (2, 'Seblak Special', 16000), (3, 'Mie Ayam', 18000),
+    (4, 'Siomay', 11000), (5, 'Tea', 6000), (6, 'Ayam Crispy', 17000), (7, 'Nasi', 5000),
+]
+PREFIX = "BENCH-"
+
+
+def save_transaction_legacy(db, transaction_id, customer_name, payment_method, items, total):
+    """Old save_transaction: one execute_query (and commit) per row, without a shared transaction"""
+    subtotal = total / 1.1
+    tax = total - subtotal
+    db.execute_query("""
+    INSERT INTO transactions (transaction_id, customer_name, payment_method, subtotal, tax, total)
+    VALUES (%s, %s, %s, %s, %s, %s)
+    """, (transaction_id, customer_name, payment_method, subtotal, tax, total))
+    for item in items:
+        db.execute_query("""
+        INSERT INTO transaction_items (transaction_id, item_id, item_name, variant, price, quantity, subtotal)
+        VALUES (%s, %s, %s, %s, %s, %s, %s)
+        """, (transaction_id, item['id'], item['name'], item.get('variant'), item['price'],
+              item['quantity'], item['price'] * item['quantity']))
+    return True
+
+
+def make_transactions(mode, count, items_per_transaction, rng):
+    transactions = []
+    for n in range(count):
+        items = []
+        for item_id, name, price in rng.sample(MENU, min(items_per_transaction, len(MENU))):
+            items.append({'id': item_id, 'name': name, 'price': price, 'quantity': rng.randint(1, 3)})
+        # Item tambahan (varian) jika diminta lebih dari jumlah menu
+        for i in range(items_per_transaction - len(items)):
+            items.append({'id': 5, 'name': 'Tea', 'variant': f"V{i}", 'price': 6000, 'quantity': 1})
+        total = sum(item['price'] * item['quantity'] for item in items) * 1.1
+        transactions.append({
+            'id': f"{PREFIX}{mode}-{os.getpid()}-{n:06d}",
+            'customer_name': 'Benchmark',
+            'payment_method': rng.choice(['cash', 'qris', 'debit']),
+            'items': items,
+            'total': total,
+        })
+    return transactions
+
+
+def cleanup(db):
+    db.execute_query("DELETE FROM transactions WHERE transaction_id LIKE %s", (PREFIX + "%",))
+    # Ringkasan harian ikut berubah saat insert, hitung ulang tanpa data uji
+    rebuild_daily_summary(db)
+
+
+def run(db, mode, transactions, batch_size):
+    start = time.perf_counter()
+    if mode == "legacy":
+        for t in transactions:
+            save_transaction_legacy(db, t['id'], t['customer_name'], t['payment_method'], t['items'], t['total'])
+        commits = sum(1 + len(t['items']) for t in transactions)
+    elif mode == "single":
+        for t in transactions:
+            save_transaction(db, t['id'], t['customer_name'], t['payment_method'], t['items'], t['total'])
+        commits = len(transactions)
+    else:
+        commits = 0
+        for i in range(0, len(transactions), batch_size):
+            save_transactions_batch(db, transactions[i:i + batch_size])
+            commits += 1
+    return time.perf_counter() - start, commits
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark transaction inserts (commits/sec)")
+    parser.add_argument("--count", type=int, default=500, help="Jumlah transaksi per mode")
+    parser.add_argument("--items", type=int, default=10, help="Jumlah item per transaksi")
+    parser.add_argument("--batch", type=int, default=50, help="Transaksi per batch (mode batch)")
+    parser.add_argument("--modes", default="legacy,single,batch")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--backend", choices=["mysql", "sqlite"], help="Default: KEDAI_DB_BACKEND atau mysql")
+    parser.add_argument("--sqlite-path", help="File database untuk --backend sqlite")
+    args = parser.parse_args()
+
+    db = create_database(args.backend, path=args.sqlite_path)
+    if not db.connect():
+        print("Database tidak tersedia, benchmark dibatalkan")
+        return 1
+
+    rng = random.Random(args.seed)
+    print(f"{args.count} transaksi x {args.items} item")
+    print(f"{'Mode':<8} {'Detik':>8} {'Commit':>8} {'Commit/s':>10} {'Transaksi/s':>12}")
+    try:
+        cleanup(db)
+        for mode in args.modes.split(","):
+            transactions = make_transactions(mode, args.count, args.items, rng)
+            elapsed, commits = run(db, mode, transactions, args.batch)
+            print(f"{mode:<8} {elapsed:>8.2f} {commits:>8} {commits / elapsed:>10.1f} "
+                  f"{len(transactions) / elapsed:>12.1f}")
+    finally:
+        cleanup(db)
+        db.disconnect()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
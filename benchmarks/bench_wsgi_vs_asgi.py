@@ -0,0 +1,168 @@
+# Perbandingan throughput app.py (WSGI, Flask threaded) vs asgi_app.py (ASGI, hypercorn)
+# Kedua server dijalankan sebagai subprocess di loopback lalu diberi beban yang sama.
+# Beban "checkout" hanya menyentuh keranjang dan journal; beban "stats" memanggil
+# /api/stats yang menunggu database, jadi di situ terlihat apakah database yang
+# lambat mengikat thread (WSGI) atau tidak (ASGI). "mixed" menjalankan keduanya
+# (separuh klien checkout, separuh membaca statistik) dan melaporkan latensi
+# checkout terpisah, jadi terlihat apakah checkout ikut melambat.
+#
+# Semua penyimpanan server (database SQLite, idempotency, keranjang, journal)
+# ada di folder sementara yang dihapus setelah run, jadi transaksi sintetis
+# tidak masuk database asli dan repo tidak terisi file uji. --db mysql hanya
+# untuk beban stats (baca saja) terhadap MySQL lokal.
+#
+#   python benchmarks/bench_wsgi_vs_asgi.py --clients 32 --duration 10
+#   python benchmarks/bench_wsgi_vs_asgi.py --workload mixed --clients 64
+#   python benchmarks/bench_wsgi_vs_asgi.py --workload stats --db mysql
+
+import argparse
+import http.client
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+SERVERS = {
+    "wsgi": [sys.executable, "-c",
+             "import sys; from app import app; app.run(port=int(sys.argv[1]), threaded=True)"],
+    "asgi": [sys.executable, "-m", "hypercorn", "asgi_app:app", "--bind"],
+}
+
+
+def server_env(workdir, backend):
+    """Environment that keeps every file the server writes inside workdir"""
+    return dict(
+        os.environ,
+        KEDAI_DB_BACKEND=backend,
+        KEDAI_SQLITE_DB=os.path.join(workdir, "kedai_hauna.db"),
+        KEDAI_IDEMPOTENCY_DB=os.path.join(workdir, "idempotency.db"),
+        KEDAI_CART_DB=os.path.join(workdir, "carts.db"),
+        KEDAI_CHECKOUT_JOURNAL=os.path.join(workdir, "checkout_journal.jsonl"),
+        KEDAI_SLOW_QUERY_LOG=os.path.join(workdir, "slow_queries.log"),
+    )
+
+
+def start_server(kind, port, env):
+    cmd = SERVERS[kind] + ([f"127.0.0.1:{port}"] if kind == "asgi" else [str(port)])
+    proc = subprocess.Popen(cmd, cwd=ROOT, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + 15
+    while time.time() < deadline:
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            conn.request("GET", "/api/menu")
+            conn.getresponse().read()
+            return proc
+        except OSError:
+            time.sleep(0.2)
+    proc.kill()
+    raise RuntimeError(f"Server {kind} tidak bisa dijalankan")
+
+
+def client_loop(port, stop, latencies, errors, workload):
+    """Satu terminal: tambah item, ubah jumlah, checkout, ulangi (atau baca /api/stats)"""
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+    cookie = ""
+
+    def call(method, path, body=None):
+        nonlocal cookie
+        headers = {"Content-Type": "application/json"}
+        if cookie:
+            headers["Cookie"] = cookie
+        start = time.perf_counter()
+        conn.request(method, path, body=json.dumps(body) if body is not None else None, headers=headers)
+        response = conn.getresponse()
+        response.read()
+        latencies.append(time.perf_counter() - start)
+        if response.getheader("Set-Cookie"):
+            cookie = response.getheader("Set-Cookie").split(";", 1)[0]
+        if response.status >= 400:
+            errors.append(response.status)
+
+    try:
+        call("GET", "/api/menu")
+        while not stop.is_set():
+            if workload == "stats":
+                call("GET", "/api/stats")
+                continue
+            call("POST", "/api/cart/add", {"id": 1})
+            call("POST", "/api/cart/add", {"id": 5, "variant": "Dingin"})
+            call("POST", "/api/cart/update", {"item_key": "5_Dingin", "quantity": 2})
+            call("POST", "/api/checkout", {"payment_method": "cash"})
+    except OSError:
+        errors.append("connection")
+
+
+def run(kind, port, clients, duration, workload, backend="sqlite"):
+    """Jalankan beban ke satu server; hasil per jenis beban (checkout/stats)"""
+    workdir = tempfile.mkdtemp(prefix="kedai-bench-")
+    try:
+        proc = start_server(kind, port, server_env(workdir, backend))
+    except RuntimeError:
+        shutil.rmtree(workdir, ignore_errors=True)
+        raise
+    if workload == "mixed":
+        workloads = ["checkout", "stats"] * (clients // 2) + ["checkout"] * (clients % 2)
+    else:
+        workloads = [workload] * clients
+    samples = {name: ([], []) for name in workloads}
+    try:
+        stop = threading.Event()
+        threads = [threading.Thread(target=client_loop, args=(port, stop) + samples[name] + (name,))
+                   for name in workloads]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        time.sleep(duration)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+    finally:
+        proc.terminate()
+        proc.wait()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    results = {}
+    for name, (latencies, errors) in samples.items():
+        latencies.sort()
+        results[name] = {
+            "requests": len(latencies),
+            "errors": len(errors),
+            "rps": len(latencies) / elapsed,
+            "p50_ms": statistics.median(latencies) * 1000 if latencies else 0,
+            "p95_ms": latencies[int(len(latencies) * 0.95)] * 1000 if latencies else 0,
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare WSGI and ASGI throughput")
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--port", type=int, default=5100)
+    parser.add_argument("--workload", default="checkout", choices=["checkout", "stats", "mixed"])
+    parser.add_argument("--db", default="sqlite", choices=["sqlite", "mysql"],
+                        help="Database server; mysql hanya untuk --workload stats")
+    args = parser.parse_args()
+    if args.db == "mysql" and args.workload != "stats":
+        # Checkout akan menulis transaksi sintetis ke kedai_hauna
+        parser.error("--db mysql hanya boleh dengan --workload stats")
+
+    print(f"{'Mode':<6} {'Beban':<9} {'Request':>9} {'Error':>6} {'Req/s':>9} {'p50 ms':>8} {'p95 ms':>8}")
+    for offset, kind in enumerate(("wsgi", "asgi")):
+        results = run(kind, args.port + offset, args.clients, args.duration, args.workload, args.db)
+        for name, result in results.items():
+            print(f"{kind:<6} {name:<9} {result['requests']:>9} {result['errors']:>6} {result['rps']:>9.0f} "
+                  f"{result['p50_ms']:>8.1f} {result['p95_ms']:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+# Load test untuk endpoint POS Flask (app.py)
+# Mensimulasikan banyak terminal: buka menu, tambah item (dengan varian),
+# ubah jumlah, lalu checkout. Hasil per route: throughput dan p50/p95/p99.
+#
+#   python benchmarks/loadtest.py --clients 16 --duration 10               # in-process
+#   python benchmarks/loadtest.py --url http://127.0.0.1:5001 --clients 64  # lewat loopback
+#   python benchmarks/loadtest.py --output hasil.json
+#   python benchmarks/loadtest.py --compare sebelum.json sesudah.json
+
+import argparse
+import http.client
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from urllib.parse import urlparse
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+MENU_IDS = [1, 2, 3, 4, 6, 7]
+VARIANT_ITEM = (5, ["Dingin", "Hangat"])
+PAYMENT_METHODS = ["cash", "debit", "credit", "ewallet", "qris", "transfer"]
+
+
+class InProcessClient:
+    """Client memakai Flask test_client (tanpa jaringan)"""
+
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def request(self, method, path, body=None):
+        response = self.client.open(path, method=method, json=body)
+        return response.status_code, len(response.data)
+
+
+class HttpClient:
+    """Client HTTP keep-alive dengan cookie session sendiri"""
+
+    def __init__(self, url):
+        parsed = urlparse(url)
+        self.conn = http.client.HTTPConnection(parsed.hostname, parsed.port or 80, timeout=30)
+        self.cookie = ""
+
+    def request(self, method, path, body=None):
+        headers = {"Content-Type": "application/json"}
+        if self.cookie:
+            headers["Cookie"] = self.cookie
+        self.conn.request(method, path, body=json.dumps(body) if body is not None else None, headers=headers)
+        response = self.conn.getresponse()
+        data = response.read()
+        set_cookie = response.getheader("Set-Cookie")
+        if set_cookie:
+            self.cookie = set_cookie.split(";", 1)[0]
+        return response.status, len(data)
+
+
+class Recorder:
+    """Kumpulkan latency per route (thread-safe)"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = {}
+        self.errors = {}
+
+    def record(self, route, elapsed, status):
+        with self.lock:
+            self.latencies.setdefault(route, []).append(elapsed)
+            if status >= 400:
+                self.errors[route] = self.errors.get(route, 0) + 1
+
+
+def timed(client, recorder, method, path, body=None, route=None):
+    start = time.perf_counter()
+    status, _ = client.request(method, path, body)
+    recorder.record(route or f"{method} {path}", time.perf_counter() - start, status)
+    return status
+
+
+def cart_session(client, recorder, rng):
+    """Satu pesanan realistis dari awal sampai bayar"""
+    timed(client, recorder, "GET", "/api/menu")
+    keys = []
+    for _ in range(rng.randint(1, 5)):
+        if rng.random() < 0.3:
+            item_id, variants = VARIANT_ITEM
+            variant = rng.choice(variants)
+            timed(client, recorder, "POST", "/api/cart/add", {"id": item_id, "variant": variant})
+            keys.append(f"{item_id}_{variant}")
+        else:
+            item_id = rng.choice(MENU_IDS)
+            timed(client, recorder, "POST", "/api/cart/add", {"id": item_id})
+            keys.append(str(item_id))
+    if keys and rng.random() < 0.5:
+        timed(client, recorder, "POST", "/api/cart/update",
+              {"item_key": rng.choice(keys), "quantity": rng.randint(1, 4)})
+    if keys and rng.random() < 0.2:
+        timed(client, recorder, "POST", "/api/cart/remove", {"item_key": rng.choice(keys)})
+    timed(client, recorder, "POST", "/api/cart/batch",
+          {"operations": [{"op": "add", "id": rng.choice(MENU_IDS)} for _ in range(3)]})
+    timed(client, recorder, "GET", "/api/cart")
+    timed(client, recorder, "POST", "/api/checkout", {"payment_method": rng.choice(PAYMENT_METHODS)})
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def summarize(recorder, elapsed):
+    routes = {}
+    total = 0
+    for route, values in sorted(recorder.latencies.items()):
+        values.sort()
+        total += len(values)
+        routes[route] = {
+            "count": len(values),
+            "errors": recorder.errors.get(route, 0),
+            "rps": len(values) / elapsed,
+            "p50_ms": percentile(values, 50) * 1000,
+            "p95_ms": percentile(values, 95) * 1000,
+            "p99_ms": percentile(values, 99) * 1000,
+        }
+    return {"total_requests": total, "total_rps": total / elapsed, "routes": routes}
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                                       stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args):
+    if args.url:
+        make_client = lambda: HttpClient(args.url)
+    else:
+        # Semua penyimpanan app ke folder sementara: transaksi sintetis tidak
+        # boleh masuk database asli, dan repo tidak terisi file uji
+        workdir = tempfile.mkdtemp(prefix="kedai-loadtest-")
+        os.environ.update({
+            "KEDAI_DB_BACKEND": "sqlite",
+            "KEDAI_SQLITE_DB": os.path.join(workdir, "kedai_hauna.db"),
+            "KEDAI_IDEMPOTENCY_DB": os.path.join(workdir, "idempotency.db"),
+            "KEDAI_CART_DB": os.path.join(workdir, "carts.db"),
+            "KEDAI_CHECKOUT_JOURNAL": os.path.join(workdir, "journal.jsonl"),
+        })
+        from app import app
+        make_client = lambda: InProcessClient(app)
+
+    recorder = Recorder()
+    stop = threading.Event()
+    sessions = [0]
+
+    def worker(seed):
+        rng = random.Random(seed)
+        client = make_client()
+        while not stop.is_set():
+            cart_session(client, recorder, rng)
+            with recorder.lock:
+                sessions[0] += 1
+
+    threads = [threading.Thread(target=worker, args=(args.seed + i,), daemon=True) for i in range(args.clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    time.sleep(args.duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    result = summarize(recorder, elapsed)
+    result.update({
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "mode": "http" if args.url else "in-process",
+        "url": args.url,
+        "clients": args.clients,
+        "duration_s": elapsed,
+        "sessions": sessions[0],
+    })
+    return result
+
+
+def print_result(result):
+    print(f"Mode: {result['mode']}  Clients: {result['clients']}  Commit: {result['commit']}  "
+          f"Sesi checkout: {result['sessions']}")
+    print(f"{'Route':<24} {'Count':>8} {'Err':>5} {'Req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for route, stats in result["routes"].items():
+        print(f"{route:<24} {stats['count']:>8} {stats['errors']:>5} {stats['rps']:>9.1f} "
+              f"{stats['p50_ms']:>8.2f} {stats['p95_ms']:>8.2f} {stats['p99_ms']:>8.2f}")
+    print(f"{'TOTAL':<24} {result['total_requests']:>8} {'':>5} {result['total_rps']:>9.1f}")
+
+
+def compare(old_path, new_path):
+    with open(old_path) as f:
+        old = json.load(f)
+    with open(new_path) as f:
+        new = json.load(f)
+    print(f"Sebelum: {old.get('commit')}  Sesudah: {new.get('commit')}")
+    print(f"{'Route':<24} {'Req/s':>18} {'p95 ms':>20} {'p99 ms':>20}")
+    for route in sorted(set(old["routes"]) | set(new["routes"])):
+        a = old["routes"].get(route)
+        b = new["routes"].get(route)
+        if not a or not b:
+            print(f"{route:<24} {'(hanya di satu hasil)':>18}")
+            continue
+
+        def delta(key):
+            change = (b[key] - a[key]) / a[key] * 100 if a[key] else 0.0
+            return f"{a[key]:.1f}->{b[key]:.1f} ({change:+.0f}%)"
+
+        print(f"{route:<24} {delta('rps'):>18} {delta('p95_ms'):>20} {delta('p99_ms'):>20}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the Kedai Hauna POS endpoints")
+    parser.add_argument("--url", help="Server target (default: in-process Flask test client)")
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="Simpan hasil sebagai JSON")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="Bandingkan dua hasil JSON")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    result = run(args)
+    print_result(result)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+        print(f"Hasil tersimpan: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+# Build thumbnail menu: resize, encode WebP + JPEG, nama file berdasarkan hash isi
+# Jalankan setiap kali gambar di static/images berubah:
+#
+#   python build_images.py
+
+import argparse
+import hashlib
+import io
+import json
+import os
+import re
+
+from PIL import Image, ImageOps
+
+from image_manifest import SIZES, THUMBS_DIR, MANIFEST_PATH
+
+SOURCE_DIR = os.path.join("static", "images")
+
+
+def slugify(name):
+    """'Bakso malang' -> 'bakso-malang'"""
+    return re.sub(r'[^a-z0-9]+', '-', name.lower()).strip('-')
+
+
+def encode(img, fmt):
+    buffer = io.BytesIO()
+    if fmt == 'webp':
+        img.save(buffer, 'WEBP', quality=80, method=6)
+    else:
+        img.save(buffer, 'JPEG', quality=82, optimize=True, progressive=True)
+    return buffer.getvalue()
+
+
+def build(source_dir=SOURCE_DIR, output_dir=THUMBS_DIR, manifest_path=MANIFEST_PATH):
+    """Generate all thumbnails and write the manifest"""
+    os.makedirs(output_dir, exist_ok=True)
+    manifest = {'version': 1, 'sizes': {k: list(v) for k, v in SIZES.items()}, 'images': {}}
+    keep = {os.path.basename(manifest_path)}
+
+    for filename in sorted(os.listdir(source_dir)):
+        if not filename.lower().endswith(('.jpg', '.jpeg', '.png', '.webp')):
+            continue
+        with Image.open(os.path.join(source_dir, filename)) as source:
+            source = ImageOps.exif_transpose(source).convert('RGB')
+            slug = slugify(os.path.splitext(filename)[0])
+            entry = {}
+            for size, (width, height) in SIZES.items():
+                # Crop tengah supaya sama dengan background-size: cover
+                thumb = ImageOps.fit(source, (width, height), Image.Resampling.LANCZOS)
+                entry[size] = {'width': width, 'height': height}
+                for fmt, ext in (('webp', 'webp'), ('jpeg', 'jpg')):
+                    data = encode(thumb, fmt)
+                    digest = hashlib.sha256(data).hexdigest()[:10]
+                    name = f"{slug}-{size}-{digest}.{ext}"
+                    path = os.path.join(output_dir, name)
+                    if not os.path.exists(path):
+                        with open(path, "wb") as f:
+                            f.write(data)
+                    entry[size][fmt] = name
+                    entry[size][f"{fmt}_bytes"] = len(data)
+                    keep.add(name)
+            manifest['images'][filename] = entry
+            print(f"✓ {filename}")
+
+    # Hapus thumbnail lama yang tidak dipakai lagi
+    for name in os.listdir(output_dir):
+        if name not in keep:
+            os.remove(os.path.join(output_dir, name))
+
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return manifest
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build menu thumbnails and manifest")
+    parser.add_argument("--source", default=SOURCE_DIR)
+    parser.add_argument("--output", default=THUMBS_DIR)
+    args = parser.parse_args()
+    build(args.source, args.output, os.path.join(args.output, "manifest.json"))
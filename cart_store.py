@@ -0,0 +1,265 @@
+# Penyimpanan keranjang (cart) di sisi server untuk Kedai Hauna POS
+# Cookie session hanya menyimpan cart_id, isi keranjang ada di backend ini.
+# Keranjang yang tidak diubah selama ttl detik (ditinggal pembeli) dihapus
+# oleh sweep berkala berdasarkan updated_at.
+
+import json
+import sqlite3
+import threading
+import time
+import uuid
+
+CART_TTL = 24 * 3600
+# Sweep keranjang kadaluarsa sekali per sekian save, bukan di setiap request
+SWEEP_EVERY = 1000
+
+
+def make_item_key(item_id, variant=''):
+    """Build the unique cart key for a menu item and its variant"""
+    return f"{item_id}_{variant}" if variant else str(item_id)
+
+
+def add_line(items, menu_item, variant='', quantity=1):
+    """Add quantity of a menu item (with optional variant) to a cart dict.
+
+    Raises ValueError if the variant is not one of the menu item's variants.
+    """
+    variant = variant or ''
+    if variant and variant not in menu_item.get('variants', []):
+        raise ValueError(f"Varian tidak dikenal untuk {menu_item['name']}: {variant}")
+    item_key = make_item_key(menu_item['id'], variant)
+    existing_item = items.get(item_key)
+
+    if existing_item:
+        existing_item['quantity'] += quantity
+    else:
+        item_name = f"{menu_item['name']} ({variant})" if variant else menu_item['name']
+        items[item_key] = {
+            'id': menu_item['id'],
+            'item_key': item_key,
+            'name': item_name,
+            'price': menu_item['price'],
+            'image': menu_item.get('thumb', menu_item['image']),
+            'quantity': quantity,
+            'variant': variant
+        }
+    return item_key
+
+
+def set_line_quantity(items, item_key, quantity):
+    """Set the quantity of a cart line, removing it when quantity <= 0"""
+    item = items.get(item_key)
+    if not item:
+        return False
+    if quantity <= 0:
+        del items[item_key]
+    else:
+        item['quantity'] = quantity
+    return True
+
+
+class CartStore:
+    """Base class for server-side cart backends.
+
+    A cart is a dict keyed by item_key so add/update/remove are O(1).
+    Subclasses implement load(), save() and expire(); the mutation helpers
+    below are shared by all backends.
+    """
+
+    def __init__(self, ttl=CART_TTL):
+        self.ttl = ttl
+        self._saves = 0
+        self._saves_lock = threading.Lock()
+
+    def new_cart_id(self):
+        """Generate a new random cart/session id"""
+        return uuid.uuid4().hex
+
+    def load(self, cart_id):
+        """Return the cart dict for cart_id (empty dict if missing)"""
+        raise NotImplementedError
+
+    def save(self, cart_id, items):
+        """Persist the cart dict for cart_id"""
+        raise NotImplementedError
+
+    def delete(self, cart_id):
+        """Remove the cart for cart_id"""
+        self.save(cart_id, {})
+
+    def expire(self, max_age):
+        """Delete carts not updated for max_age seconds"""
+        raise NotImplementedError
+
+    def _saved(self):
+        """Count a save and sweep abandoned carts every SWEEP_EVERY saves"""
+        with self._saves_lock:
+            self._saves += 1
+            sweep = self.ttl and self._saves % SWEEP_EVERY == 0
+        if sweep:
+            try:
+                self.expire(self.ttl)
+            except Exception as e:
+                print(f"Error expiring carts: {e}")
+
+    def mutate(self, cart_id, mutation):
+        """Load the cart, apply mutation(items) and save it once.
+
+        If mutation raises, nothing is saved.
+        """
+        items = self.load(cart_id)
+        mutation(items)
+        self.save(cart_id, items)
+        return items
+
+    def add_item(self, cart_id, menu_item, variant=''):
+        """Add one menu item (with optional variant) to the cart"""
+        return self.mutate(cart_id, lambda items: add_line(items, menu_item, variant))
+
+    def update_item(self, cart_id, item_key, quantity):
+        """Set the quantity of a cart line, removing it when quantity <= 0"""
+        return self.mutate(cart_id, lambda items: set_line_quantity(items, item_key, quantity))
+
+    def remove_item(self, cart_id, item_key):
+        """Remove a cart line by item_key"""
+        return self.mutate(cart_id, lambda items: items.pop(item_key, None))
+
+
+class MemoryCartStore(CartStore):
+    """In-process cart store, cocok untuk development (satu worker)"""
+
+    def __init__(self, ttl=CART_TTL):
+        super().__init__(ttl)
+        self._carts = {}  # cart_id -> (items, updated_at)
+        self._lock = threading.Lock()
+
+    def load(self, cart_id):
+        with self._lock:
+            items, updated_at = self._carts.get(cart_id, ({}, 0))
+            if self.ttl and updated_at < time.time() - self.ttl:
+                return {}
+            # Copy supaya mutasi di request tidak bocor sebelum save()
+            return {k: dict(v) for k, v in items.items()}
+
+    def save(self, cart_id, items):
+        with self._lock:
+            if items:
+                self._carts[cart_id] = (items, time.time())
+            else:
+                self._carts.pop(cart_id, None)
+        self._saved()
+
+    def delete(self, cart_id):
+        with self._lock:
+            self._carts.pop(cart_id, None)
+
+    def expire(self, max_age):
+        cutoff = time.time() - max_age
+        with self._lock:
+            expired = [cart_id for cart_id, (_, updated_at) in self._carts.items() if updated_at < cutoff]
+            for cart_id in expired:
+                del self._carts[cart_id]
+
+
+class SQLiteCartStore(CartStore):
+    """Cart store di file SQLite, bisa dipakai bersama oleh beberapa worker"""
+
+    def __init__(self, path="carts.db", ttl=CART_TTL):
+        super().__init__(ttl)
+        self.path = path
+        self._local = threading.local()
+        conn = self._connection()
+        conn.execute("""
+        CREATE TABLE IF NOT EXISTS carts (
+            cart_id TEXT PRIMARY KEY,
+            items TEXT NOT NULL,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_carts_updated_at ON carts (updated_at)")
+        conn.commit()
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def load(self, cart_id):
+        if self.ttl:
+            # Keranjang kadaluarsa dianggap kosong walau belum terhapus sweep
+            row = self._connection().execute(
+                "SELECT items FROM carts WHERE cart_id = ? AND updated_at >= datetime('now', ?)",
+                (cart_id, f"-{int(self.ttl)} seconds")).fetchone()
+        else:
+            row = self._connection().execute(
+                "SELECT items FROM carts WHERE cart_id = ?", (cart_id,)).fetchone()
+        return json.loads(row[0]) if row else {}
+
+    def save(self, cart_id, items):
+        conn = self._connection()
+        if items:
+            conn.execute("""
+            INSERT INTO carts (cart_id, items, updated_at) VALUES (?, ?, CURRENT_TIMESTAMP)
+            ON CONFLICT(cart_id) DO UPDATE SET items = excluded.items, updated_at = CURRENT_TIMESTAMP
+            """, (cart_id, json.dumps(items, separators=(',', ':'))))
+        else:
+            conn.execute("DELETE FROM carts WHERE cart_id = ?", (cart_id,))
+        conn.commit()
+        self._saved()
+
+    def expire(self, max_age):
+        conn = self._connection()
+        conn.execute("DELETE FROM carts WHERE updated_at < datetime('now', ?)", (f"-{int(max_age)} seconds",))
+        conn.commit()
+
+
+class MySQLCartStore(CartStore):
+    """Cart store di tabel `carts` MySQL (lihat database.sql)"""
+
+    def __init__(self, db, ttl=CART_TTL):
+        super().__init__(ttl)
+        self.db = db
+
+    # Error database diteruskan (raise_errors) supaya route menjawab 5xx,
+    # bukan keranjang kosong atau save yang seolah berhasil
+
+    def load(self, cart_id):
+        if self.ttl:
+            row = self.db.fetch_one(
+                "SELECT items FROM carts WHERE cart_id = %s AND updated_at >= NOW() - INTERVAL %s SECOND",
+                (cart_id, int(self.ttl)), raise_errors=True)
+        else:
+            row = self.db.fetch_one("SELECT items FROM carts WHERE cart_id = %s", (cart_id,), raise_errors=True)
+        return json.loads(row['items']) if row else {}
+
+    def save(self, cart_id, items):
+        if items:
+            self.db.execute_query("""
+            INSERT INTO carts (cart_id, items) VALUES (%s, %s)
+            ON DUPLICATE KEY UPDATE items = VALUES(items), updated_at = CURRENT_TIMESTAMP
+            """, (cart_id, json.dumps(items, separators=(',', ':'))), raise_errors=True)
+        else:
+            self.db.execute_query("DELETE FROM carts WHERE cart_id = %s", (cart_id,), raise_errors=True)
+        self._saved()
+
+    def expire(self, max_age):
+        # Memakai idx_updated_at
+        self.db.execute_query("DELETE FROM carts WHERE updated_at < NOW() - INTERVAL %s SECOND",
+                              (int(max_age),))
+
+
+def create_cart_store(backend="memory", **options):
+    """Create a cart store by name: memory, sqlite or mysql"""
+    ttl = options.get('ttl', CART_TTL)
+    if backend == "sqlite":
+        return SQLiteCartStore(options.get('path', 'carts.db'), ttl)
+    if backend == "mysql":
+        from db_config import Database
+        db = options.get('db') or Database()
+        if db.pool is None:
+            db.connect()
+        return MySQLCartStore(db, ttl)
+    return MemoryCartStore(ttl)
@@ -15,9 +15,14 @@ CREATE TABLE IF NOT EXISTS transactions (
     total DECIMAL(10, 2) NOT NULL,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     INDEX idx_transaction_id (transaction_id),
-    INDEX idx_created_at (created_at)
+    INDEX idx_created_at (created_at),
+    -- Keyset pagination riwayat: ORDER BY created_at DESC, transaction_id DESC
+    INDEX idx_created_transaction (created_at, transaction_id)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
 
+-- Untuk database yang sudah ada:
+-- ALTER TABLE transactions ADD INDEX idx_created_transaction (created_at, transaction_id);
+
 -- Tabel untuk menyimpan item transaksi
 CREATE TABLE IF NOT EXISTS transaction_items (
     id INT AUTO_INCREMENT PRIMARY KEY,
@@ -32,6 +37,43 @@ CREATE TABLE IF NOT EXISTS transaction_items (
     INDEX idx_transaction_id (transaction_id)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
 
+-- Ringkasan penjualan harian, diperbarui di transaksi DB yang sama dengan save_transaction.
+-- Isi ulang dari data transaksi: python rebuild_summary.py
+CREATE TABLE IF NOT EXISTS daily_sales_summary (
+    sales_date DATE NOT NULL,
+    payment_method VARCHAR(20) NOT NULL,
+    transactions INT NOT NULL DEFAULT 0,
+    total DECIMAL(14, 2) NOT NULL DEFAULT 0,
+    PRIMARY KEY (sales_date, payment_method)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+CREATE TABLE IF NOT EXISTS daily_item_summary (
+    sales_date DATE NOT NULL,
+    item_id INT NOT NULL,
+    variant VARCHAR(50) NOT NULL DEFAULT '',
+    item_name VARCHAR(100) NOT NULL,
+    quantity INT NOT NULL DEFAULT 0,
+    revenue DECIMAL(14, 2) NOT NULL DEFAULT 0,
+    PRIMARY KEY (sales_date, item_id, variant)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+-- Tabel untuk keranjang web (server-side cart, dipakai jika KEDAI_CART_BACKEND=mysql)
+CREATE TABLE IF NOT EXISTS carts (
+    cart_id VARCHAR(64) PRIMARY KEY,
+    items TEXT NOT NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    INDEX idx_updated_at (updated_at)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+-- Tabel untuk response checkout per Idempotency-Key (dipakai jika KEDAI_IDEMPOTENCY_BACKEND=mysql)
+CREATE TABLE IF NOT EXISTS checkout_idempotency (
+    idempotency_key VARCHAR(100) PRIMARY KEY,
+    status INT NOT NULL,
+    body MEDIUMBLOB NOT NULL,
+    created_at DOUBLE NOT NULL,
+    INDEX idx_created_at (created_at)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
 -- Tabel untuk menu items (opsional, untuk manajemen menu)
 CREATE TABLE IF NOT EXISTS menu_items (
     id INT AUTO_INCREMENT PRIMARY KEY,
@@ -1,116 +1,544 @@
 # Database Configuration for Kedai Hauna POS
 # Konfigurasi untuk koneksi ke MySQL (XAMPP)
 
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from collections import OrderedDict
+from contextlib import contextmanager
 import mysql.connector
 from mysql.connector import Error
 
+# Observer dipanggil setelah setiap query:
+#   observer(kind, query, elapsed_seconds, rows, params=..., error=...)
+# Dipakai untuk metrics (lihat metrics.py) dan profiling (lihat query_profiler.py)
+query_observers = []
+
+def notify_query(kind, query, elapsed, rows, params=None, error=None):
+    """Report a finished query to all registered observers"""
+    for observer in query_observers:
+        try:
+            observer(kind, query, elapsed, rows, params=params, error=error)
+        except Exception as e:
+            print(f"Error in query observer: {e}")
+
+# Error yang berarti koneksi putus (bukan error SQL), aman untuk reconnect + retry
+RETRYABLE_ERRNOS = {2006, 2013, 2055}  # server has gone away, lost connection
+# Error sementara di sisi server: transaksi yang sama boleh dicoba lagi
+# 1146 (tabel tidak ada) berarti schema belum di-upgrade, bukan data yang salah:
+# transaksi tetap di journal sampai tabelnya dibuat
+TRANSIENT_ERRNOS = {1205, 1213, 1146}  # lock wait timeout, deadlock, table doesn't exist
+
+# Tabel ringkasan harian (sama dengan database.sql), dibuat saat connect supaya
+# instalasi lama yang belum menjalankan ulang database.sql tetap bisa menyimpan
+SUMMARY_SCHEMA = {
+    'daily_sales_summary': """
+    CREATE TABLE IF NOT EXISTS daily_sales_summary (
+        sales_date DATE NOT NULL,
+        payment_method VARCHAR(20) NOT NULL,
+        transactions INT NOT NULL DEFAULT 0,
+        total DECIMAL(14, 2) NOT NULL DEFAULT 0,
+        PRIMARY KEY (sales_date, payment_method)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    """,
+    'daily_item_summary': """
+    CREATE TABLE IF NOT EXISTS daily_item_summary (
+        sales_date DATE NOT NULL,
+        item_id INT NOT NULL,
+        variant VARCHAR(50) NOT NULL DEFAULT '',
+        item_name VARCHAR(100) NOT NULL,
+        quantity INT NOT NULL DEFAULT 0,
+        revenue DECIMAL(14, 2) NOT NULL DEFAULT 0,
+        PRIMARY KEY (sales_date, item_id, variant)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    """,
+}
+
+def is_connection_error(e):
+    """True if the error means the connection itself is broken"""
+    return isinstance(e, (mysql.connector.InterfaceError, mysql.connector.OperationalError)) and \
+        (getattr(e, 'errno', None) in RETRYABLE_ERRNOS or getattr(e, 'errno', None) is None)
+
+class PoolTimeout(Error):
+    """Raised when no pooled connection becomes free in time"""
+
+class ConnectionPool:
+    """Bounded pool of MySQL connections with liveness checks.
+
+    Idle connections are pinged by a keepalive thread so they never hit
+    the server's wait_timeout; a connection that still turns out to be
+    dead is replaced transparently on checkout.
+    """
+
+    def __init__(self, connect_args, max_size=5, min_size=1, timeout=10,
+                 ping_after=30, keepalive_interval=300, statement_cache_size=32):
+        self.connect_args = connect_args
+        self.max_size = max_size
+        self.min_size = min_size
+        self.timeout = timeout
+        self.ping_after = ping_after
+        self.keepalive_interval = keepalive_interval
+        self.statement_cache_size = statement_cache_size
+        
+        self._idle = []  # [(connection, last_used)]
+        self._size = 0
+        self._cond = threading.Condition()
+        self._closed = False
+        # Prepared statement per koneksi: conn -> OrderedDict((query, dictionary) -> (cursor, query))
+        self._statements = {}
+        self._stats = {
+            'created': 0,
+            'reconnects': 0,
+            'checkouts': 0,
+            'waits': 0,
+            'wait_time_ms': 0.0,
+            'max_wait_ms': 0.0,
+            'timeouts': 0,
+            'statements_prepared': 0,
+            'statement_hits': 0,
+        }
+        
+        for _ in range(min_size):
+            self._idle.append((self._new_connection(), time.monotonic()))
+            self._size += 1
+        
+        self._keepalive = threading.Thread(target=self._keepalive_loop, name="db-keepalive", daemon=True)
+        self._keepalive.start()
+    
+    def _new_connection(self):
+        conn = mysql.connector.connect(**self.connect_args)
+        self._stats['created'] += 1
+        return conn
+    
+    def _is_alive(self, conn):
+        try:
+            conn.ping(reconnect=False)
+            return True
+        except Error:
+            return False
+    
+    def acquire(self):
+        """Check out a live connection, waiting up to timeout if the pool is full"""
+        deadline = time.monotonic() + self.timeout
+        waited_from = None
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise PoolTimeout(msg="Connection pool sudah ditutup")
+                if self._idle:
+                    conn, last_used = self._idle.pop()
+                    break
+                if self._size < self.max_size:
+                    self._size += 1
+                    conn, last_used = None, None
+                    break
+                if waited_from is None:
+                    waited_from = time.monotonic()
+                    self._stats['waits'] += 1
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._stats['timeouts'] += 1
+                    self._stats['wait_time_ms'] += (time.monotonic() - waited_from) * 1000
+                    raise PoolTimeout(msg="Semua koneksi database sedang dipakai")
+                self._cond.wait(remaining)
+            self._stats['checkouts'] += 1
+            if waited_from is not None:
+                waited_ms = (time.monotonic() - waited_from) * 1000
+                self._stats['wait_time_ms'] += waited_ms
+                self._stats['max_wait_ms'] = max(self._stats['max_wait_ms'], waited_ms)
+        
+        try:
+            if conn is None:
+                return self._new_connection()
+            # Koneksi yang lama menganggur dicek dulu sebelum dipakai
+            if time.monotonic() - last_used > self.ping_after and not self._is_alive(conn):
+                self._close_quietly(conn)
+                self._stats['reconnects'] += 1
+                return self._new_connection()
+            return conn
+        except Error:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+    
+    def release(self, conn, broken=False):
+        """Return a connection to the pool (or drop it if broken)"""
+        with self._cond:
+            if broken or self._closed:
+                self._size -= 1
+                self._close_quietly(conn)
+            else:
+                self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+    
+    def replace(self, conn):
+        """Drop a broken checked-out connection and return a fresh one"""
+        self._close_quietly(conn)
+        self._stats['reconnects'] += 1
+        try:
+            return self._new_connection()
+        except Error:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+    
+    def prepared_cursor(self, conn, query, dictionary=False):
+        """Return (cursor, statement) for query, prepared once per connection.
+
+        The cursor only skips re-preparing when it gets the very same
+        statement object again, so the cached string is returned with it.
+        """
+        cache = self._statements.setdefault(conn, OrderedDict())
+        key = (query, dictionary)
+        entry = cache.get(key)
+        if entry is not None:
+            cache.move_to_end(key)
+            self._stats['statement_hits'] += 1
+            return entry
+        entry = (conn.cursor(prepared=True, dictionary=dictionary), query)
+        cache[key] = entry
+        self._stats['statements_prepared'] += 1
+        while len(cache) > self.statement_cache_size:
+            _, (old_cursor, _) = cache.popitem(last=False)
+            self._close_cursor(old_cursor)
+        return entry
+    
+    def discard_statement(self, conn, query, dictionary=False):
+        """Drop a cached statement (e.g. after an error left it half-read)"""
+        entry = self._statements.get(conn, {}).pop((query, dictionary), None)
+        if entry:
+            self._close_cursor(entry[0])
+    
+    def _close_cursor(self, cursor):
+        try:
+            cursor.close()
+        except Exception:
+            pass
+    
+    def _close_quietly(self, conn):
+        for cursor, _ in self._statements.pop(conn, {}).values():
+            self._close_cursor(cursor)
+        try:
+            conn.close()
+        except Exception:
+            pass
+    
+    def _keepalive_loop(self):
+        while True:
+            time.sleep(self.keepalive_interval)
+            with self._cond:
+                if self._closed:
+                    return
+                idle, self._idle = self._idle, []
+            alive = []
+            for conn, last_used in idle:
+                if self._is_alive(conn):
+                    alive.append((conn, last_used))
+                else:
+                    self._close_quietly(conn)
+                    with self._cond:
+                        self._size -= 1
+            with self._cond:
+                self._idle.extend(alive)
+                self._cond.notify_all()
+    
+    def close(self):
+        """Close all idle connections; checked-out ones close on release"""
+        with self._cond:
+            self._closed = True
+            for conn, _ in self._idle:
+                self._close_quietly(conn)
+            self._size -= len(self._idle)
+            self._idle = []
+            self._cond.notify_all()
+    
+    def stats(self):
+        """Return pool statistics (in use, idle, waits, wait time)"""
+        with self._cond:
+            stats = dict(self._stats)
+            stats['size'] = self._size
+            stats['idle'] = len(self._idle)
+            stats['in_use'] = self._size - len(self._idle)
+            stats['max_size'] = self.max_size
+        return stats
+
 class Database:
-    def __init__(self):
+    dialect = "mysql"
+
+    def __init__(self, pool_size=5):
         """Initialize database connection"""
         self.host = "localhost"
         self.user = "root"
         self.password = ""  # Default XAMPP password kosong
         self.database = "kedai_hauna"
-        self.connection = None
+        self.pool_size = pool_size
+        self.pool = None
     
     def connect(self):
-        """Create database connection"""
+        """Create database connection pool"""
         try:
-            self.connection = mysql.connector.connect(
-                host=self.host,
-                user=self.user,
-                password=self.password,
-                database=self.database
-            )
-            if self.connection.is_connected():
-                return True
+            self.pool = ConnectionPool({
+                'host': self.host,
+                'user': self.user,
+                'password': self.password,
+                'database': self.database
+            }, max_size=self.pool_size)
         except Error as e:
             print(f"Error connecting to MySQL: {e}")
             return False
+        self.ensure_summary_tables()
+        return True
+    
+    def ensure_summary_tables(self):
+        """Create missing summary tables (upgrade from an older schema) and backfill them once"""
+        try:
+            with self.acquire() as conn:
+                cursor = conn.cursor()
+                try:
+                    missing = []
+                    for table, ddl in SUMMARY_SCHEMA.items():
+                        cursor.execute("SHOW TABLES LIKE %s", (table,))
+                        if not cursor.fetchall():
+                            missing.append(table)
+                            cursor.execute(ddl)
+                finally:
+                    cursor.close()
+        except Error as e:
+            print(f"Error creating summary tables: {e}")
+            return
+        if missing:
+            # Tabel baru masih kosong: isi dari transaksi yang sudah ada
+            print(f"Tabel {', '.join(missing)} dibuat, mengisi dari data transaksi...")
+            rebuild_daily_summary(self)
     
     def disconnect(self):
-        """Close database connection"""
-        if self.connection and self.connection.is_connected():
-            self.connection.close()
+        """Close database connection pool"""
+        if self.pool:
+            self.pool.close()
+            self.pool = None
+    
+    def pool_stats(self):
+        """Return connection pool statistics"""
+        return self.pool.stats() if self.pool else {}
     
-    def execute_query(self, query, params=None):
-        """Execute INSERT, UPDATE, DELETE queries"""
+    def is_retryable(self, e):
+        """True if retrying the same statements later may succeed (not a data error)"""
+        return isinstance(e, (PoolTimeout, mysql.connector.InterfaceError, mysql.connector.OperationalError)) or \
+            getattr(e, 'errno', None) in TRANSIENT_ERRNOS
+    
+    @contextmanager
+    def acquire(self):
+        """Check out a pooled connection for several statements"""
+        conn = self.pool.acquire()
+        broken = False
         try:
-            cursor = self.connection.cursor()
-            if params:
-                cursor.execute(query, params)
-            else:
-                cursor.execute(query)
-            self.connection.commit()
-            return cursor.lastrowid
+            yield conn
+        except Error as e:
+            broken = is_connection_error(e)
+            raise
+        finally:
+            self.pool.release(conn, broken)
+    
+    @contextmanager
+    def cursor(self, conn, query, dictionary=False, prepared=False):
+        """Yield (cursor, statement) for running query on conn.
+
+        Prepared cursors stay cached on the connection and are reused by
+        the next call with the same query; plain cursors are closed on exit.
+        """
+        if prepared:
+            cursor, statement = self.pool.prepared_cursor(conn, query, dictionary)
+            try:
+                yield cursor, statement
+            except Exception:
+                self.pool.discard_statement(conn, query, dictionary)
+                raise
+            return
+        cursor = conn.cursor(dictionary=dictionary)
+        try:
+            yield cursor, query
+        finally:
+            cursor.close()
+    
+    def _run(self, work):
+        """Run work(conn) on a pooled connection, reconnecting once if it dropped"""
+        conn = self.pool.acquire()
+        try:
+            try:
+                return work(conn)
+            except Error as e:
+                if not is_connection_error(e):
+                    raise
+                old, conn = conn, None
+                # replace() sudah menutup dan melepas slot koneksi lama kalau gagal
+                conn = self.pool.replace(old)
+                return work(conn)
+        except Error as e:
+            # Error SQL biasa tidak merusak koneksi, hanya koneksi putus yang dibuang
+            if conn is not None:
+                self.pool.release(conn, broken=is_connection_error(e))
+                conn = None
+            raise
+        finally:
+            if conn is not None:
+                self.pool.release(conn)
+    
+    def execute_query(self, query, params=None, prepared=False, raise_errors=False):
+        """Execute INSERT, UPDATE, DELETE queries (errors are printed, or raised with raise_errors)"""
+        start = time.perf_counter()
+        rows = 0
+        error = None
+        
+        def work(conn):
+            nonlocal rows
+            try:
+                with self.cursor(conn, query, prepared=prepared) as (cursor, statement):
+                    if params:
+                        cursor.execute(statement, params)
+                    else:
+                        cursor.execute(statement)
+                    conn.commit()
+                    rows = cursor.rowcount
+                    return cursor.lastrowid
+            except Error:
+                try:
+                    conn.rollback()
+                except Error:
+                    pass
+                raise
+        
+        try:
+            return self._run(work)
         except Error as e:
+            error = e
             print(f"Error executing query: {e}")
-            self.connection.rollback()
+            if raise_errors:
+                raise
             return None
+        finally:
+            notify_query('execute', query, time.perf_counter() - start, rows, params, error)
     
-    def fetch_all(self, query, params=None):
+    def fetch_all(self, query, params=None, prepared=False):
         """Execute SELECT query and return all results"""
+        start = time.perf_counter()
+        rows = 0
+        error = None
+        
+        def work(conn):
+            with self.cursor(conn, query, dictionary=True, prepared=prepared) as (cursor, statement):
+                if params:
+                    cursor.execute(statement, params)
+                else:
+                    cursor.execute(statement)
+                return cursor.fetchall()
+        
         try:
-            cursor = self.connection.cursor(dictionary=True)
-            if params:
-                cursor.execute(query, params)
-            else:
-                cursor.execute(query)
-            return cursor.fetchall()
+            result = self._run(work)
+            rows = len(result)
+            return result
         except Error as e:
+            error = e
             print(f"Error fetching data: {e}")
             return []
+        finally:
+            notify_query('fetch_all', query, time.perf_counter() - start, rows, params, error)
+    
+    def fetch_one(self, query, params=None, prepared=False, raise_errors=False):
+        """Execute SELECT query and return one result (errors are printed, or raised with raise_errors)"""
+        start = time.perf_counter()
+        rows = 0
+        error = None
+        
+        def work(conn):
+            with self.cursor(conn, query, dictionary=True, prepared=prepared) as (cursor, statement):
+                if params:
+                    cursor.execute(statement, params)
+                else:
+                    cursor.execute(statement)
+                result = cursor.fetchone()
+                # Buang sisa baris supaya cursor/koneksi bisa dipakai lagi
+                cursor.fetchall()
+                return result
+        
+        try:
+            result = self._run(work)
+            rows = 1 if result else 0
+            return result
+        except Error as e:
+            error = e
+            print(f"Error fetching data: {e}")
+            if raise_errors:
+                raise
+            return None
+        finally:
+            notify_query('fetch_one', query, time.perf_counter() - start, rows, params, error)
     
-    def fetch_one(self, query, params=None):
-        """Execute SELECT query and return one result"""
+    def iter_rows(self, query, params=None, batch_size=500):
+        """Yield rows as dicts, read batch_size at a time from an unbuffered cursor.
+
+        Only one batch is in memory at once. The pooled connection is held
+        until the generator is exhausted or closed.
+        """
+        start = time.perf_counter()
+        rows = 0
+        error = None
+        finished = False
+        conn = self.pool.acquire()
+        cursor = None
         try:
-            cursor = self.connection.cursor(dictionary=True)
+            cursor = conn.cursor(dictionary=True, buffered=False)
             if params:
                 cursor.execute(query, params)
             else:
                 cursor.execute(query)
-            return cursor.fetchone()
+            while True:
+                batch = cursor.fetchmany(batch_size)
+                if not batch:
+                    break
+                rows += len(batch)
+                yield from batch
+            finished = True
         except Error as e:
-            print(f"Error fetching data: {e}")
-            return None
+            error = e
+            raise
+        finally:
+            if cursor is not None:
+                try:
+                    cursor.close()
+                except Error:
+                    finished = False
+            # Sisa hasil yang belum dibaca membuat koneksi tidak bisa dipakai lagi
+            self.pool.release(conn, broken=not finished)
+            notify_query('iter', query, time.perf_counter() - start, rows, params, error)
+
+def create_database(backend=None, **options):
+    """Create a database by backend: mysql (XAMPP, default) or sqlite.
+
+    Defaults come from KEDAI_DB_BACKEND and KEDAI_SQLITE_DB.
+    """
+    backend = backend or os.environ.get('KEDAI_DB_BACKEND', 'mysql')
+    if backend == "sqlite":
+        from sqlite_db import SQLiteDatabase
+        return SQLiteDatabase(options.get('path') or os.environ.get('KEDAI_SQLITE_DB', 'kedai_hauna.db'))
+    return Database(options.get('pool_size') or 5)
 
 # Database helper functions
 def save_transaction(db, transaction_id, customer_name, payment_method, items, total):
-    """Save transaction to database"""
-    try:
-        # Calculate subtotal and tax
-        subtotal = total / 1.1
-        tax = total - subtotal
-        
-        # Insert transaction
-        query = """
-        INSERT INTO transactions (transaction_id, customer_name, payment_method, subtotal, tax, total)
-        VALUES (%s, %s, %s, %s, %s, %s)
-        """
-        db.execute_query(query, (transaction_id, customer_name, payment_method, subtotal, tax, total))
-        
-        # Insert transaction items
-        for item in items:
-            query = """
-            INSERT INTO transaction_items (transaction_id, item_id, item_name, variant, price, quantity, subtotal)
-            VALUES (%s, %s, %s, %s, %s, %s, %s)
-            """
-            item_subtotal = item['price'] * item['quantity']
-            variant = item.get('variant', None)
-            db.execute_query(query, (
-                transaction_id,
-                item['id'],
-                item['name'],
-                variant,
-                item['price'],
-                item['quantity'],
-                item_subtotal
-            ))
-        
-        return True
-    except Exception as e:
-        print(f"Error saving transaction: {e}")
-        return False
+    """Save transaction to database (header + items in one commit)"""
+    saved = save_transactions_batch(db, [{
+        'id': transaction_id,
+        'customer_name': customer_name,
+        'payment_method': payment_method,
+        'items': items,
+        'total': total
+    }])
+    return saved is not None
+
+# Jumlah transaction_id per query IN (...) saat mengambil item
+ITEMS_CHUNK_SIZE = 1000
 
 def get_all_transactions(db):
     """Get all transactions from database"""
@@ -120,31 +548,351 @@ def get_all_transactions(db):
         t.customer_name,
         t.payment_method,
         t.total,
-        DATE_FORMAT(t.created_at, '%Y-%m-%d %H:%i:%s') as date
+        DATE_FORMAT(t.created_at, '%Y-%m-%d %T') as date
     FROM transactions t
     ORDER BY t.created_at DESC
     """
-    transactions = db.fetch_all(query)
-    
-    # Get items for each transaction
+    transactions = db.fetch_all(query, prepared=True)
+    attach_items(db, transactions)
+    return transactions
+
+def attach_items(db, transactions):
+    """Fill trans['items'] for each transaction using chunked IN (...) queries"""
+    by_id = {}
     for trans in transactions:
-        query = """
-        SELECT item_id as id, item_name as name, variant, price, quantity
-        FROM transaction_items
-        WHERE transaction_id = %s
-        """
-        items = db.fetch_all(query, (trans['id'],))
-        trans['items'] = items
+        trans['items'] = []
+        by_id[trans['id']] = trans['items']
     
+    ids = list(by_id)
+    for i in range(0, len(ids), ITEMS_CHUNK_SIZE):
+        chunk = ids[i:i + ITEMS_CHUNK_SIZE]
+        placeholders = ", ".join(["%s"] * len(chunk))
+        rows = db.fetch_all(f"""
+        SELECT transaction_id, item_id as id, item_name as name, variant, price, quantity
+        FROM transaction_items
+        WHERE transaction_id IN ({placeholders})
+        ORDER BY transaction_items.id
+        """, chunk)  # panjang IN (...) berubah-ubah, jadi tidak di-prepare
+        for row in rows:
+            by_id[row.pop('transaction_id')].append(row)
     return transactions
 
+def iter_transactions(db, batch_size=500):
+    """Yield all transactions with items, oldest first, streaming batch_size at a time"""
+    query = """
+    SELECT 
+        t.transaction_id as id,
+        t.customer_name,
+        t.payment_method,
+        t.total,
+        DATE_FORMAT(t.created_at, '%Y-%m-%d %T') as date
+    FROM transactions t
+    ORDER BY t.created_at, t.transaction_id
+    """
+    batch = []
+    for row in db.iter_rows(query, batch_size=batch_size):
+        batch.append(row)
+        if len(batch) == batch_size:
+            yield from attach_items(db, batch)
+            batch = []
+    if batch:
+        yield from attach_items(db, batch)
+
+# Keyset pagination riwayat transaksi, urut terbaru dulu pada (created_at, transaction_id).
+# Cursor = "<YYYYmmddHHMMSS>_<transaction_id>" dari baris terakhir halaman sebelumnya.
+def encode_cursor(trans):
+    """Return the cursor pointing after this transaction"""
+    date = datetime.strptime(trans['date'], '%Y-%m-%d %H:%M:%S')
+    return f"{date:%Y%m%d%H%M%S}_{trans['id']}"
+
+def decode_cursor(cursor):
+    """Return (date, transaction_id) from a cursor; raises ValueError if malformed"""
+    stamp, _, transaction_id = cursor.partition('_')
+    if not transaction_id:
+        raise ValueError(f"Cursor tidak valid: {cursor}")
+    date = datetime.strptime(stamp, '%Y%m%d%H%M%S')
+    return date.strftime('%Y-%m-%d %H:%M:%S'), transaction_id
+
+def transactions_page_query(limit=50, cursor=None, date_from=None, date_to=None, payment_method=None):
+    """Return (query, params) for one page of get_transactions_page (limit + 1 rows)"""
+    conditions = []
+    params = []
+    if cursor:
+        date, transaction_id = decode_cursor(cursor)
+        conditions.append("(t.created_at < %s OR (t.created_at = %s AND t.transaction_id < %s))")
+        params += [date, date, transaction_id]
+    if date_from:
+        conditions.append("t.created_at >= %s")
+        params.append(date_from)
+    if date_to:
+        next_day = datetime.strptime(date_to, '%Y-%m-%d') + timedelta(days=1)
+        conditions.append("t.created_at < %s")
+        params.append(next_day.strftime('%Y-%m-%d'))
+    if payment_method:
+        conditions.append("t.payment_method = %s")
+        params.append(payment_method)
+    where = "WHERE " + " AND ".join(conditions) if conditions else ""
+    
+    # Ambil satu baris lebih untuk tahu apakah masih ada halaman berikutnya
+    query = f"""
+    SELECT 
+        t.transaction_id as id,
+        t.customer_name,
+        t.payment_method,
+        t.total,
+        DATE_FORMAT(t.created_at, '%Y-%m-%d %T') as date
+    FROM transactions t
+    {where}
+    ORDER BY t.created_at DESC, t.transaction_id DESC
+    LIMIT %s
+    """
+    return query, params + [limit + 1]
+
+def get_transactions_page(db, limit=50, cursor=None, date_from=None, date_to=None, payment_method=None):
+    """Get one page of transactions (newest first) with their items.
+
+    date_from/date_to are inclusive 'YYYY-MM-DD' dates. Returns
+    (transactions, next_cursor); next_cursor is None on the last page.
+    """
+    query, params = transactions_page_query(limit, cursor, date_from, date_to, payment_method)
+    transactions = db.fetch_all(query, params, prepared=True)
+    has_more = len(transactions) > limit
+    transactions = transactions[:limit]
+    attach_items(db, transactions)
+    next_cursor = encode_cursor(transactions[-1]) if has_more else None
+    return transactions, next_cursor
+
+def page_transactions(transactions, limit=50, cursor=None, date_from=None, date_to=None, payment_method=None):
+    """Same as get_transactions_page, for an in-memory list (JSON offline mode)"""
+    key = lambda t: (t['date'], str(t['id']))
+    after = decode_cursor(cursor) if cursor else None
+    selected = []
+    for trans in sorted(transactions, key=key, reverse=True):
+        if after and key(trans) >= after:
+            continue
+        if date_from and trans['date'][:10] < date_from:
+            continue
+        if date_to and trans['date'][:10] > date_to:
+            continue
+        if payment_method and trans['payment_method'] != payment_method:
+            continue
+        selected.append(trans)
+        if len(selected) > limit:
+            break
+    has_more = len(selected) > limit
+    selected = selected[:limit]
+    return selected, encode_cursor(selected[-1]) if has_more else None
+
 def get_transaction_stats(db):
-    """Get transaction statistics"""
+    """Get transaction statistics (from daily_sales_summary)"""
     query = """
     SELECT 
-        COUNT(*) as total_transactions,
+        COALESCE(SUM(transactions), 0) as total_transactions,
         COALESCE(SUM(total), 0) as total_income,
-        COALESCE(AVG(total), 0) as avg_transaction
-    FROM transactions
+        COALESCE(SUM(total) * 1.0 / NULLIF(SUM(transactions), 0), 0) as avg_transaction
+    FROM daily_sales_summary
+    """
+    return db.fetch_one(query, prepared=True)
+
+def sales_summary_queries(date_from=None, date_to=None):
+    """Return {'by_date'|'by_payment'|'by_item': (query, params)} for get_sales_summary"""
+    conditions = []
+    params = []
+    if date_from:
+        conditions.append("sales_date >= %s")
+        params.append(date_from)
+    if date_to:
+        conditions.append("sales_date <= %s")
+        params.append(date_to)
+    where = "WHERE " + " AND ".join(conditions) if conditions else ""
+    
+    return {
+        'by_date': (f"""
+        SELECT DATE_FORMAT(sales_date, '%Y-%m-%d') as date, SUM(transactions) as transactions, SUM(total) as total
+        FROM daily_sales_summary {where}
+        GROUP BY sales_date ORDER BY sales_date
+        """, params),
+        'by_payment': (f"""
+        SELECT payment_method, SUM(transactions) as transactions, SUM(total) as total
+        FROM daily_sales_summary {where}
+        GROUP BY payment_method ORDER BY total DESC
+        """, params),
+        'by_item': (f"""
+        SELECT item_id as id, MAX(item_name) as name, variant, SUM(quantity) as quantity, SUM(revenue) as revenue
+        FROM daily_item_summary {where}
+        GROUP BY item_id, variant ORDER BY revenue DESC
+        """, params),
+    }
+
+def get_sales_summary(db, date_from=None, date_to=None):
+    """Sales per date, per payment method and per item from the summary tables.
+
+    date_from/date_to are inclusive 'YYYY-MM-DD' dates.
+    """
+    return {name: db.fetch_all(query, params, prepared=True)
+            for name, (query, params) in sales_summary_queries(date_from, date_to).items()}
+
+def rebuild_daily_summary(db):
+    """Recompute the summary tables from transactions (backfill). Returns True on success"""
+    try:
+        with db.acquire() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute("DELETE FROM daily_sales_summary")
+                cursor.execute("DELETE FROM daily_item_summary")
+                cursor.execute("""
+                INSERT INTO daily_sales_summary (sales_date, payment_method, transactions, total)
+                SELECT DATE(created_at), payment_method, COUNT(*), SUM(total)
+                FROM transactions
+                GROUP BY DATE(created_at), payment_method
+                """)
+                cursor.execute("""
+                INSERT INTO daily_item_summary (sales_date, item_id, variant, item_name, quantity, revenue)
+                SELECT DATE(t.created_at), i.item_id, COALESCE(i.variant, ''), MAX(i.item_name),
+                       SUM(i.quantity), SUM(i.subtotal)
+                FROM transaction_items i
+                JOIN transactions t ON t.transaction_id = i.transaction_id
+                GROUP BY DATE(t.created_at), i.item_id, COALESCE(i.variant, '')
+                """)
+                conn.commit()
+                return True
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                cursor.close()
+    except Exception as e:
+        print(f"Error rebuilding daily summary: {e}")
+        return False
+
+def save_transactions_batch(db, transactions, raise_errors=False):
+    """Save many transactions in one DB transaction using multi-row INSERTs.
+
+    Transactions whose ID already exists are skipped, so replaying a batch
+    is safe. Returns the list of saved transaction IDs, or None on error
+    (with raise_errors the error is raised instead, after the rollback).
+    """
+    if not transactions:
+        return []
+    
+    start = time.perf_counter()
+    rows = 0
+    error = None
+    try:
+        with db.acquire() as conn:
+            try:
+                saved = _insert_transactions(db, conn, transactions)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+        rows = saved[1]
+        return saved[0]
+    except Exception as e:
+        error = e
+        print(f"Error saving transaction batch: {e}")
+        if raise_errors:
+            raise
+        return None
+    finally:
+        notify_query('batch', "INSERT transactions batch", time.perf_counter() - start, rows, error=error)
+
+def _insert_transactions(db, conn, transactions):
+    """Insert new transactions, items and summaries on conn without committing.
+
+    Returns (saved transaction IDs, inserted row count).
     """
-    return db.fetch_one(query)
+    def run(query, params):
+        # Jumlah baris VALUES / IN (...) ikut ukuran batch, jadi bentuk query jarang
+        # berulang: prepared statement hanya menambah round trip dan mendesak
+        # statement yang berguna keluar dari cache per koneksi
+        with db.cursor(conn, query) as (cursor, statement):
+            cursor.execute(statement, tuple(params))
+            return cursor.fetchall() if cursor.description is not None else None
+    
+    # Skip transaksi yang sudah ada (dedup by transaction_id)
+    ids = [str(t['id']) for t in transactions]
+    placeholders = ", ".join(["%s"] * len(ids))
+    existing = {row[0] for row in run(
+        f"SELECT transaction_id FROM transactions WHERE transaction_id IN ({placeholders})", ids)}
+    
+    header_rows = []
+    item_rows = []
+    sales = {}       # (tanggal, metode) -> [jumlah transaksi, total]
+    item_sales = {}  # (tanggal, item_id, varian) -> [nama, qty, pendapatan]
+    for trans in transactions:
+        transaction_id = str(trans['id'])
+        if transaction_id in existing:
+            continue
+        existing.add(transaction_id)
+        
+        total = trans['total']
+        subtotal = trans.get('subtotal', total / 1.1)
+        tax = trans.get('tax', total - subtotal)
+        date = trans.get('date') or datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        day = date[:10]
+        header_rows.append((
+            transaction_id,
+            trans.get('customer_name') or 'Umum',
+            trans['payment_method'],
+            subtotal,
+            tax,
+            total,
+            date
+        ))
+        day_sales = sales.setdefault((day, trans['payment_method']), [0, 0])
+        day_sales[0] += 1
+        day_sales[1] += total
+        for item in trans['items']:
+            item_rows.append((
+                transaction_id,
+                item['id'],
+                item['name'],
+                item.get('variant') or None,
+                item['price'],
+                item['quantity'],
+                item['price'] * item['quantity']
+            ))
+            day_item = item_sales.setdefault((day, item['id'], item.get('variant') or ''), [item['name'], 0, 0])
+            day_item[1] += item['quantity']
+            day_item[2] += item['price'] * item['quantity']
+    
+    if header_rows:
+        values = ", ".join(["(%s, %s, %s, %s, %s, %s, %s)"] * len(header_rows))
+        run(f"""
+        INSERT INTO transactions (transaction_id, customer_name, payment_method, subtotal, tax, total, created_at)
+        VALUES {values}
+        """, [value for row in header_rows for value in row])
+    
+    if item_rows:
+        values = ", ".join(["(%s, %s, %s, %s, %s, %s, %s)"] * len(item_rows))
+        run(f"""
+        INSERT INTO transaction_items (transaction_id, item_id, item_name, variant, price, quantity, subtotal)
+        VALUES {values}
+        """, [value for row in item_rows for value in row])
+    
+    # Ringkasan harian ikut di transaksi DB yang sama
+    def upsert(key, columns):
+        if db.dialect == "sqlite":
+            updates = ", ".join(f"{c} = {c} + excluded.{c}" for c in columns)
+            return f"ON CONFLICT ({key}) DO UPDATE SET {updates}"
+        updates = ", ".join(f"{c} = {c} + VALUES({c})" for c in columns)
+        return f"ON DUPLICATE KEY UPDATE {updates}"
+    
+    if sales:
+        values = ", ".join(["(%s, %s, %s, %s)"] * len(sales))
+        run(f"""
+        INSERT INTO daily_sales_summary (sales_date, payment_method, transactions, total)
+        VALUES {values}
+        {upsert('sales_date, payment_method', ['transactions', 'total'])}
+        """, [value for key, sums in sales.items() for value in key + tuple(sums)])
+    
+    if item_sales:
+        values = ", ".join(["(%s, %s, %s, %s, %s, %s)"] * len(item_sales))
+        run(f"""
+        INSERT INTO daily_item_summary (sales_date, item_id, variant, item_name, quantity, revenue)
+        VALUES {values}
+        {upsert('sales_date, item_id, variant', ['quantity', 'revenue'])}
+        """, [value for key, sums in item_sales.items() for value in key + tuple(sums)])
+    
+    return [row[0] for row in header_rows], len(header_rows) + len(item_rows)
@@ -0,0 +1,210 @@
+# Idempotency-Key untuk /api/checkout
+# Response checkout yang sukses disimpan (LRU di memory + tabel durable),
+# sehingga retry dengan key yang sama hanya me-replay response lama.
+# Key yang sedang diproses di-claim dulu di tabel (status 0, body = token
+# claim), jadi worker lain yang menerima retry yang sama menjawab 409.
+
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+# Status baris yang masih diproses (belum ada response)
+IN_PROGRESS = 0
+
+
+class RequestInProgress(Exception):
+    """Raised when the same idempotency key is already being processed"""
+
+
+class SQLiteIdempotencyTable:
+    """Tabel durable di file SQLite lokal"""
+
+    def __init__(self, path="idempotency.db"):
+        self.path = path
+        self._local = threading.local()
+        conn = self._connection()
+        conn.execute("""
+        CREATE TABLE IF NOT EXISTS checkout_idempotency (
+            idempotency_key TEXT PRIMARY KEY,
+            status INTEGER NOT NULL,
+            body BLOB NOT NULL,
+            created_at REAL NOT NULL
+        )
+        """)
+        conn.commit()
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        row = self._connection().execute(
+            "SELECT status, body FROM checkout_idempotency WHERE idempotency_key = ?", (key,)).fetchone()
+        return (row[0], bytes(row[1])) if row else None
+
+    def claim(self, key, token, stale_before):
+        """Insert an in-progress row for key (or take over a stale one) and return the row"""
+        conn = self._connection()
+        conn.execute("INSERT OR IGNORE INTO checkout_idempotency VALUES (?, ?, ?, ?)",
+                     (key, IN_PROGRESS, token, time.time()))
+        conn.execute("""
+        UPDATE checkout_idempotency SET body = ?, created_at = ?
+        WHERE idempotency_key = ? AND status = ? AND created_at < ?
+        """, (token, time.time(), key, IN_PROGRESS, stale_before))
+        conn.commit()
+        return self.get(key)
+
+    def put(self, key, status, body):
+        conn = self._connection()
+        conn.execute("INSERT OR REPLACE INTO checkout_idempotency VALUES (?, ?, ?, ?)",
+                     (key, status, body, time.time()))
+        conn.commit()
+
+    def unclaim(self, key, token):
+        conn = self._connection()
+        conn.execute("DELETE FROM checkout_idempotency WHERE idempotency_key = ? AND status = ? AND body = ?",
+                     (key, IN_PROGRESS, token))
+        conn.commit()
+
+    def prune(self, older_than):
+        conn = self._connection()
+        conn.execute("DELETE FROM checkout_idempotency WHERE created_at < ?", (older_than,))
+        conn.commit()
+
+
+class MySQLIdempotencyTable:
+    """Tabel `checkout_idempotency` di MySQL (lihat database.sql)"""
+
+    def __init__(self, db):
+        self.db = db
+
+    def get(self, key):
+        row = self.db.fetch_one(
+            "SELECT status, body FROM checkout_idempotency WHERE idempotency_key = %s", (key,))
+        return (row['status'], bytes(row['body'])) if row else None
+
+    def claim(self, key, token, stale_before):
+        """Insert an in-progress row for key (or take over a stale one) and return the row"""
+        self.db.execute_query("""
+        INSERT IGNORE INTO checkout_idempotency (idempotency_key, status, body, created_at)
+        VALUES (%s, %s, %s, %s)
+        """, (key, IN_PROGRESS, token, time.time()))
+        self.db.execute_query("""
+        UPDATE checkout_idempotency SET body = %s, created_at = %s
+        WHERE idempotency_key = %s AND status = %s AND created_at < %s
+        """, (token, time.time(), key, IN_PROGRESS, stale_before))
+        return self.get(key)
+
+    def put(self, key, status, body):
+        self.db.execute_query("""
+        INSERT INTO checkout_idempotency (idempotency_key, status, body, created_at)
+        VALUES (%s, %s, %s, %s)
+        ON DUPLICATE KEY UPDATE status = VALUES(status), body = VALUES(body)
+        """, (key, status, body, time.time()))
+
+    def unclaim(self, key, token):
+        self.db.execute_query("""
+        DELETE FROM checkout_idempotency WHERE idempotency_key = %s AND status = %s AND body = %s
+        """, (key, IN_PROGRESS, token))
+
+    def prune(self, older_than):
+        self.db.execute_query("DELETE FROM checkout_idempotency WHERE created_at < %s", (older_than,))
+
+
+class IdempotencyStore:
+    """Bounded LRU in front of a durable table of stored responses.
+
+    begin(key) returns a stored (status, body) to replay, or claims the key
+    (in this process and in the table) and returns None. The caller then
+    calls complete() with the response to keep, or release() if the
+    request should be retryable. A claim older than claim_timeout is
+    assumed to belong to a worker that died and may be taken over.
+    """
+
+    def __init__(self, table=None, capacity=10000, ttl=24 * 3600, claim_timeout=60):
+        self.table = table
+        self.capacity = capacity
+        self.ttl = ttl
+        self.claim_timeout = claim_timeout
+        self._cache = OrderedDict()
+        self._in_flight = {}  # key -> token claim di tabel
+        self._lock = threading.Lock()
+        self._writes = 0
+
+    def begin(self, key):
+        token = os.urandom(16)
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+            if key in self._in_flight:
+                raise RequestInProgress(key)
+            self._in_flight[key] = token
+
+        try:
+            stored = self.table.claim(key, token, time.time() - self.claim_timeout) if self.table else None
+        except Exception:
+            with self._lock:
+                self._in_flight.pop(key, None)
+            raise
+        if stored is None or (stored[0] == IN_PROGRESS and stored[1] == token):
+            # Claim ini milik kita (atau tanpa tabel: cukup claim di memory)
+            return None
+        with self._lock:
+            self._in_flight.pop(key, None)
+            if stored[0] == IN_PROGRESS:
+                raise RequestInProgress(key)
+            self._remember(key, stored)
+        return stored
+
+    def complete(self, key, status, body):
+        try:
+            if self.table:
+                self.table.put(key, status, body)
+                with self._lock:
+                    self._writes += 1
+                    prune = self._writes % 1000 == 0
+                # Bersihkan key kadaluarsa sesekali, bukan di setiap checkout
+                if prune:
+                    self.table.prune(time.time() - self.ttl)
+        except Exception as e:
+            # Checkout sudah diproses; response tetap dikirim dan di-cache di memory
+            print(f"Error saving idempotency key {key}: {e}")
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+                self._remember(key, (status, body))
+
+    def release(self, key):
+        with self._lock:
+            token = self._in_flight.pop(key, None)
+        if self.table and token is not None:
+            try:
+                self.table.unclaim(key, token)
+            except Exception as e:
+                print(f"Error releasing idempotency key {key}: {e}")
+
+    def _remember(self, key, stored):
+        self._cache[key] = stored
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.capacity:
+            self._cache.popitem(last=False)
+
+
+def create_idempotency_store(backend="sqlite", **options):
+    """Create an idempotency store by table backend: sqlite, mysql or memory"""
+    if backend == "mysql":
+        from db_config import Database
+        db = options.get('db') or Database()
+        if db.pool is None:
+            db.connect()
+        return IdempotencyStore(MySQLIdempotencyTable(db))
+    if backend == "memory":
+        return IdempotencyStore()
+    return IdempotencyStore(SQLiteIdempotencyTable(options.get('path', 'idempotency.db')))
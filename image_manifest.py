@@ -0,0 +1,53 @@
+# Membaca manifest thumbnail hasil build_images.py
+# Dipakai oleh app.py (web) dan kasir_tkinter_v2.py (desktop).
+
+import json
+import os
+
+THUMBS_DIR = os.path.join("static", "thumbs")
+MANIFEST_PATH = os.path.join(THUMBS_DIR, "manifest.json")
+
+# Ukuran thumbnail: (lebar, tinggi)
+SIZES = {
+    'card': (400, 300),      # kartu menu web (tinggi 180px, cukup untuk layar 1.5x)
+    'tk_card': (200, 150),   # kartu menu aplikasi Tkinter
+    'cart': (100, 100),      # gambar kecil di keranjang web (50px @2x)
+}
+
+
+def source_name(image_path):
+    """'/static/images/Siomay.jpg?v=2' -> 'Siomay.jpg'"""
+    return os.path.basename(image_path.split('?', 1)[0])
+
+
+def load_manifest(path=MANIFEST_PATH):
+    """Return the thumbnail manifest, or an empty one if it was not built"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {'images': {}}
+
+
+def thumb_file(manifest, image_path, size, fmt='jpeg'):
+    """Return the thumbnail filename for an image, or None if missing"""
+    entry = manifest['images'].get(source_name(image_path), {}).get(size)
+    return entry.get(fmt) if entry else None
+
+
+def apply_to_menu(menu_items, manifest, url_prefix="/thumbs/"):
+    """Return menu items whose image URLs point to the built thumbnails.
+
+    Items without a thumbnail keep their original image.
+    """
+    result = []
+    for item in menu_items:
+        item = dict(item)
+        card_jpeg = thumb_file(manifest, item['image'], 'card', 'jpeg')
+        if card_jpeg:
+            item['image_webp'] = url_prefix + thumb_file(manifest, item['image'], 'card', 'webp')
+            item['thumb'] = url_prefix + thumb_file(manifest, item['image'], 'cart', 'jpeg')
+            item['thumb_webp'] = url_prefix + thumb_file(manifest, item['image'], 'cart', 'webp')
+            item['image'] = url_prefix + card_jpeg
+        result.append(item)
+    return result
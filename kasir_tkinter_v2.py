@@ -1,10 +1,18 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, simpledialog
 from datetime import datetime
-import json
+import atexit
 import os
 from PIL import Image, ImageTk
-from db_config import Database, save_transaction, get_all_transactions, get_transaction_stats
+from db_config import (create_database, iter_transactions, get_transaction_stats,
+                       get_transactions_page)
+from transaction_id import new_transaction_id
+from transaction_writer import TransactionWriter
+from local_store import SegmentedTransactionStore
+from persistence_worker import PersistenceWorker, PersistenceError
+from records import TransactionRecord
+from query_profiler import install_from_env as install_query_profiler
+from image_manifest import load_manifest, thumb_file, THUMBS_DIR
 
 class KedaiHaunaApp:
     def __init__(self, root):
@@ -38,8 +46,11 @@ class KedaiHaunaApp:
         self.cart = []
         self.images = {}
         
-        # Initialize database connection
-        self.db = Database()
+        # Profil query + log query lambat (KEDAI_QUERY_PROFILE, lihat query_report.py)
+        self.query_profiler = install_query_profiler()
+        
+        # Initialize database connection (MySQL, atau SQLite lokal jika KEDAI_DB_BACKEND=sqlite)
+        self.db = create_database()
         if not self.db.connect():
             messagebox.showerror("Database Error", 
                                "Tidak dapat terhubung ke database!\n\n"
@@ -50,7 +61,22 @@ class KedaiHaunaApp:
                                "Aplikasi akan menggunakan mode offline (JSON).")
             self.db = None
         
-        self.transactions = self.load_transactions()
+        # Backup lokal: hanya index yang dibaca saat start, transaksi dibaca saat dibutuhkan
+        self.local_store = self.open_local_store()
+        self.history_page_size = 100
+        
+        # Outbox: transaksi dijurnal di disk dulu, lalu dikirim ke database oleh
+        # thread background (retry sampai database tersedia lagi, dedup per ID)
+        self.outbox = TransactionWriter(self.connect_outbox_db,
+                                        journal_path=os.environ.get('KEDAI_OUTBOX_JOURNAL', 'outbox_journal.jsonl'),
+                                        maxsize=0, retry_interval=10.0)
+        self.outbox.start()
+        atexit.register(self.outbox.stop)
+        
+        # Simpan transaksi di thread background supaya UI tidak freeze saat fsync;
+        # didaftarkan setelah outbox supaya saat exit dijalankan lebih dulu
+        self.persistence = PersistenceWorker()
+        atexit.register(self.persistence.stop)
         
         self.load_images()
         self.setup_ui()
@@ -59,6 +85,8 @@ class KedaiHaunaApp:
         # Notification queue and history
         self.notification_queue = []
         self.notification_history = []
+        
+        self.poll_persistence()
     
     def bind_mousewheel(self, canvas):
         """Bind mouse wheel to canvas for scrolling"""
@@ -250,10 +278,15 @@ class KedaiHaunaApp:
             self.show_notification("Riwayat notifikasi dihapus", duration=2000, type="info")
     
     def load_images(self):
-        """Load dan resize gambar menu"""
+        """Load gambar menu, pakai thumbnail hasil build_images.py jika ada"""
+        manifest = load_manifest()
         for item in self.menu_items:
             try:
-                if os.path.exists(item['image']):
+                thumb = thumb_file(manifest, item['image'], 'tk_card', 'jpeg')
+                if thumb:
+                    # Thumbnail sudah berukuran 200x150, tidak perlu resize lagi
+                    self.images[item['id']] = ImageTk.PhotoImage(Image.open(os.path.join(THUMBS_DIR, thumb)))
+                elif os.path.exists(item['image']):
                     img = Image.open(item['image'])
                     # Resize untuk card yang lebih kecil
                     img = img.resize((200, 150), Image.Resampling.LANCZOS)
@@ -322,6 +355,12 @@ class KedaiHaunaApp:
                  bg=self.colors['bg_card'], fg=self.colors['text_gray'], relief=tk.FLAT,
                  command=self.root.quit, anchor="w", padx=18, pady=13, cursor="hand2",
                  borderwidth=0).pack(side=tk.BOTTOM, fill=tk.X, padx=10, pady=20)
+        
+        # Status penyimpanan (diperbarui oleh poll_persistence)
+        self.persist_status = tk.Label(sidebar, text="✓ Semua tersimpan", font=("Segoe UI", 9),
+                                       bg=self.colors['bg_sidebar'], fg=self.colors['text_gray'],
+                                       anchor="w", justify=tk.LEFT, wraplength=170)
+        self.persist_status.pack(side=tk.BOTTOM, fill=tk.X, padx=20)
 
     def setup_cart_sidebar(self, parent):
         self.cart_sidebar = tk.Frame(parent, bg=self.colors['bg_sidebar'], width=300)
@@ -923,30 +962,21 @@ class KedaiHaunaApp:
         # Get customer name
         customer_name = self.customer_name_var.get() if hasattr(self, 'customer_name_var') and self.customer_name_var.get() else "Umum"
         
-        transaction_id = datetime.now().strftime('%Y%m%d%H%M%S')
+        transaction_id = new_transaction_id()
         
-        transaction = {
+        # Record ringkas (rupiah bulat, string di-intern); item keranjang ikut disalin
+        transaction = TransactionRecord.from_dict({
             "id": transaction_id,
-            "items": self.cart.copy(),
+            "items": self.cart,
             "total": total,
             "payment_method": method,
             "customer_name": customer_name,
             "date": datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        }
-        
-        # Save to database
-        if self.db:
-            try:
-                if save_transaction(self.db, transaction_id, customer_name, method, self.cart, total):
-                    self.show_notification("✓ Transaksi tersimpan ke database", duration=2000, type="success")
-                else:
-                    self.show_notification("⚠ Gagal simpan ke database, tersimpan di JSON", duration=3000, type="error")
-            except Exception as e:
-                print(f"Error saving to database: {e}")
-                self.show_notification("⚠ Error database, tersimpan di JSON", duration=3000, type="error")
+        })
         
-        self.transactions.append(transaction)
-        self.save_transactions()  # Backup to JSON
+        # Disimpan di background; notifikasi muncul setelah tersimpan (lihat poll_persistence)
+        self.persistence.submit(self.persist_transaction, transaction, tag=transaction_id)
+        self.update_persist_status()
         
         dialog.destroy()
         
@@ -1311,21 +1341,8 @@ class KedaiHaunaApp:
         stats_frame = tk.Frame(self.content_frame, bg=self.colors['bg_dark'])
         stats_frame.pack(fill=tk.X, padx=20, pady=10)
         
-        # Get stats from database or calculate from transactions
-        if self.db:
-            try:
-                stats = get_transaction_stats(self.db)
-                total_income = stats['total_income']
-                total_trans = stats['total_transactions']
-                avg_trans = stats['avg_transaction']
-            except:
-                total_income = sum(t["total"] for t in self.transactions)
-                total_trans = len(self.transactions)
-                avg_trans = total_income / total_trans if total_trans > 0 else 0
-        else:
-            total_income = sum(t["total"] for t in self.transactions)
-            total_trans = len(self.transactions)
-            avg_trans = total_income / total_trans if total_trans > 0 else 0
+        # Get stats from database or calculate from the local backup index
+        total_income, total_trans, avg_trans = self.report_totals()
         
         self.create_stat_card(stats_frame, "💵", "Total Pemasukan", 
                              f"Rp {total_income:,.0f}", 0)
@@ -1338,8 +1355,26 @@ class KedaiHaunaApp:
         table_frame.pack(fill=tk.BOTH, padx=20, pady=10)
         table_frame.pack_propagate(False)
         
-        tk.Label(table_frame, text="Riwayat Transaksi", font=("Arial", 14, "bold"),
-                bg=self.colors['bg_card'], fg="white").pack(pady=15, padx=20, anchor="w")
+        header_frame = tk.Frame(table_frame, bg=self.colors['bg_card'])
+        header_frame.pack(fill=tk.X, pady=15, padx=20)
+        
+        tk.Label(header_frame, text="Riwayat Transaksi", font=("Arial", 14, "bold"),
+                bg=self.colors['bg_card'], fg="white").pack(side=tk.LEFT)
+        
+        # Filter riwayat: tanggal (YYYY-MM-DD) dan metode pembayaran
+        filter_frame = tk.Frame(header_frame, bg=self.colors['bg_card'])
+        filter_frame.pack(side=tk.RIGHT)
+        
+        date_from_var = tk.StringVar()
+        date_to_var = tk.StringVar()
+        method_var = tk.StringVar(value="Semua")
+        
+        for label, var in (("Dari", date_from_var), ("Sampai", date_to_var)):
+            tk.Label(filter_frame, text=label, font=("Segoe UI", 9),
+                    bg=self.colors['bg_card'], fg=self.colors['text_gray']).pack(side=tk.LEFT, padx=(8, 4))
+            tk.Entry(filter_frame, textvariable=var, width=11, font=("Segoe UI", 9),
+                    bg=self.colors['bg_dark'], fg="white", relief=tk.FLAT,
+                    insertbackground="white").pack(side=tk.LEFT)
         
         # Treeview
         style = ttk.Style()
@@ -1383,41 +1418,47 @@ class KedaiHaunaApp:
             'ewallet': 'E-Wallet', 'qris': 'QRIS', 'transfer': 'Transfer'
         }
         
-        for idx, trans in enumerate(reversed(self.transactions), 1):
-            # Parse date and time
-            date_obj = datetime.strptime(trans["date"], '%Y-%m-%d %H:%M:%S')
-            date_str = date_obj.strftime('%d-%m-%Y')
-            time_str = date_obj.strftime('%H:%M:%S')
-            
-            # Format items - lebih ringkas
-            items_list = []
-            for item in trans['items']:
-                qty = item['quantity']
-                name = item['name']
-                # Singkat nama jika terlalu panjang
-                if len(name) > 15:
-                    name = name[:12] + "..."
-                items_list.append(f"{name} ({qty}x)")
-            items_text = ", ".join(items_list)
-            
-            # Truncate if too long
-            if len(items_text) > 45:
-                items_text = items_text[:42] + "..."
-            
-            customer_name = trans.get('customer_name', 'Umum')
-            # Capitalize customer name
-            if customer_name:
-                customer_name = customer_name.title()
-            
-            tree.insert("", "end", values=(
-                idx,
-                date_str,
-                time_str,
-                customer_name,
-                items_text,
-                payment_names.get(trans["payment_method"], trans["payment_method"]),
-                f"Rp {trans['total']:,.0f}"
-            ))
+        method_codes = {name: code for code, name in payment_names.items()}
+        ttk.Combobox(filter_frame, textvariable=method_var, state="readonly", width=9,
+                    values=["Semua"] + list(payment_names.values())).pack(side=tk.LEFT, padx=(8, 4))
+        
+        # Baris yang sudah tampil: iid -> transaksi, plus cursor halaman berikutnya
+        rows = {}
+        history = {'cursor': None, 'filters': {}}
+        
+        def insert_rows(transactions):
+            for trans in transactions:
+                idx = len(rows) + 1
+                self.insert_history_row(tree, idx, trans, payment_names)
+                rows[str(idx)] = trans
+        
+        def load_more():
+            transactions, history['cursor'] = self.load_history_page(history['cursor'], **history['filters'])
+            insert_rows(transactions)
+            more_btn.config(state=tk.NORMAL if history['cursor'] else tk.DISABLED)
+        
+        def apply_filter():
+            filters = {
+                'date_from': date_from_var.get().strip() or None,
+                'date_to': date_to_var.get().strip() or None,
+                'payment_method': method_codes.get(method_var.get()),
+            }
+            for key in ('date_from', 'date_to'):
+                if filters[key]:
+                    try:
+                        datetime.strptime(filters[key], '%Y-%m-%d')
+                    except ValueError:
+                        messagebox.showerror("Filter", "Format tanggal: YYYY-MM-DD")
+                        return
+            tree.delete(*tree.get_children())
+            rows.clear()
+            history['cursor'] = None
+            history['filters'] = filters
+            load_more()
+        
+        tk.Button(filter_frame, text="Filter", font=("Segoe UI", 8, "bold"),
+                 bg=self.colors['accent'], fg="white", relief=tk.FLAT,
+                 command=apply_filter, cursor="hand2", padx=10).pack(side=tk.LEFT, padx=(4, 0))
         
         # Scrollbar
         scrollbar = ttk.Scrollbar(table_frame, orient="vertical", command=tree.yview)
@@ -1429,13 +1470,8 @@ class KedaiHaunaApp:
         # Bind double-click event to show detail
         def on_double_click(event):
             selected_item = tree.selection()
-            if selected_item:
-                item_values = tree.item(selected_item[0])['values']
-                if item_values:
-                    # Get transaction index (No - 1 because we enumerate from 1)
-                    trans_idx = len(self.transactions) - int(item_values[0])
-                    if 0 <= trans_idx < len(self.transactions):
-                        self.show_transaction_detail(self.transactions[trans_idx])
+            if selected_item and selected_item[0] in rows:
+                self.show_transaction_detail(rows[selected_item[0]])
         
         tree.bind("<Double-Button-1>", on_double_click)
         
@@ -1454,6 +1490,14 @@ class KedaiHaunaApp:
                 font=("Segoe UI", 9),
                 bg=self.colors['bg_dark'], fg=self.colors['text_gray']).pack(side=tk.LEFT)
         
+        more_btn = tk.Button(tips_frame, text="Muat lebih banyak", font=("Segoe UI", 8, "bold"),
+                            bg=self.colors['bg_card'], fg="white", relief=tk.FLAT,
+                            command=load_more, cursor="hand2", padx=12, pady=6)
+        more_btn.pack(side=tk.LEFT, padx=(15, 0))
+        
+        # Halaman pertama riwayat
+        load_more()
+        
         # Right: Export buttons (horizontal, compact)
         export_frame = tk.Frame(bottom_section, bg=self.colors['bg_dark'])
         export_frame.pack(side=tk.RIGHT)
@@ -1473,6 +1517,43 @@ class KedaiHaunaApp:
                  command=self.export_to_pdf, cursor="hand2",
                  padx=12, pady=6).pack(side=tk.LEFT, padx=2)
     
+    def insert_history_row(self, tree, idx, trans, payment_names):
+        """Insert one transaction into the history Treeview"""
+        # Parse date and time
+        date_obj = datetime.strptime(trans["date"], '%Y-%m-%d %H:%M:%S')
+        date_str = date_obj.strftime('%d-%m-%Y')
+        time_str = date_obj.strftime('%H:%M:%S')
+        
+        # Format items - lebih ringkas
+        items_list = []
+        for item in trans['items']:
+            qty = item['quantity']
+            name = item['name']
+            # Singkat nama jika terlalu panjang
+            if len(name) > 15:
+                name = name[:12] + "..."
+            items_list.append(f"{name} ({qty}x)")
+        items_text = ", ".join(items_list)
+        
+        # Truncate if too long
+        if len(items_text) > 45:
+            items_text = items_text[:42] + "..."
+        
+        customer_name = trans.get('customer_name', 'Umum')
+        # Capitalize customer name
+        if customer_name:
+            customer_name = customer_name.title()
+        
+        tree.insert("", "end", iid=str(idx), values=(
+            idx,
+            date_str,
+            time_str,
+            customer_name,
+            items_text,
+            payment_names.get(trans["payment_method"], trans["payment_method"]),
+            f"Rp {trans['total']:,.0f}"
+        ))
+    
     def show_transaction_detail(self, transaction):
         """Tampilkan detail lengkap transaksi"""
         # Create detail window - Adjusted for small screens
@@ -1636,12 +1717,17 @@ class KedaiHaunaApp:
         """Export laporan transaksi ke Excel"""
         try:
             import openpyxl
+            from openpyxl.cell import WriteOnlyCell
             from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
             
-            # Create workbook
-            wb = openpyxl.Workbook()
-            ws = wb.active
-            ws.title = "Laporan Transaksi"
+            # Write-only workbook: baris langsung ditulis, memory tetap kecil
+            # berapapun jumlah transaksinya
+            wb = openpyxl.Workbook(write_only=True)
+            ws = wb.create_sheet("Laporan Transaksi")
+            
+            # Column widths (harus diatur sebelum baris pertama ditulis)
+            for column, width in zip("ABCDEFGH", (5, 18, 12, 10, 15, 40, 12, 15)):
+                ws.column_dimensions[column].width = width
             
             # Header styling
             header_fill = PatternFill(start_color="FF4444", end_color="FF4444", fill_type="solid")
@@ -1653,34 +1739,44 @@ class KedaiHaunaApp:
                 bottom=Side(style='thin')
             )
             
-            # Title
-            ws.merge_cells('A1:H1')
-            ws['A1'] = "LAPORAN TRANSAKSI - KEDAI HAUNA"
-            ws['A1'].font = Font(bold=True, size=14)
-            ws['A1'].alignment = Alignment(horizontal='center')
-            
-            # Subtitle
-            ws.merge_cells('A2:H2')
-            ws['A2'] = f"Tanggal Export: {datetime.now().strftime('%d-%m-%Y %H:%M:%S')}"
-            ws['A2'].alignment = Alignment(horizontal='center')
+            def cell(value=None, font=None, alignment=None, fill=None, number_format=None, with_border=False):
+                c = WriteOnlyCell(ws, value=value)
+                if font:
+                    c.font = font
+                if alignment:
+                    c.alignment = alignment
+                if fill:
+                    c.fill = fill
+                if number_format:
+                    c.number_format = number_format
+                if with_border:
+                    c.border = border
+                return c
+            
+            # Title & subtitle, rata tengah di kolom A-H
+            center_across = Alignment(horizontal='centerContinuous')
+            ws.append([cell("LAPORAN TRANSAKSI - KEDAI HAUNA", Font(bold=True, size=14), center_across)] +
+                      [cell(alignment=center_across) for _ in range(7)])
+            ws.append([cell(f"Tanggal Export: {datetime.now().strftime('%d-%m-%Y %H:%M:%S')}", alignment=center_across)] +
+                      [cell(alignment=center_across) for _ in range(7)])
+            ws.append([])
             
             # Headers
             headers = ["No", "ID Transaksi", "Tanggal", "Jam", "Customer", "Item", "Metode", "Total"]
-            for col, header in enumerate(headers, 1):
-                cell = ws.cell(row=4, column=col, value=header)
-                cell.fill = header_fill
-                cell.font = header_font
-                cell.alignment = Alignment(horizontal='center')
-                cell.border = border
+            ws.append([cell(header, header_font, Alignment(horizontal='center'), header_fill, with_border=True)
+                       for header in headers])
             
             # Data
             payment_names = {
                 'cash': 'Tunai', 'debit': 'Debit', 'credit': 'Kredit',
                 'ewallet': 'E-Wallet', 'qris': 'QRIS', 'transfer': 'Transfer'
             }
+            center = Alignment(horizontal='center')
+            right = Alignment(horizontal='right')
             
-            row = 5
-            for idx, trans in enumerate(reversed(self.transactions), 1):
+            total_income = 0
+            total_trans = 0
+            for idx, trans in enumerate(self.iter_report_transactions(), 1):
                 date_obj = datetime.strptime(trans["date"], '%Y-%m-%d %H:%M:%S')
                 date_str = date_obj.strftime('%d-%m-%Y')
                 time_str = date_obj.strftime('%H:%M:%S')
@@ -1692,62 +1788,33 @@ class KedaiHaunaApp:
                 
                 # Convert Decimal to float for Excel compatibility
                 total_value = float(trans['total']) if hasattr(trans['total'], '__float__') else trans['total']
+                total_income += total_value
+                total_trans += 1
                 
-                data = [
-                    idx,
-                    str(trans['id']),
-                    date_str,
-                    time_str,
-                    customer_name,
-                    items_text,
-                    payment_names.get(trans['payment_method'], trans['payment_method']),
-                    total_value
-                ]
-                
-                for col, value in enumerate(data, 1):
-                    cell = ws.cell(row=row, column=col, value=value)
-                    cell.border = border
-                    if col == 8:  # Total column
-                        cell.number_format = 'Rp #,##0'
-                        cell.alignment = Alignment(horizontal='right')
-                    elif col in [1, 3, 4, 7]:  # Center align
-                        cell.alignment = Alignment(horizontal='center')
-                
-                row += 1
+                ws.append([
+                    cell(idx, alignment=center, with_border=True),
+                    cell(str(trans['id']), with_border=True),
+                    cell(date_str, alignment=center, with_border=True),
+                    cell(time_str, alignment=center, with_border=True),
+                    cell(customer_name, with_border=True),
+                    cell(items_text, with_border=True),
+                    cell(payment_names.get(trans['payment_method'], trans['payment_method']),
+                         alignment=center, with_border=True),
+                    cell(total_value, alignment=right, number_format='Rp #,##0', with_border=True)
+                ])
             
             # Summary
-            row += 1
-            # Convert to float for sum calculation
-            total_income = sum(float(t["total"]) if hasattr(t["total"], '__float__') else t["total"] for t in self.transactions)
-            total_trans = len(self.transactions)
-            
-            ws.merge_cells(f'A{row}:G{row}')
-            ws[f'A{row}'] = "TOTAL PEMASUKAN"
-            ws[f'A{row}'].font = Font(bold=True, size=12)
-            ws[f'A{row}'].alignment = Alignment(horizontal='right')
-            ws[f'H{row}'] = total_income
-            ws[f'H{row}'].font = Font(bold=True, size=12)
-            ws[f'H{row}'].number_format = 'Rp #,##0'
-            ws[f'H{row}'].fill = PatternFill(start_color="FFFF00", end_color="FFFF00", fill_type="solid")
-            
-            row += 1
-            ws.merge_cells(f'A{row}:G{row}')
-            ws[f'A{row}'] = "TOTAL TRANSAKSI"
-            ws[f'A{row}'].font = Font(bold=True)
-            ws[f'A{row}'].alignment = Alignment(horizontal='right')
-            ws[f'H{row}'] = total_trans
-            ws[f'H{row}'].font = Font(bold=True)
-            ws[f'H{row}'].alignment = Alignment(horizontal='center')
-            
-            # Adjust column widths
-            ws.column_dimensions['A'].width = 5
-            ws.column_dimensions['B'].width = 18
-            ws.column_dimensions['C'].width = 12
-            ws.column_dimensions['D'].width = 10
-            ws.column_dimensions['E'].width = 15
-            ws.column_dimensions['F'].width = 40
-            ws.column_dimensions['G'].width = 12
-            ws.column_dimensions['H'].width = 15
+            # (label rata kanan di kolom G, teks meluber ke kolom kosong di kirinya)
+            ws.append([])
+            ws.append([None] * 6 + [
+                cell("TOTAL PEMASUKAN", Font(bold=True, size=12), right),
+                cell(total_income, Font(bold=True, size=12), number_format='Rp #,##0',
+                     fill=PatternFill(start_color="FFFF00", end_color="FFFF00", fill_type="solid"))
+            ])
+            ws.append([None] * 6 + [
+                cell("TOTAL TRANSAKSI", Font(bold=True), right),
+                cell(total_trans, Font(bold=True), center)
+            ])
             
             # Save file
             filename = f"laporan_transaksi_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
@@ -1795,9 +1862,7 @@ class KedaiHaunaApp:
             
             # Summary stats - Convert Decimal to float
             y -= 30
-            total_income = sum(float(t["total"]) if hasattr(t["total"], '__float__') else t["total"] for t in self.transactions)
-            total_trans = len(self.transactions)
-            avg_trans = total_income / total_trans if total_trans > 0 else 0
+            total_income, total_trans, avg_trans = self.report_totals()
             
             c.setFont("Helvetica-Bold", 11)
             c.drawString(40, y, f"Total Pemasukan: Rp {total_income:,.0f}")
@@ -1825,7 +1890,7 @@ class KedaiHaunaApp:
                 'ewallet': 'E-Wallet', 'qris': 'QRIS', 'transfer': 'Transfer'
             }
             
-            for idx, trans in enumerate(reversed(self.transactions), 1):
+            for idx, trans in enumerate(self.iter_report_transactions(), 1):
                 if y < 60:  # New page if needed
                     c.showPage()
                     y = height - 40
@@ -1885,41 +1950,111 @@ class KedaiHaunaApp:
         tk.Label(card, text=value, font=("Arial", 16, "bold"), bg=self.colors['bg_card'],
                 fg="white").pack(pady=8)
     
-    def load_transactions(self):
-        """Load transactions from database or JSON fallback"""
+    def open_local_store(self):
+        """Open the local backup: one segment per day, older days compressed.
+
+        Riwayat (database atau lokal) dibaca per halaman (lihat load_history_page),
+        jadi startup tidak lagi memuat seluruh riwayat.
+        """
+        try:
+            return SegmentedTransactionStore(
+                os.environ.get('KEDAI_BACKUP_DIR', 'backup'),
+                compression=os.environ.get('KEDAI_BACKUP_COMPRESSION', 'gzip'),
+                retention_days=int(os.environ.get('KEDAI_BACKUP_RETENTION_DAYS', '0')))
+        except (OSError, ValueError) as e:
+            print(f"Error opening local backup: {e}")
+            return None
+    
+    def connect_outbox_db(self):
+        """Open the outbox worker's own database connection, None while offline"""
+        db = create_database()
+        return db if db.connect() else None
+    
+    def iter_report_transactions(self):
+        """Transactions for reports, streamed from the database if available"""
+        if self.db:
+            return iter_transactions(self.db)
+        return self.local_store.iter_newest() if self.local_store else iter(())
+    
+    def report_totals(self):
+        """Return (total income, transaction count, average) for reports"""
+        if self.db:
+            stats = get_transaction_stats(self.db)
+            if stats:
+                return float(stats['total_income']), int(stats['total_transactions']), float(stats['avg_transaction'])
+        total_income, total_trans = self.local_store.totals() if self.local_store else (0.0, 0)
+        return total_income, total_trans, total_income / total_trans if total_trans > 0 else 0
+    
+    def load_history_page(self, cursor=None, **filters):
+        """Load one page of history: (transactions, next_cursor)"""
         if self.db:
             try:
-                return get_all_transactions(self.db)
+                return get_transactions_page(self.db, self.history_page_size, cursor, **filters)
             except Exception as e:
                 print(f"Error loading from database: {e}")
-                messagebox.showwarning("Database Warning", 
-                                     "Gagal load dari database, menggunakan JSON backup")
-        
-        # Fallback to JSON
-        if os.path.exists("transactions.json"):
-            with open("transactions.json", "r") as f:
-                return json.load(f)
-        return []
+        if self.local_store:
+            return self.local_store.page(self.history_page_size, cursor, **filters)
+        return [], None
     
-    def save_transactions(self):
-        """Save transactions to JSON as backup"""
+    def persist_transaction(self, transaction):
+        """Write one checkout to the local backup and the outbox (worker thread).
+
+        Returns the number of transactions still waiting for the database;
+        raises PersistenceError naming the writes that failed.
+        """
+        failed = []
+        try:
+            self.save_transaction_backup(transaction)  # Backup lokal per hari (folder backup/)
+        except Exception as e:
+            failed.append(('backup', e))
         try:
-            # Convert Decimal to float for JSON serialization
-            def convert_decimal(obj):
-                if hasattr(obj, '__float__'):
-                    return float(obj)
-                elif isinstance(obj, dict):
-                    return {k: convert_decimal(v) for k, v in obj.items()}
-                elif isinstance(obj, list):
-                    return [convert_decimal(item) for item in obj]
-                return obj
-            
-            transactions_json = convert_decimal(self.transactions)
-            
-            with open("transactions.json", "w") as f:
-                json.dump(transactions_json, f, indent=2)
+            self.outbox.submit(transaction.to_dict())  # ke database lewat outbox (tidak menunggu jaringan)
         except Exception as e:
-            print(f"Error saving to JSON: {e}")
+            failed.append(('outbox', e))
+        if failed:
+            raise PersistenceError(failed)
+        return self.outbox.metrics()['pending']
+    
+    def poll_persistence(self):
+        """Show results of finished background writes, then poll again"""
+        for transaction_id, waiting, error in self.persistence.poll():
+            failed = error.targets if isinstance(error, PersistenceError) else ['backup', 'outbox']
+            if error is None:
+                if waiting > 1:
+                    self.show_notification(f"✓ Transaksi tersimpan, {waiting} menunggu sinkron ke database",
+                                           duration=2000, type="success")
+                else:
+                    self.show_notification("✓ Transaksi tersimpan", duration=2000, type="success")
+            elif len(failed) > 1:
+                self.show_notification(f"✗ Transaksi {transaction_id} GAGAL disimpan (backup lokal dan "
+                                       f"antrean database), catat manual!", duration=5000, type="error")
+            elif 'backup' in failed:
+                self.show_notification(f"⚠ Backup lokal transaksi {transaction_id} gagal, "
+                                       f"transaksi tetap masuk antrean database", duration=3000, type="error")
+            else:
+                self.show_notification(f"⚠ Transaksi {transaction_id} hanya tersimpan di backup lokal, "
+                                       f"gagal masuk antrean database", duration=3000, type="error")
+        self.update_persist_status()
+        self.root.after(200, self.poll_persistence)
+    
+    def update_persist_status(self):
+        """Update the sidebar indicator of pending writes"""
+        saving = self.persistence.pending
+        waiting = self.outbox.metrics()['pending']
+        if saving:
+            text, color = f"⏳ Menyimpan {saving} transaksi...", "#FFA500"
+        elif waiting:
+            text, color = f"☁ {waiting} menunggu sinkron ke database", "#FFA500"
+        else:
+            text, color = "✓ Semua tersimpan", self.colors['text_gray']
+        if self.persist_status.cget("text") != text:
+            self.persist_status.config(text=text, fg=color)
+    
+    def save_transaction_backup(self, transaction):
+        """Append one transaction to the local backup (amounts as whole rupiah)"""
+        if not self.local_store:
+            raise OSError("Backup lokal tidak tersedia")
+        self.local_store.append(transaction)
 
 if __name__ == "__main__":
     root = tk.Tk()
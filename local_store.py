@@ -0,0 +1,586 @@
+# Backup transaksi lokal kasir Kedai Hauna
+# Setiap checkout ditambahkan sebagai satu baris JSON ke transactions.jsonl
+# (append + fsync), jadi biaya simpan tetap kecil berapa pun panjang riwayat,
+# dan crash saat menulis paling banyak memotong baris terakhir.
+# transactions.json (format lama: satu array) dibaca sekali untuk migrasi.
+# TransactionStore menambah index kecil (transactions.jsonl.idx) berisi offset,
+# tanggal, total dan metode per transaksi, sehingga kasir bisa langsung dibuka
+# dan transaksi lama dibaca saat dibutuhkan saja (seek lewat index).
+# SegmentedTransactionStore membagi backup per hari di folder backup/: hari
+# yang sudah lewat dipadatkan dan dikompres (gzip/lzma), dengan manifest.json
+# berisi rentang tanggal dan total per segmen.
+# Transaksi yang dibaca berupa TransactionRecord (records.py), bukan dict.
+
+import gzip
+import json
+import lzma
+import os
+import struct
+import threading
+from array import array
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+from db_config import decode_cursor, encode_cursor, page_transactions
+from records import TransactionRecord, decode_line
+
+JOURNAL_PATH = "transactions.jsonl"
+LEGACY_PATH = "transactions.json"
+
+# Satu entri index: offset, panjang baris, tanggal (YYYYmmddHHMMSS), total, kode metode
+INDEX_ENTRY = struct.Struct("<QIqdB")
+METHOD_CODES = {name: code for code, name in enumerate(('cash', 'debit', 'credit', 'ewallet', 'qris', 'transfer'))}
+OTHER_METHOD = 255
+
+BACKUP_DIR = "backup"
+MANIFEST_NAME = "manifest.json"
+COMPRESSORS = {'gzip': (".gz", gzip.open), 'lzma': (".xz", lzma.open)}
+
+
+def encode_transaction(transaction):
+    """One journal line (with trailing newline) for a transaction dict or record"""
+    return TransactionRecord.from_dict(transaction).encode()
+
+
+def _date_key(date):
+    """'YYYY-mm-dd HH:MM:SS' -> YYYYmmddHHMMSS as an int (0 if missing)"""
+    digits = "".join(ch for ch in str(date or "")[:19] if ch.isdigit())
+    return int(digits.ljust(14, "0")) if digits else 0
+
+
+def _format_date_key(key):
+    """YYYYmmddHHMMSS int -> 'YYYY-mm-dd HH:MM:SS'"""
+    text = f"{key:014d}"
+    return f"{text[:4]}-{text[4:6]}-{text[6:8]} {text[8:10]}:{text[10:12]}:{text[12:14]}"
+
+
+def read_legacy(path=LEGACY_PATH):
+    """Read the old transactions.json array, [] if missing or unreadable"""
+    if not os.path.exists(path):
+        return []
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            transactions = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Error reading {path}: {e}")
+        return []
+    return transactions if isinstance(transactions, list) else []
+
+
+class TransactionJournal:
+    """Append-only JSON-lines backup of local transactions.
+
+    append() writes and fsyncs one line per checkout. On open, a journal
+    left with a partial last line (crash mid-write) is truncated back to
+    the last complete record, and a legacy transactions.json is migrated
+    if no journal exists yet.
+    """
+
+    def __init__(self, path=JOURNAL_PATH, legacy_path=LEGACY_PATH):
+        self.path = path
+        self.legacy_path = legacy_path
+        if os.path.exists(path):
+            self._repair()
+        elif legacy_path and os.path.exists(legacy_path):
+            self._migrate()
+
+    def _repair(self):
+        """Drop a partial last line so the next append starts on a new line"""
+        with open(self.path, "rb+") as f:
+            size = f.seek(0, os.SEEK_END)
+            if size == 0:
+                return
+            f.seek(size - 1)
+            if f.read(1) == b"\n":
+                return
+            # Cari newline terakhir dari belakang
+            end = size
+            while end > 0:
+                start = max(0, end - 65536)
+                f.seek(start)
+                chunk = f.read(end - start)
+                index = chunk.rfind(b"\n")
+                if index != -1:
+                    f.truncate(start + index + 1)
+                    break
+                end = start
+            else:
+                f.truncate(0)
+            print(f"Warning: {self.path} had a partial last record, truncated")
+
+    def _migrate(self):
+        """Write the legacy array as a journal (atomically); the old file is left as is"""
+        transactions = read_legacy(self.legacy_path)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for transaction in transactions:
+                f.write(encode_transaction(transaction))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+    def append(self, transaction):
+        """Durably append one transaction"""
+        line = encode_transaction(transaction)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def __iter__(self):
+        """Yield journaled transactions, oldest first"""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    yield decode_line(line)
+                except (ValueError, KeyError, TypeError):
+                    # Baris terakhir bisa terpotong jika proses mati saat menulis
+                    continue
+
+    def load(self):
+        """Return all transactions, oldest first"""
+        return list(self)
+
+
+class TransactionStore(TransactionJournal):
+    """TransactionJournal with a sidecar index for lazy, random access.
+
+    Opening only reads the index (29 bytes per transaction); records are
+    read from the journal by offset when a page or report needs them.
+    The index is rebuilt from the journal if it is missing, behind or
+    does not match, so only the journal has to be durable.
+    """
+
+    def __init__(self, path=JOURNAL_PATH, legacy_path=LEGACY_PATH):
+        super().__init__(path, legacy_path)
+        self.index_path = path + ".idx"
+        self._lock = threading.Lock()
+        self._offsets = array('Q')
+        self._lengths = array('I')
+        self._dates = array('q')
+        self._totals = array('d')
+        self._methods = bytearray()
+        self._reader = None
+        self._load_index()
+
+    # ----- index -----
+
+    def _load_index(self):
+        journal_size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        data = b""
+        if os.path.exists(self.index_path):
+            with open(self.index_path, "rb") as f:
+                data = f.read()
+        # Entri terakhir bisa terpotong jika proses mati saat menulis index
+        data = data[:len(data) - len(data) % INDEX_ENTRY.size]
+        for entry in INDEX_ENTRY.iter_unpack(data):
+            self._add_entry(*entry)
+
+        index_size = os.path.getsize(self.index_path) if os.path.exists(self.index_path) else -1
+        indexed_end = self._offsets[-1] + self._lengths[-1] if self._offsets else 0
+        if indexed_end > journal_size:
+            # Index tidak cocok dengan journal (mis. journal diganti), bangun ulang
+            self._clear_index()
+            indexed_end = 0
+            index_size = -1
+        if indexed_end < journal_size or len(data) != index_size:
+            self._index_tail(indexed_end)
+
+    def _clear_index(self):
+        del self._offsets[:], self._lengths[:], self._dates[:], self._totals[:], self._methods[:]
+
+    def _index_tail(self, start):
+        """Index journal records from byte offset start and rewrite the index file"""
+        if os.path.exists(self.path):
+            with open(self.path, "rb") as f:
+                f.seek(start)
+                offset = start
+                for line in f:
+                    try:
+                        self._add_entry(offset, len(line), *self._entry_fields(decode_line(line)))
+                    except (ValueError, KeyError, TypeError):
+                        pass
+                    offset += len(line)
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            for entry in zip(self._offsets, self._lengths, self._dates, self._totals, self._methods):
+                f.write(INDEX_ENTRY.pack(*entry))
+        os.replace(tmp_path, self.index_path)
+
+    def _entry_fields(self, transaction):
+        """(date key, total, method code) for the index"""
+        return (_date_key(transaction.get('date')), float(transaction.get('total') or 0),
+                METHOD_CODES.get(transaction.get('payment_method'), OTHER_METHOD))
+
+    def _add_entry(self, offset, length, date, total, method):
+        self._offsets.append(offset)
+        self._lengths.append(length)
+        self._dates.append(date)
+        self._totals.append(total)
+        self._methods.append(method)
+
+    # ----- write -----
+
+    def append(self, transaction):
+        """Durably append one transaction and index it"""
+        line = encode_transaction(transaction).encode("utf-8")
+        fields = self._entry_fields(transaction)
+        with self._lock:
+            with open(self.path, "ab") as f:
+                offset = f.seek(0, os.SEEK_END)
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+            entry = (offset, len(line)) + fields
+            # Index tidak perlu fsync: bisa dibangun ulang dari journal
+            with open(self.index_path, "ab") as f:
+                f.write(INDEX_ENTRY.pack(*entry))
+            self._add_entry(*entry)
+
+    # ----- read -----
+
+    def __len__(self):
+        return len(self._offsets)
+
+    def get(self, position):
+        """Read the transaction at index position (0 = oldest)"""
+        with self._lock:
+            if self._reader is None:
+                self._reader = open(self.path, "rb")
+            self._reader.seek(self._offsets[position])
+            return decode_line(self._reader.read(self._lengths[position]))
+
+    def close(self):
+        with self._lock:
+            if self._reader is not None:
+                self._reader.close()
+                self._reader = None
+
+    def iter_newest(self):
+        """Yield transactions newest first, reading one record at a time"""
+        for position in range(len(self) - 1, -1, -1):
+            yield self.get(position)
+
+    def totals(self):
+        """Return (total income, transaction count) from the index alone"""
+        with self._lock:
+            return sum(self._totals), len(self._totals)
+
+    def date_range(self):
+        """Return (first, last) transaction dates as 'YYYY-mm-dd HH:MM:SS', or (None, None)"""
+        with self._lock:
+            if not self._dates:
+                return None, None
+            return _format_date_key(min(self._dates)), _format_date_key(max(self._dates))
+
+    def page(self, limit=50, cursor=None, date_from=None, date_to=None, payment_method=None):
+        """Same as db_config.page_transactions, reading only the records on the page"""
+        after = decode_cursor(cursor) if cursor else None
+        low = _date_key(date_from) if date_from else None
+        high = _date_key(date_to) + 235959 if date_to else None
+        if after:
+            high = min(high, _date_key(after[0])) if high is not None else _date_key(after[0])
+        code = METHOD_CODES.get(payment_method, OTHER_METHOD) if payment_method else None
+
+        dates, methods = self._dates, self._methods
+        candidates = [position for position in range(len(self))
+                      if (low is None or dates[position] >= low)
+                      and (high is None or dates[position] <= high)
+                      and (code is None or methods[position] == code)]
+        candidates.sort(key=lambda position: dates[position], reverse=True)
+
+        # Urutan sama dengan page_transactions: (tanggal, id) menurun. Transaksi
+        # dengan tanggal sama dibaca bersama supaya bisa diurutkan menurut id.
+        key = lambda t: (t['date'], str(t['id']))
+        selected = []
+        i = 0
+        while i < len(candidates) and len(selected) <= limit:
+            j = i
+            while j < len(candidates) and dates[candidates[j]] == dates[candidates[i]]:
+                j += 1
+            group = [self.get(position) for position in candidates[i:j]]
+            for trans in sorted(group, key=key, reverse=True):
+                if after and key(trans) >= after:
+                    continue
+                if payment_method and trans['payment_method'] != payment_method:
+                    continue
+                selected.append(trans)
+            i = j
+        has_more = len(selected) > limit
+        selected = selected[:limit]
+        return selected, encode_cursor(selected[-1]) if has_more else None
+
+
+def _open_segment(path):
+    """Open a closed segment for reading text, by file suffix"""
+    for suffix, opener in COMPRESSORS.values():
+        if path.endswith(suffix):
+            return opener(path, "rt", encoding="utf-8")
+    return open(path, "r", encoding="utf-8")
+
+
+class SegmentedTransactionStore:
+    """Local backup split into one segment per day.
+
+    Today's segment is an indexed TransactionStore. When the day changes
+    (on the next append, or at start-up) the previous segment is compacted,
+    with duplicate IDs dropped, compressed and recorded in manifest.json with
+    its date range, count and total. Compression runs outside the store lock
+    (readers keep seeing the raw segment until the compressed file is
+    swapped in), so a rotation does not block page() on the UI thread. Range reads only open the segments whose
+    date range overlaps the request. With retention_days set, closed segments
+    older than that are deleted so disk usage stays bounded.
+    """
+
+    def __init__(self, directory=BACKUP_DIR, compression="gzip", retention_days=0,
+                 legacy_paths=(JOURNAL_PATH, LEGACY_PATH)):
+        if compression not in COMPRESSORS:
+            raise ValueError(f"Kompresi tidak dikenal: {compression}")
+        self.directory = directory
+        self.compression = compression
+        self.retention_days = retention_days
+        self.manifest_path = os.path.join(directory, MANIFEST_NAME)
+        self._lock = threading.RLock()
+        self._rotate_lock = threading.Lock()  # satu kompresi segmen pada satu waktu
+        self._cache = OrderedDict()  # segmen tertutup yang terakhir dibaca
+        self._open = None
+        self._open_day = None
+        self._closing = {}  # day -> TransactionStore yang sedang dikompres
+        os.makedirs(directory, exist_ok=True)
+
+        first_run = not os.path.exists(self.manifest_path)
+        self.segments = self._read_manifest()
+        if first_run:
+            self._migrate(legacy_paths)
+        self._recover()
+        if self._open_day and self._open_day < datetime.now().strftime('%Y-%m-%d'):
+            self._close_segment(*self._detach(None))
+
+    # ----- manifest -----
+
+    def _read_manifest(self):
+        if not os.path.exists(self.manifest_path):
+            return []
+        with open(self.manifest_path, "r", encoding="utf-8") as f:
+            return json.load(f).get('segments', [])
+
+    def _write_manifest(self):
+        tmp_path = self.manifest_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({'segments': self.segments}, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.manifest_path)
+
+    def _segment_path(self, day, suffix=""):
+        return os.path.join(self.directory, f"transactions-{day}.jsonl{suffix}")
+
+    # ----- segments -----
+
+    def _recover(self):
+        """Open the newest raw segment; close any older raw ones a crash left behind"""
+        raw_days = sorted(name[len("transactions-"):-len(".jsonl")] for name in os.listdir(self.directory)
+                          if name.startswith("transactions-") and name.endswith(".jsonl"))
+        for day in raw_days[:-1]:
+            self._close_segment(day, TransactionStore(self._segment_path(day), legacy_path=None))
+        if raw_days:
+            self._open_day = raw_days[-1]
+            self._open = TransactionStore(self._segment_path(self._open_day), legacy_path=None)
+
+    def _migrate(self, legacy_paths):
+        """Split an existing single-file backup into day segments (first run only)"""
+        for path in legacy_paths:
+            if not path or not os.path.exists(path):
+                continue
+            if path.endswith(".jsonl"):
+                transactions = TransactionJournal(path, legacy_path=None).load()
+            else:
+                transactions = read_legacy(path)
+            by_day = {}
+            for transaction in transactions:
+                by_day.setdefault(str(transaction.get('date') or "")[:10] or "0000-00-00", []).append(transaction)
+            for day, records in sorted(by_day.items()):
+                with open(self._segment_path(day), "w", encoding="utf-8") as f:
+                    f.writelines(encode_transaction(transaction) for transaction in records)
+                    f.flush()
+                    os.fsync(f.fileno())
+            print(f"✓ {len(transactions)} transaksi dari {path} dipindah ke {self.directory}/")
+            break
+        self._write_manifest()
+
+    def _close_segment(self, day, store):
+        """Compact and compress one raw segment and add it to the manifest.
+
+        The compressed file is written without holding the store lock; only
+        the swap (rename, manifest, removing the raw files) takes it.
+        """
+        suffix, opener = COMPRESSORS[self.compression]
+        with self._rotate_lock:
+            first, last = store.date_range()
+            count, total = 0, 0
+            seen = set()
+            path = self._segment_path(day, suffix)
+            with opener(path + ".tmp", "wt", encoding="utf-8") as f:
+                for transaction in store:
+                    transaction_id = str(transaction.get('id'))
+                    if transaction_id in seen:
+                        continue
+                    seen.add(transaction_id)
+                    count += 1
+                    total += transaction['total']
+                    f.write(encode_transaction(transaction))
+
+            with self._lock:
+                os.replace(path + ".tmp", path)
+                self.segments = [seg for seg in self.segments if seg['day'] != day]
+                self.segments.append({'day': day, 'file': os.path.basename(path), 'first': first, 'last': last,
+                                      'count': count, 'total': total, 'bytes': os.path.getsize(path)})
+                self.segments.sort(key=lambda seg: seg['day'])
+                self._cache.pop(os.path.basename(path), None)
+                self._apply_retention()
+                self._write_manifest()
+                self._closing.pop(day, None)
+                store.close()
+                # File mentah baru dihapus setelah manifest berisi segmen terkompresi
+                for raw in (store.path, store.index_path):
+                    if os.path.exists(raw):
+                        os.remove(raw)
+
+    def _apply_retention(self):
+        if not self.retention_days:
+            return
+        cutoff = (datetime.now() - timedelta(days=self.retention_days)).strftime('%Y-%m-%d')
+        for seg in [seg for seg in self.segments if seg['day'] < cutoff]:
+            path = os.path.join(self.directory, seg['file'])
+            if os.path.exists(path):
+                os.remove(path)
+            self._cache.pop(seg['file'], None)
+            self.segments.remove(seg)
+
+    def _detach(self, day):
+        """Start a new open segment for day (None: none yet); return the old (day, store) to close.
+
+        Called with the lock held. The old segment stays readable from
+        _closing until _close_segment has swapped in the compressed file.
+        """
+        closing = (self._open_day, self._open) if self._open is not None else None
+        if closing:
+            self._closing[self._open_day] = self._open
+        self._open_day = day
+        self._open = TransactionStore(self._segment_path(day), legacy_path=None) if day else None
+        return closing
+
+    def _load_segment(self, seg):
+        """All transactions of a closed segment, oldest first (small LRU cache)"""
+        records = self._cache.get(seg['file'])
+        if records is None:
+            records = []
+            with _open_segment(os.path.join(self.directory, seg['file'])) as f:
+                for line in f:
+                    records.append(decode_line(line))
+            self._cache[seg['file']] = records
+            while len(self._cache) > 4:
+                self._cache.popitem(last=False)
+        self._cache.move_to_end(seg['file'])
+        return records
+
+    def _raw_stores(self):
+        stores = list(self._closing.values())
+        if self._open is not None:
+            stores.append(self._open)
+        return stores
+
+    def _ranges(self):
+        """[(first, last, manifest entry or raw TransactionStore)], newest first"""
+        ranges = [(seg['first'], seg['last'], seg) for seg in self.segments if seg['count']]
+        for store in self._raw_stores():
+            if len(store):
+                first, last = store.date_range()
+                ranges.append((first, last, store))
+        return sorted(ranges, key=lambda r: r[1] or "", reverse=True)
+
+    def _segment_records(self, seg):
+        """All transactions of a range entry, oldest first (called with the lock held)"""
+        if isinstance(seg, TransactionStore):
+            if any(seg is store for store in self._raw_stores()):
+                return list(seg)
+            # Sudah dikompres sejak _ranges() dibaca: pakai entri manifest-nya
+            day = os.path.basename(seg.path)[len("transactions-"):-len(".jsonl")]
+            seg = next((entry for entry in self.segments if entry['day'] == day), None)
+            if seg is None:
+                return []
+        if seg not in self.segments:
+            return []  # dihapus oleh retensi
+        return self._load_segment(seg)
+
+    # ----- write -----
+
+    def append(self, transaction):
+        """Durably append one transaction to its day's segment"""
+        day = str(transaction.get('date') or datetime.now().strftime('%Y-%m-%d'))[:10]
+        closing = None
+        with self._lock:
+            # Hari baru -> segmen kemarin ditutup. Transaksi bertanggal lebih lama
+            # (mis. jam mundur) tetap masuk segmen terbuka; rentang di manifest ikut.
+            if self._open is None or day > self._open_day:
+                closing = self._detach(day)
+            self._open.append(transaction)
+        if closing:
+            self._close_segment(*closing)
+
+    # ----- read -----
+
+    def __len__(self):
+        with self._lock:
+            return sum(seg['count'] for seg in self.segments) + sum(len(store) for store in self._raw_stores())
+
+    def totals(self):
+        """Return (total income, transaction count) from the manifest and the raw segments' index"""
+        with self._lock:
+            income = sum(seg['total'] for seg in self.segments)
+            count = sum(seg['count'] for seg in self.segments)
+            for store in self._raw_stores():
+                raw_income, raw_count = store.totals()
+                income += raw_income
+                count += raw_count
+            return income, count
+
+    def iter_newest(self):
+        """Yield transactions newest first, one segment at a time (each read under the lock)"""
+        with self._lock:
+            ranges = self._ranges()
+        for first, last, seg in ranges:
+            with self._lock:
+                records = self._segment_records(seg)
+            yield from reversed(records)
+
+    def page(self, limit=50, cursor=None, date_from=None, date_to=None, payment_method=None):
+        """Same as db_config.page_transactions, opening only overlapping segments"""
+        after = decode_cursor(cursor)[0] if cursor else None
+        key = lambda t: (t['date'], str(t['id']))
+        filters = dict(date_from=date_from, date_to=date_to, payment_method=payment_method)
+        selected = []
+        with self._lock:
+            for first, last, seg in self._ranges():
+                if (date_from and last[:10] < date_from) or (date_to and first[:10] > date_to) \
+                        or (after and first > after):
+                    continue
+                # Segmen diurutkan dari yang terbaru; berhenti jika segmen ini
+                # tidak mungkin berisi transaksi yang masuk halaman
+                if len(selected) > limit and last < selected[limit]['date']:
+                    break
+                if isinstance(seg, TransactionStore):
+                    rows, _ = seg.page(limit + 1, cursor, **filters)
+                else:
+                    rows, _ = page_transactions(self._load_segment(seg), limit + 1, cursor, **filters)
+                selected = sorted(selected + rows, key=key, reverse=True)[:limit + 1]
+        has_more = len(selected) > limit
+        selected = selected[:limit]
+        return selected, encode_cursor(selected[-1]) if has_more else None
+
+    def close(self):
+        with self._lock:
+            if self._open is not None:
+                self._open.close()
@@ -0,0 +1,68 @@
+# Katalog menu Kedai Hauna: index per id + JSON yang sudah di-encode
+# Index dan cache hanya dibangun ulang saat menu berubah.
+
+import hashlib
+import json
+import threading
+
+
+class MenuCatalog:
+    """Menu items with an id index, pre-encoded JSON and a content hash.
+
+    Everything derived from the menu is rebuilt in set_items(), so the
+    hot paths (lookup by id, serving /api/menu) never re-scan or re-encode.
+    """
+
+    def __init__(self, items=None):
+        self._lock = threading.Lock()
+        self._page_cache = {}
+        self.set_items(items or [])
+
+    def set_items(self, items):
+        """Replace the menu and rebuild the index, JSON bytes and ETag"""
+        items = [dict(item) for item in items]
+        json_bytes = json.dumps(items, separators=(',', ':')).encode('utf-8')
+        etag = hashlib.sha256(json_bytes).hexdigest()[:32]
+
+        with self._lock:
+            self.items = items
+            self.by_id = {item['id']: item for item in items}
+            self.json_bytes = json_bytes
+            self.etag = etag
+            self._page_cache = {}
+
+    def get(self, item_id):
+        """Return the menu item for item_id, or None"""
+        return self.by_id.get(item_id)
+
+    def render_cached(self, key, render):
+        """Return (page bytes, ETag) for key, rendering once per menu version"""
+        cache, items = self._page_cache, self.items
+        cached = cache.get(key)
+        if cached is None:
+            page = render(items)
+            if isinstance(page, str):
+                page = page.encode('utf-8')
+            cached = (page, hashlib.sha256(page).hexdigest()[:32])
+            with self._lock:
+                cache[key] = cached
+        return cached
+
+    async def render_cached_async(self, key, render):
+        """Async variant of render_cached() for the ASGI app"""
+        cache, items = self._page_cache, self.items
+        cached = cache.get(key)
+        if cached is None:
+            page = await render(items)
+            if isinstance(page, str):
+                page = page.encode('utf-8')
+            cached = (page, hashlib.sha256(page).hexdigest()[:32])
+            with self._lock:
+                cache[key] = cached
+        return cached
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
@@ -0,0 +1,198 @@
+# Instrumentasi request untuk web app Kedai Hauna
+# Mencatat jumlah request, histogram latency, ukuran response, ukuran cookie
+# session dan waktu query DB per route, lalu diekspos di /metrics
+# (format teks Prometheus).
+
+import bisect
+import contextvars
+import threading
+import time
+
+from flask import Response
+
+import db_config
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+SIZE_BUCKETS = (64, 256, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+
+def _format_labels(names, values, extra=""):
+    parts = [f'{name}="{value}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Counter:
+    """Monotonic counter with labels"""
+
+    def __init__(self, name, help_text, label_names=()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels=(), amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.label_names, labels)} {value}")
+        return lines
+
+
+class Histogram:
+    """Fixed-bucket histogram with labels (cumulative buckets on render)"""
+
+    def __init__(self, name, help_text, label_names=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, labels=()):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                # [jumlah per bucket..., +Inf], sum
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = [(labels, list(counts), total) for labels, (counts, total) in self._series.items()]
+        for labels, counts, total in sorted(snapshot):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                le_label = f'le="{le}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.label_names, labels, le_label)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.label_names, labels)} {total}")
+            lines.append(f"{self.name}_count{_format_labels(self.label_names, labels)} {cumulative}")
+        return lines
+
+
+class Metrics:
+    """Per-route request metrics plus DB timing, exposed in Prometheus format"""
+
+    def __init__(self):
+        self.requests = Counter("kedai_http_requests_total", "Jumlah request HTTP",
+                                ("route", "method", "status"))
+        self.latency = Histogram("kedai_http_request_duration_seconds", "Latency request HTTP",
+                                 ("route", "method"))
+        self.response_size = Histogram("kedai_http_response_size_bytes", "Ukuran body response",
+                                       ("route", "method"), SIZE_BUCKETS)
+        self.cookie_size = Histogram("kedai_http_session_cookie_bytes",
+                                     "Ukuran cookie session (request dan Set-Cookie)",
+                                     ("route", "direction"), SIZE_BUCKETS)
+        self.db_time = Histogram("kedai_db_query_duration_seconds", "Durasi query database", ("kind",))
+        self.request_db_time = Histogram("kedai_http_request_db_seconds",
+                                         "Total waktu query database per request", ("route",))
+        self.collectors = []
+        # [start, db_seconds] request yang sedang berjalan; ContextVar (bukan
+        # threading.local) supaya juga benar untuk request async di satu thread
+        self._current = contextvars.ContextVar("kedai_metrics_request", default=None)
+
+    def observe_query(self, kind, query, elapsed, rows, **extra):
+        """db_config query observer"""
+        self.db_time.observe(elapsed, (kind,))
+        current = self._current.get()
+        if current is not None:
+            current[1] += elapsed
+
+    def add_collector(self, name, help_text, collect):
+        """Register a gauge source: collect() returns {label_value: number} or a number"""
+        self.collectors.append((name, help_text, collect))
+
+    def init_app(self, app, cookie_name="session"):
+        """Install request hooks and the /metrics route on a Flask app"""
+        from flask import request, request_finished
+        self._observe_queries()
+
+        @app.before_request
+        def start_timer():
+            self._current.set([time.perf_counter(), 0.0])
+
+        # request_finished dikirim setelah session disimpan, jadi Set-Cookie sudah ada
+        def record(sender, response, **extra):
+            self._record(request, response, cookie_name)
+
+        request_finished.connect(record, app, weak=False)
+
+        @app.route('/metrics')
+        def metrics_endpoint():
+            return Response(self.render(), mimetype="text/plain; version=0.0.4")
+
+    def init_quart_app(self, app, cookie_name="session"):
+        """Same as init_app, for the Quart app in asgi_app.py"""
+        from quart import Response as QuartResponse, request
+        from quart.signals import request_finished
+        self._observe_queries()
+
+        # Hook async supaya berjalan di context task request (bukan di thread pool)
+        @app.before_request
+        async def start_timer():
+            self._current.set([time.perf_counter(), 0.0])
+
+        async def record(sender, response, **extra):
+            self._record(request, response, cookie_name)
+
+        request_finished.connect(record, app, weak=False)
+
+        @app.route('/metrics')
+        async def metrics_endpoint():
+            return QuartResponse(self.render(), mimetype="text/plain; version=0.0.4")
+
+    def _observe_queries(self):
+        if self.observe_query not in db_config.query_observers:
+            db_config.query_observers.append(self.observe_query)
+
+    def _record(self, request, response, cookie_name):
+        current = self._current.get()
+        if current is None:
+            return
+        start, db_seconds = current
+        elapsed = time.perf_counter() - start
+        route = request.url_rule.rule if request.url_rule else "unmatched"
+        method = request.method
+
+        self.requests.inc((route, method, str(response.status_code)))
+        self.latency.observe(elapsed, (route, method))
+        if response.content_length is not None:
+            self.response_size.observe(response.content_length, (route, method))
+
+        incoming = request.cookies.get(cookie_name)
+        if incoming:
+            self.cookie_size.observe(len(incoming), (route, "request"))
+        for header in response.headers.getlist("Set-Cookie"):
+            if header.startswith(cookie_name + "="):
+                self.cookie_size.observe(len(header), (route, "response"))
+
+        self.request_db_time.observe(db_seconds, (route,))
+        self._current.set(None)
+
+    def render(self):
+        lines = []
+        for metric in (self.requests, self.latency, self.response_size, self.cookie_size,
+                       self.db_time, self.request_db_time):
+            lines.extend(metric.render())
+        for name, help_text, collect in self.collectors:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} gauge")
+            values = collect()
+            if isinstance(values, dict):
+                for key, value in sorted(values.items()):
+                    lines.append(f'{name}{{name="{key}"}} {value}')
+            else:
+                lines.append(f"{name} {values}")
+        return "\n".join(lines) + "\n"
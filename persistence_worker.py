@@ -0,0 +1,79 @@
+# Worker penyimpanan untuk kasir Tkinter
+# Tkinter hanya boleh disentuh dari main thread, jadi penulisan ke disk dan
+# outbox dijalankan di thread ini dan hasilnya diambil main thread lewat
+# poll() (dipanggil berkala dengan root.after).
+
+import queue
+import threading
+
+
+class PersistenceError(Exception):
+    """Raised by a job when some of its writes failed.
+
+    failed is a list of (target, error); targets not listed were saved.
+    """
+
+    def __init__(self, failed):
+        super().__init__(", ".join(f"{target}: {error}" for target, error in failed))
+        self.failed = failed
+
+    @property
+    def targets(self):
+        return [target for target, _ in self.failed]
+
+
+class PersistenceWorker:
+    """Run persistence jobs in order on a background thread.
+
+    submit(func, *args, tag=...) returns immediately. Each finished job is
+    reported once by poll() as (tag, result, error), where error is None
+    on success.
+    """
+
+    def __init__(self, name="persistence-worker"):
+        self._jobs = queue.Queue()
+        self._results = queue.Queue()
+        self._pending = 0
+        self._pending_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def submit(self, func, *args, tag=None):
+        with self._pending_lock:
+            self._pending += 1
+        self._jobs.put((tag, func, args))
+
+    @property
+    def pending(self):
+        """Jobs submitted but not yet finished"""
+        with self._pending_lock:
+            return self._pending
+
+    def poll(self):
+        """Return finished jobs as [(tag, result, error)] without blocking"""
+        finished = []
+        while True:
+            try:
+                finished.append(self._results.get_nowait())
+            except queue.Empty:
+                return finished
+
+    def stop(self, timeout=10):
+        """Finish queued jobs and stop the thread"""
+        self._jobs.put(None)
+        self._thread.join(timeout)
+
+    def _run(self):
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                return
+            tag, func, args = job
+            try:
+                result, error = func(*args), None
+            except Exception as e:
+                print(f"Error in persistence job {tag}: {e}")
+                result, error = None, e
+            with self._pending_lock:
+                self._pending -= 1
+            self._results.put((tag, result, error))
@@ -0,0 +1,226 @@
+# Profiling query database Kedai Hauna
+# Mencatat latency, jumlah baris dan jumlah panggilan per statement (lewat
+# db_config.query_observers), histogram latency bergulir, serta log query
+# lambat (JSON lines) dengan nilai parameter disamarkan.
+#
+# Aktifkan dengan KEDAI_QUERY_PROFILE=query_profile.json (lihat install_from_env),
+# lalu lihat ringkasannya dengan:
+#
+#   python query_report.py --top 20
+
+import atexit
+import bisect
+import json
+import os
+import re
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+import db_config
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+WHITESPACE_RE = re.compile(r"\s+")
+# (%s, %s, ...) dan VALUES (...), (...) dengan jumlah berbeda dihitung satu statement
+PLACEHOLDER_LIST_RE = re.compile(r"\(\s*%s(?:\s*,\s*%s)+\s*\)")
+VALUES_LIST_RE = re.compile(r"(\([^()]*\))(?:\s*,\s*\1)+")
+
+
+def normalize_query(query):
+    """Statement key: whitespace collapsed and variable-length lists folded"""
+    query = WHITESPACE_RE.sub(" ", query).strip()
+    query = PLACEHOLDER_LIST_RE.sub("(%s, ...)", query)
+    return VALUES_LIST_RE.sub(r"\1, ...", query)
+
+
+def redact_params(params):
+    """Replace parameter values by their type names, e.g. ['str', 'int']"""
+    if params is None:
+        return None
+    if isinstance(params, dict):
+        return {key: type(value).__name__ for key, value in params.items()}
+    redacted = [type(value).__name__ for value in list(params)[:20]]
+    if len(params) > 20:
+        redacted.append(f"... {len(params) - 20} lagi")
+    return redacted
+
+
+def redact_error(error):
+    """Error class and errno/sqlstate only; the driver message can quote row values"""
+    redacted = {'type': type(error).__name__}
+    for attr in ('errno', 'sqlstate'):
+        value = getattr(error, attr, None)
+        if value is not None:
+            redacted[attr] = value
+    return redacted
+
+
+class StatementStats:
+    """Counters and a rolling latency window for one statement"""
+
+    __slots__ = ('kind', 'calls', 'errors', 'rows', 'total', 'max', 'buckets', 'recent')
+
+    def __init__(self, kind, window):
+        self.kind = kind
+        self.calls = 0
+        self.errors = 0
+        self.rows = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.recent = deque(maxlen=window)
+
+    def add(self, elapsed, rows, error):
+        self.calls += 1
+        self.rows += rows
+        self.total += elapsed
+        self.max = max(self.max, elapsed)
+        self.buckets[bisect.bisect_left(LATENCY_BUCKETS, elapsed)] += 1
+        self.recent.append(elapsed)
+        if error is not None:
+            self.errors += 1
+
+    def percentile(self, pct):
+        """Latency percentile over the rolling window"""
+        if not self.recent:
+            return 0.0
+        values = sorted(self.recent)
+        return values[min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))]
+
+    def to_dict(self):
+        return {
+            'kind': self.kind,
+            'calls': self.calls,
+            'errors': self.errors,
+            'rows': self.rows,
+            'total_ms': round(self.total * 1000, 3),
+            'mean_ms': round(self.total * 1000 / self.calls, 3) if self.calls else 0.0,
+            'max_ms': round(self.max * 1000, 3),
+            'p50_ms': round(self.percentile(50) * 1000, 3),
+            'p95_ms': round(self.percentile(95) * 1000, 3),
+            'p99_ms': round(self.percentile(99) * 1000, 3),
+            'buckets': dict(zip([repr(b) for b in LATENCY_BUCKETS] + ['+Inf'], self.buckets)),
+        }
+
+
+class QueryProfiler:
+    """Per-statement query statistics plus a slow-query log.
+
+    Register with install(). Queries slower than slow_threshold seconds
+    (or failing) are appended to slow_log_path with parameters redacted.
+    Statistics are written to profile_path by save(), every save_interval
+    seconds and at exit.
+    """
+
+    def __init__(self, profile_path=None, slow_log_path="slow_queries.log", slow_threshold=0.2,
+                 window=1000, save_interval=60.0):
+        self.profile_path = profile_path
+        self.slow_log_path = slow_log_path
+        self.slow_threshold = slow_threshold
+        self.window = window
+        self.save_interval = save_interval
+        self.started_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        self._statements = {}
+        self._lock = threading.Lock()
+        self._log_lock = threading.Lock()
+        self._last_save = time.monotonic()
+
+    def install(self):
+        """Start observing db_config queries"""
+        db_config.query_observers.append(self.observe)
+        if self.profile_path:
+            atexit.register(self.save)
+        return self
+
+    def uninstall(self):
+        if self.observe in db_config.query_observers:
+            db_config.query_observers.remove(self.observe)
+
+    def observe(self, kind, query, elapsed, rows, params=None, error=None, **extra):
+        """db_config query observer"""
+        key = normalize_query(query)
+        with self._lock:
+            stats = self._statements.get(key)
+            if stats is None:
+                stats = self._statements[key] = StatementStats(kind, self.window)
+            stats.add(elapsed, rows, error)
+
+        if self.slow_log_path and (elapsed >= self.slow_threshold or error is not None):
+            self._log_slow(kind, key, elapsed, rows, params, error)
+
+        if self.profile_path and time.monotonic() - self._last_save >= self.save_interval:
+            self._last_save = time.monotonic()
+            self.save()
+
+    def _log_slow(self, kind, query, elapsed, rows, params, error):
+        entry = {
+            'time': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'kind': kind,
+            'elapsed_ms': round(elapsed * 1000, 3),
+            'rows': rows,
+            'query': query,
+            'params': redact_params(params),
+        }
+        if error is not None:
+            entry['error'] = redact_error(error)
+        try:
+            with self._log_lock, open(self.slow_log_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+        except OSError as e:
+            print(f"Error writing slow query log: {e}")
+
+    def snapshot(self):
+        """Return {statement: stats dict}"""
+        with self._lock:
+            return {query: stats.to_dict() for query, stats in self._statements.items()}
+
+    def top(self, n=20, key='total_ms'):
+        """The n statements with the highest key (default: total time)"""
+        return top_statements(self.snapshot(), n, key)
+
+    def reset(self):
+        with self._lock:
+            self._statements.clear()
+
+    def save(self, path=None):
+        """Write the statistics to a JSON file (atomically)"""
+        path = path or self.profile_path
+        if not path:
+            return False
+        data = {
+            'started_at': self.started_at,
+            'saved_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'statements': self.snapshot(),
+        }
+        try:
+            tmp_path = path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2)
+            os.replace(tmp_path, path)
+            return True
+        except OSError as e:
+            print(f"Error saving query profile: {e}")
+            return False
+
+
+def top_statements(statements, n=20, key='total_ms'):
+    """Sort a {statement: stats dict} mapping, returning [(statement, stats)]"""
+    return sorted(statements.items(), key=lambda item: item[1][key], reverse=True)[:n]
+
+
+def install_from_env():
+    """Install a profiler if KEDAI_QUERY_PROFILE is set, else return None.
+
+    KEDAI_SLOW_QUERY_MS (default 200) and KEDAI_SLOW_QUERY_LOG
+    (default slow_queries.log) configure the slow-query log.
+    """
+    profile_path = os.environ.get('KEDAI_QUERY_PROFILE')
+    if not profile_path:
+        return None
+    return QueryProfiler(
+        profile_path,
+        slow_log_path=os.environ.get('KEDAI_SLOW_QUERY_LOG', 'slow_queries.log'),
+        slow_threshold=float(os.environ.get('KEDAI_SLOW_QUERY_MS', '200')) / 1000,
+    ).install()
@@ -0,0 +1,79 @@
+# Ringkasan profil query database: statement teratas menurut total waktu
+# (dari file KEDAI_QUERY_PROFILE) dan statement yang paling sering masuk
+# log query lambat.
+#
+#   python query_report.py --profile query_profile.json --top 20
+#   python query_report.py --sort p95_ms
+
+import argparse
+import json
+import os
+import sys
+
+from query_profiler import top_statements
+
+
+def shorten(query, width):
+    return query if len(query) <= width else query[:width - 3] + "..."
+
+
+def print_profile(path, top, sort_key, width):
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    statements = data.get('statements', {})
+    total_ms = sum(stats['total_ms'] for stats in statements.values()) or 1.0
+    print(f"Profil {path} ({data.get('started_at')} s/d {data.get('saved_at')}), "
+          f"{len(statements)} statement")
+    print(f"{'Total ms':>10} {'%':>5} {'Panggilan':>9} {'Rata2':>8} {'p95':>8} {'Maks':>8} "
+          f"{'Baris':>8} {'Error':>5}  Statement")
+    for query, stats in top_statements(statements, top, sort_key):
+        print(f"{stats['total_ms']:>10.1f} {stats['total_ms'] * 100 / total_ms:>5.1f} {stats['calls']:>9} "
+              f"{stats['mean_ms']:>8.2f} {stats['p95_ms']:>8.2f} {stats['max_ms']:>8.2f} "
+              f"{stats['rows']:>8} {stats['errors']:>5}  {shorten(query, width)}")
+
+
+def print_slow_log(path, top, width):
+    slow = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue  # baris terakhir bisa terpotong
+            stats = slow.setdefault(entry['query'], {'count': 0, 'total_ms': 0.0, 'max_ms': 0.0, 'errors': 0})
+            stats['count'] += 1
+            stats['total_ms'] += entry['elapsed_ms']
+            stats['max_ms'] = max(stats['max_ms'], entry['elapsed_ms'])
+            stats['errors'] += 1 if 'error' in entry else 0
+    print(f"\nLog query lambat {path}, {sum(s['count'] for s in slow.values())} entri")
+    print(f"{'Total ms':>10} {'Jumlah':>7} {'Maks':>8} {'Error':>5}  Statement")
+    for query, stats in top_statements(slow, top):
+        print(f"{stats['total_ms']:>10.1f} {stats['count']:>7} {stats['max_ms']:>8.2f} "
+              f"{stats['errors']:>5}  {shorten(query, width)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize the query profile and slow-query log")
+    parser.add_argument("--profile", default=os.environ.get('KEDAI_QUERY_PROFILE', 'query_profile.json'))
+    parser.add_argument("--slow-log", default=os.environ.get('KEDAI_SLOW_QUERY_LOG', 'slow_queries.log'))
+    parser.add_argument("--top", type=int, default=20, help="Jumlah statement yang ditampilkan")
+    parser.add_argument("--sort", default="total_ms",
+                        choices=["total_ms", "calls", "mean_ms", "p95_ms", "max_ms", "rows", "errors"])
+    parser.add_argument("--width", type=int, default=100, help="Lebar maksimum teks statement")
+    args = parser.parse_args()
+
+    found = False
+    if os.path.exists(args.profile):
+        print_profile(args.profile, args.top, args.sort, args.width)
+        found = True
+    if os.path.exists(args.slow_log):
+        print_slow_log(args.slow_log, args.top, args.width)
+        found = True
+    if not found:
+        print(f"Tidak ada {args.profile} atau {args.slow_log}; jalankan aplikasi dengan KEDAI_QUERY_PROFILE")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,29 @@
+# Hitung ulang tabel ringkasan harian (daily_sales_summary, daily_item_summary)
+# dari tabel transactions. Jalankan sekali setelah upgrade, atau jika ringkasan
+# tidak cocok lagi dengan data transaksi. Sebaiknya saat kasir tidak dipakai.
+#
+#   python rebuild_summary.py
+
+import sys
+
+from db_config import create_database, rebuild_daily_summary, get_transaction_stats
+
+
+def main():
+    db = create_database()
+    if not db.connect():
+        print("Tidak dapat terhubung ke database")
+        return 1
+    try:
+        if not rebuild_daily_summary(db):
+            return 1
+        stats = get_transaction_stats(db)
+        print(f"✓ Ringkasan harian dibangun ulang: {stats['total_transactions']} transaksi, "
+              f"total Rp {stats['total_income']:,.0f}")
+        return 0
+    finally:
+        db.disconnect()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,134 @@
+# Record transaksi ringkas untuk kasir Kedai Hauna
+# Pengganti dict bertingkat: __slots__ (tanpa __dict__ per objek), nominal
+# dalam rupiah bulat (int, bukan float/Decimal), dan nama item, varian,
+# metode pembayaran serta nama pelanggan di-intern sehingga ribuan transaksi
+# berbagi satu objek string yang sama.
+# Satu baris backup = array JSON ringkas (lihat TransactionRecord.encode);
+# baris lama berbentuk objek JSON tetap bisa dibaca (decode_line).
+
+import json
+import sys
+
+_intern = sys.intern
+
+
+def rupiah(value):
+    """Amount as whole rupiah (int), from int, float, Decimal or str"""
+    if isinstance(value, int):
+        return value
+    return int(round(float(value or 0)))
+
+
+class ItemRecord:
+    """One cart line; supports item['name'] / item.get('variant') like the old dicts"""
+
+    __slots__ = ('id', 'name', 'variant', 'price', 'quantity')
+
+    def __init__(self, id, name, variant, price, quantity):
+        self.id = id
+        self.name = _intern(name)
+        self.variant = _intern(variant or "")
+        self.price = rupiah(price)
+        self.quantity = int(quantity)
+
+    @property
+    def item_key(self):
+        return f"{self.id}_{self.variant}"
+
+    @property
+    def subtotal(self):
+        return self.price * self.quantity
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except (AttributeError, TypeError):
+            raise KeyError(key)
+
+    def get(self, key, default=None):
+        return getattr(self, key, default)
+
+    def __eq__(self, other):
+        return isinstance(other, ItemRecord) and self.to_tuple() == other.to_tuple()
+
+    # Atribut bisa diubah (dan sama seperti dict lama), jadi sengaja tidak hashable:
+    # pakai id transaksi atau item_key sebagai key set/dict
+    __hash__ = None
+
+    def to_tuple(self):
+        return (self.id, self.name, self.variant, self.price, self.quantity)
+
+    def to_dict(self):
+        return {'id': self.id, 'item_key': self.item_key, 'name': self.name, 'price': self.price,
+                'quantity': self.quantity, 'variant': self.variant}
+
+    @classmethod
+    def from_dict(cls, item):
+        return cls(item['id'], item['name'], item.get('variant'), item['price'], item['quantity'])
+
+
+class TransactionRecord:
+    """One transaction; supports trans['total'] / trans.get('customer_name') like the old dicts"""
+
+    __slots__ = ('id', 'date', 'total', 'payment_method', 'customer_name', 'items')
+
+    def __init__(self, id, date, total, payment_method, customer_name, items):
+        self.id = str(id)
+        self.date = str(date or "")
+        self.total = rupiah(total)
+        self.payment_method = _intern(payment_method)
+        self.customer_name = _intern(customer_name or "Umum")
+        self.items = items
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except (AttributeError, TypeError):
+            raise KeyError(key)
+
+    def get(self, key, default=None):
+        return getattr(self, key, default)
+
+    def __eq__(self, other):
+        return isinstance(other, TransactionRecord) and self.to_tuple() == other.to_tuple()
+
+    __hash__ = None  # sengaja, lihat ItemRecord
+
+    def to_tuple(self):
+        return (self.id, self.date, self.total, self.payment_method, self.customer_name,
+                [item.to_tuple() for item in self.items])
+
+    def to_dict(self):
+        """Plain dict in the old transactions.json shape (e.g. for the outbox)"""
+        return {'id': self.id, 'items': [item.to_dict() for item in self.items], 'total': self.total,
+                'payment_method': self.payment_method, 'customer_name': self.customer_name,
+                'date': self.date}
+
+    @classmethod
+    def from_dict(cls, trans):
+        """Build from a dict (checkout, legacy backup or database row with Decimals)"""
+        if isinstance(trans, cls):
+            return trans
+        return cls(trans['id'], trans.get('date'), trans['total'], trans['payment_method'],
+                   trans.get('customer_name'),
+                   [item if isinstance(item, ItemRecord) else ItemRecord.from_dict(item)
+                    for item in trans.get('items') or ()])
+
+    def encode(self):
+        """One backup line: [id, date, total, method, customer, [[id, name, variant, price, qty], ...]]"""
+        return json.dumps([self.id, self.date, self.total, self.payment_method, self.customer_name,
+                           [item.to_tuple() for item in self.items]],
+                          separators=(',', ':'), ensure_ascii=False) + "\n"
+
+    @classmethod
+    def decode(cls, values):
+        transaction_id, date, total, method, customer, items = values
+        return cls(transaction_id, date, total, method, customer, [ItemRecord(*item) for item in items])
+
+
+def decode_line(line):
+    """Parse one backup line, compact array or old JSON object, into a TransactionRecord"""
+    values = json.loads(line)
+    if isinstance(values, list):
+        return TransactionRecord.decode(values)
+    return TransactionRecord.from_dict(values)
@@ -0,0 +1,92 @@
+# Kirim ulang transaksi dari file dead-letter TransactionWriter
+# (checkout_journal.dead.jsonl untuk web, outbox_journal.dead.jsonl untuk kasir)
+# ke database, misalnya setelah schema diperbaiki. Transaksi yang ID-nya sudah
+# ada dilewati, jadi aman dijalankan lebih dari sekali. Yang masih ditolak
+# database dikembalikan ke file dead-letter.
+#
+#   python replay_dead_letter.py
+#   python replay_dead_letter.py outbox_journal.dead.jsonl
+
+import argparse
+import json
+import os
+import sys
+
+from db_config import create_database, save_transactions_batch
+
+
+def read_dead_letters(path):
+    """Dead-letter records ({time, error, transaction}) in file order"""
+    records = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                continue  # baris terakhir bisa terpotong
+    return records
+
+
+def append_dead_letters(path, records):
+    with open(path, "a", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record, separators=(',', ':'), default=str) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def replay(db, path):
+    """Save every transaction in path; returns (newly saved, still failing).
+
+    The file is moved aside first, so a writer that dead-letters more
+    transactions meanwhile appends to a fresh file instead of losing them.
+    """
+    if not os.path.exists(path):
+        return 0, 0
+    replaying = path + ".replay"
+    if not os.path.exists(replaying):
+        os.replace(path, replaying)
+    saved = 0
+    failed = []
+    for record in read_dead_letters(replaying):
+        try:
+            saved += len(save_transactions_batch(db, [record['transaction']], raise_errors=True))
+        except Exception as e:
+            if db.is_retryable(e):
+                raise  # database tidak tersedia: sisa file tetap untuk run berikutnya
+            failed.append(dict(record, error=str(e)))
+    if failed:
+        append_dead_letters(path, failed)
+    os.remove(replaying)
+    return saved, len(failed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay dead-lettered transactions into the database")
+    parser.add_argument("paths", nargs="*", default=["checkout_journal.dead.jsonl"],
+                        help="File dead-letter (default checkout_journal.dead.jsonl)")
+    args = parser.parse_args()
+
+    db = create_database()
+    if not db.connect():
+        print("Tidak dapat terhubung ke database")
+        return 1
+    status = 0
+    try:
+        for path in args.paths:
+            try:
+                saved, failed = replay(db, path)
+            except Exception as e:
+                print(f"✗ {path}: database error, coba lagi nanti ({e})")
+                status = 1
+                continue
+            print(f"✓ {path}: {saved} transaksi disimpan, {failed} masih ditolak")
+            if failed:
+                status = 1
+    finally:
+        db.disconnect()
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,247 @@
+# Database SQLite lokal untuk outlet satu kasir (tanpa server MySQL)
+# Interface sama dengan db_config.Database, sehingga save_transaction,
+# get_all_transactions, get_transaction_stats dll. bisa dipakai tanpa diubah.
+# Pilih dengan KEDAI_DB_BACKEND=sqlite (lihat db_config.create_database).
+
+import re
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from functools import lru_cache
+
+from db_config import notify_query
+
+# Skema sama dengan database.sql, ditulis ulang untuk SQLite
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS transactions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    transaction_id VARCHAR(50) UNIQUE NOT NULL,
+    customer_name VARCHAR(100) DEFAULT 'Umum',
+    payment_method VARCHAR(20) NOT NULL,
+    subtotal DECIMAL(10, 2) NOT NULL,
+    tax DECIMAL(10, 2) NOT NULL,
+    total DECIMAL(10, 2) NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS idx_created_at ON transactions (created_at);
+CREATE INDEX IF NOT EXISTS idx_created_transaction ON transactions (created_at, transaction_id);
+
+CREATE TABLE IF NOT EXISTS transaction_items (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    transaction_id VARCHAR(50) NOT NULL REFERENCES transactions (transaction_id) ON DELETE CASCADE,
+    item_id INT NOT NULL,
+    item_name VARCHAR(100) NOT NULL,
+    variant VARCHAR(50) DEFAULT NULL,
+    price DECIMAL(10, 2) NOT NULL,
+    quantity INT NOT NULL,
+    subtotal DECIMAL(10, 2) NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_items_transaction_id ON transaction_items (transaction_id);
+
+CREATE TABLE IF NOT EXISTS daily_sales_summary (
+    sales_date DATE NOT NULL,
+    payment_method VARCHAR(20) NOT NULL,
+    transactions INT NOT NULL DEFAULT 0,
+    total DECIMAL(14, 2) NOT NULL DEFAULT 0,
+    PRIMARY KEY (sales_date, payment_method)
+);
+
+CREATE TABLE IF NOT EXISTS daily_item_summary (
+    sales_date DATE NOT NULL,
+    item_id INT NOT NULL,
+    variant VARCHAR(50) NOT NULL DEFAULT '',
+    item_name VARCHAR(100) NOT NULL,
+    quantity INT NOT NULL DEFAULT 0,
+    revenue DECIMAL(14, 2) NOT NULL DEFAULT 0,
+    PRIMARY KEY (sales_date, item_id, variant)
+);
+
+CREATE TABLE IF NOT EXISTS carts (
+    cart_id VARCHAR(64) PRIMARY KEY,
+    items TEXT NOT NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS checkout_idempotency (
+    idempotency_key VARCHAR(100) PRIMARY KEY,
+    status INT NOT NULL,
+    body BLOB NOT NULL,
+    created_at DOUBLE NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_idempotency_created_at ON checkout_idempotency (created_at);
+
+CREATE TABLE IF NOT EXISTS menu_items (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name VARCHAR(100) NOT NULL,
+    price DECIMAL(10, 2) NOT NULL,
+    image_path VARCHAR(255),
+    has_variant BOOLEAN DEFAULT FALSE,
+    variants TEXT,
+    is_active BOOLEAN DEFAULT TRUE,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+"""
+
+# Bagian query dalam tanda kutip (tidak diubah saat mengganti placeholder)
+QUOTED_RE = re.compile(r"""('[^']*'|"[^"]*"|`[^`]*`)""")
+# Format DATE_FORMAT MySQL -> strftime
+DATE_FORMAT_CODES = {'%Y': '%Y', '%m': '%m', '%d': '%d', '%H': '%H', '%i': '%M', '%s': '%S', '%T': '%H:%M:%S'}
+
+
+@lru_cache(maxsize=256)
+def translate(query):
+    """Convert a db_config query (MySQL %s placeholders) for sqlite3"""
+    # %s di luar tanda kutip -> ? (placeholder SQLite)
+    parts = QUOTED_RE.split(query)
+    return "".join(part if i % 2 else part.replace("%s", "?") for i, part in enumerate(parts))
+
+
+def date_format(value, fmt):
+    """DATE_FORMAT(value, fmt) for SQLite, for the MySQL codes used in db_config"""
+    if value is None:
+        return None
+    value = str(value)
+    date = datetime.strptime(value[:19], '%Y-%m-%d %H:%M:%S' if len(value) > 10 else '%Y-%m-%d')
+    return date.strftime(re.sub(r"%[a-zA-Z]", lambda m: DATE_FORMAT_CODES.get(m.group(0), m.group(0)), fmt))
+
+
+class SQLiteDatabase:
+    dialect = "sqlite"
+
+    def __init__(self, path="kedai_hauna.db"):
+        """Initialize database settings"""
+        self.path = path
+        self._local = threading.local()
+
+    def connect(self):
+        """Open the database file and create the schema if needed"""
+        try:
+            conn = self._connection()
+            conn.executescript(SCHEMA)
+            conn.commit()
+            return True
+        except sqlite3.Error as e:
+            print(f"Error opening SQLite database: {e}")
+            return False
+
+    def _connection(self):
+        # Satu koneksi per thread, seperti SQLiteCartStore
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, cached_statements=256)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            conn.execute("PRAGMA temp_store=MEMORY")
+            conn.execute("PRAGMA cache_size=-16000")  # 16 MB
+            conn.create_function("DATE_FORMAT", 2, date_format, deterministic=True)
+            self._local.conn = conn
+        return conn
+
+    def disconnect(self):
+        """Close this thread's connection"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def pool_stats(self):
+        """SQLite has no pool; kept for interface compatibility"""
+        return {}
+
+    def is_retryable(self, e):
+        """True if retrying later may succeed (database locked, I/O), not a data error"""
+        return isinstance(e, sqlite3.OperationalError)
+
+    @contextmanager
+    def acquire(self):
+        """Yield this thread's connection for several statements"""
+        yield self._connection()
+
+    @contextmanager
+    def cursor(self, conn, query, dictionary=False, prepared=False):
+        """Yield (cursor, statement); sqlite3 caches prepared statements itself"""
+        cursor = conn.cursor()
+        try:
+            yield cursor, translate(query)
+        finally:
+            cursor.close()
+
+    def execute_query(self, query, params=None, prepared=False, raise_errors=False):
+        """Execute INSERT, UPDATE, DELETE queries (errors are printed, or raised with raise_errors)"""
+        start = time.perf_counter()
+        rows = 0
+        error = None
+        conn = self._connection()
+        try:
+            cursor = conn.execute(translate(query), params or ())
+            conn.commit()
+            rows = cursor.rowcount
+            return cursor.lastrowid
+        except sqlite3.Error as e:
+            error = e
+            print(f"Error executing query: {e}")
+            conn.rollback()
+            if raise_errors:
+                raise
+            return None
+        finally:
+            notify_query('execute', query, time.perf_counter() - start, rows, params, error)
+
+    def fetch_all(self, query, params=None, prepared=False):
+        """Execute SELECT query and return all results"""
+        start = time.perf_counter()
+        rows = 0
+        error = None
+        try:
+            result = [dict(row) for row in self._connection().execute(translate(query), params or ())]
+            rows = len(result)
+            return result
+        except sqlite3.Error as e:
+            error = e
+            print(f"Error fetching data: {e}")
+            return []
+        finally:
+            notify_query('fetch_all', query, time.perf_counter() - start, rows, params, error)
+
+    def fetch_one(self, query, params=None, prepared=False, raise_errors=False):
+        """Execute SELECT query and return one result (errors are printed, or raised with raise_errors)"""
+        start = time.perf_counter()
+        rows = 0
+        error = None
+        try:
+            row = self._connection().execute(translate(query), params or ()).fetchone()
+            rows = 1 if row else 0
+            return dict(row) if row else None
+        except sqlite3.Error as e:
+            error = e
+            print(f"Error fetching data: {e}")
+            if raise_errors:
+                raise
+            return None
+        finally:
+            notify_query('fetch_one', query, time.perf_counter() - start, rows, params, error)
+
+    def iter_rows(self, query, params=None, batch_size=500):
+        """Yield rows as dicts, read batch_size at a time"""
+        start = time.perf_counter()
+        rows = 0
+        error = None
+        cursor = self._connection().execute(translate(query), params or ())
+        try:
+            while True:
+                batch = cursor.fetchmany(batch_size)
+                if not batch:
+                    break
+                rows += len(batch)
+                for row in batch:
+                    yield dict(row)
+        except sqlite3.Error as e:
+            error = e
+            raise
+        finally:
+            cursor.close()
+            notify_query('iter', query, time.perf_counter() - start, rows, params, error)
@@ -0,0 +1,19 @@
+# Semua penyimpanan app ke folder sementara (SQLite, tanpa MySQL), diset
+# sebelum app.py / asgi_app.py diimpor karena keduanya membaca env saat impor.
+
+import os
+import sys
+import tempfile
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+WORKDIR = tempfile.mkdtemp(prefix="kedai-tests-")
+os.environ.update({
+    "KEDAI_DB_BACKEND": "sqlite",
+    "KEDAI_SQLITE_DB": os.path.join(WORKDIR, "kedai_hauna.db"),
+    "KEDAI_IDEMPOTENCY_DB": os.path.join(WORKDIR, "idempotency.db"),
+    "KEDAI_CART_DB": os.path.join(WORKDIR, "carts.db"),
+    "KEDAI_CHECKOUT_JOURNAL": os.path.join(WORKDIR, "checkout_journal.jsonl"),
+    "KEDAI_SLOW_QUERY_LOG": os.path.join(WORKDIR, "slow_queries.log"),
+})
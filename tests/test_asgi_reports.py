@@ -0,0 +1,71 @@
+# Route laporan ASGI dengan KEDAI_DB_BACKEND=sqlite harus sama dengan WSGI
+
+import asyncio
+
+import pytest
+
+import app as wsgi
+import asgi_app
+from db_config import create_database, save_transactions_batch
+
+
+@pytest.fixture(scope="module")
+def sales():
+    db = create_database()
+    assert db.connect()
+    transactions = [
+        {'id': "T-ASGI-1", 'customer_name': 'Umum', 'payment_method': 'cash', 'total': 25300,
+         'date': '2025-03-01 10:00:00',
+         'items': [{'id': 1, 'name': 'Bakso Malang', 'price': 23000, 'quantity': 1, 'variant': ''}]},
+        {'id': "T-ASGI-2", 'customer_name': 'Umum', 'payment_method': 'qris', 'total': 13200,
+         'date': '2025-03-02 11:00:00',
+         'items': [{'id': 5, 'name': 'Tea (Dingin)', 'price': 6000, 'quantity': 2, 'variant': 'Dingin'}]},
+    ]
+    assert save_transactions_batch(db, transactions, raise_errors=True)
+    db.disconnect()
+    return transactions
+
+
+async def asgi_get(paths):
+    async with asgi_app.app.test_app() as test_app:
+        client = test_app.test_client()
+        results = {}
+        for path in paths:
+            response = await client.get(path)
+            results[path] = (response.status_code, await response.get_json())
+        return results
+
+
+PATHS = [
+    '/api/stats',
+    '/api/transactions?limit=1',
+    '/api/transactions?payment_method=qris',
+    '/api/reports/summary?date_from=2025-03-01&date_to=2025-03-31',
+]
+
+
+def test_asgi_reports_on_sqlite(sales):
+    results = asyncio.run(asgi_get(PATHS))
+    for path in PATHS:
+        assert results[path][0] == 200, (path, results[path])
+
+    stats = results['/api/stats'][1]
+    assert stats['total_transactions'] == 2 and isinstance(stats['total_transactions'], int)
+    assert stats['total_income'] == 38500
+
+    page = results['/api/transactions?limit=1'][1]
+    assert [t['id'] for t in page['transactions']] == ["T-ASGI-2"]
+    assert page['next_cursor']
+    qris = results['/api/transactions?payment_method=qris'][1]
+    assert [item['name'] for item in qris['transactions'][0]['items']] == ['Tea (Dingin)']
+
+    summary = results['/api/reports/summary?date_from=2025-03-01&date_to=2025-03-31'][1]
+    assert all(summary.values()), summary
+
+
+def test_asgi_reports_match_wsgi(sales):
+    results = asyncio.run(asgi_get(PATHS))
+    client = wsgi.app.test_client()
+    for path in PATHS:
+        response = client.get(path)
+        assert (response.status_code, response.get_json()) == results[path], path
@@ -0,0 +1,53 @@
+# /api/cart/batch: body yang bentuknya salah harus 400, bukan 500
+
+import asyncio
+
+import pytest
+
+import app as wsgi
+import asgi_app
+
+MALFORMED = [
+    [{'op': 'add', 'id': 1}],             # body berupa list
+    {'operations': {'op': 'add', 'id': 1}},  # operations bukan list
+    {'operations': 'add'},
+    {'operations': [1]},                  # operasi bukan objek
+    {'operations': [{'op': 'add', 'id': 1}, ['clear']]},
+]
+
+
+@pytest.mark.parametrize("payload", MALFORMED)
+def test_wsgi_batch_rejects_malformed(payload):
+    client = wsgi.app.test_client()
+    client.post('/api/cart/batch', json={'operations': [{'op': 'add', 'id': 1}]})
+    response = client.post('/api/cart/batch', json=payload)
+    assert response.status_code == 400
+    assert 'error' in response.get_json()
+    # Atomik: keranjang tidak berubah
+    assert [item['quantity'] for item in client.get('/api/cart').get_json()] == [1]
+
+
+@pytest.mark.parametrize("payload", MALFORMED)
+def test_asgi_batch_rejects_malformed(payload):
+    async def call():
+        client = asgi_app.app.test_client()
+        await client.post('/api/cart/batch', json={'operations': [{'op': 'add', 'id': 1}]})
+        response = await client.post('/api/cart/batch', json=payload)
+        cart = await (await client.get('/api/cart')).get_json()
+        return response.status_code, await response.get_json(), cart
+
+    status, body, cart = asyncio.run(call())
+    assert status == 400
+    assert 'error' in body
+    assert [item['quantity'] for item in cart] == [1]
+
+
+def test_batch_valid_operations():
+    client = wsgi.app.test_client()
+    response = client.post('/api/cart/batch', json={'operations': [
+        {'op': 'add', 'id': 1, 'quantity': 2},
+        {'op': 'add', 'id': 5, 'variant': 'Dingin'},
+        {'op': 'remove', 'item_key': '1'},
+    ]})
+    assert response.status_code == 200
+    assert [item['item_key'] for item in response.get_json()['cart']] == ['5_Dingin']
@@ -0,0 +1,35 @@
+# Cart store: keranjang kadaluarsa tidak dimuat, error database tidak ditelan
+
+import os
+import sqlite3
+
+import pytest
+
+from cart_store import SQLiteCartStore, MySQLCartStore
+from conftest import WORKDIR
+from sqlite_db import SQLiteDatabase
+
+ITEMS = {'1': {'id': 1, 'item_key': '1', 'name': 'Bakso Malang', 'price': 23000, 'quantity': 1, 'variant': ''}}
+
+
+def test_sqlite_load_skips_expired_cart():
+    store = SQLiteCartStore(os.path.join(WORKDIR, "carts-ttl.db"), ttl=60)
+    store.save("fresh", ITEMS)
+    store.save("stale", ITEMS)
+    conn = store._connection()
+    conn.execute("UPDATE carts SET updated_at = datetime('now', '-120 seconds') WHERE cart_id = 'stale'")
+    conn.commit()
+
+    assert store.load("fresh") == ITEMS
+    # Belum disapu expire(), tapi sudah lewat ttl
+    assert store.load("stale") == {}
+
+
+def test_database_cart_store_raises_on_db_error():
+    # Tabel carts tidak ada: load/save harus gagal, bukan keranjang kosong / sukses palsu
+    db = SQLiteDatabase(os.path.join(WORKDIR, "no-carts.db"))
+    store = MySQLCartStore(db, ttl=0)
+    with pytest.raises(sqlite3.Error):
+        store.load("cart")
+    with pytest.raises(sqlite3.Error):
+        store.save("cart", ITEMS)
@@ -0,0 +1,56 @@
+# Idempotency-Key berlaku per sesi: sesi lain dengan key sama tidak boleh
+# menerima response checkout (dan transaksi) milik pelanggan lain
+
+import asyncio
+import uuid
+
+import app as wsgi
+import asgi_app
+
+
+def wsgi_checkout(client, key):
+    client.post('/api/cart/add', json={'id': 1})
+    return client.post('/api/checkout', json={'payment_method': 'cash'}, headers={'Idempotency-Key': key})
+
+
+def test_wsgi_same_key_two_sessions():
+    key = uuid.uuid4().hex
+    first, second = wsgi.app.test_client(), wsgi.app.test_client()
+
+    a = wsgi_checkout(first, key)
+    b = wsgi_checkout(second, key)
+    assert a.status_code == b.status_code == 200
+    assert 'Idempotent-Replayed' not in b.headers
+    assert a.get_json()['transaction']['id'] != b.get_json()['transaction']['id']
+
+    # Retry di sesi yang sama tetap mendapat response tersimpan
+    retry = first.post('/api/checkout', json={'payment_method': 'cash'}, headers={'Idempotency-Key': key})
+    assert retry.headers['Idempotent-Replayed'] == 'true'
+    assert retry.get_json()['transaction']['id'] == a.get_json()['transaction']['id']
+
+
+def test_asgi_same_key_two_sessions():
+    key = uuid.uuid4().hex
+
+    async def checkout(client):
+        await client.post('/api/cart/add', json={'id': 1})
+        response = await client.post('/api/checkout', json={'payment_method': 'cash'},
+                                     headers={'Idempotency-Key': key})
+        return response.status_code, response.headers, await response.get_json()
+
+    async def run():
+        first, second = asgi_app.app.test_client(), asgi_app.app.test_client()
+        return await checkout(first), await checkout(second), await checkout(first)
+
+    a, b, retry = asyncio.run(run())
+    assert a[0] == b[0] == 200
+    assert 'Idempotent-Replayed' not in b[1]
+    assert a[2]['transaction']['id'] != b[2]['transaction']['id']
+    assert retry[1]['Idempotent-Replayed'] == 'true'
+    assert retry[2]['transaction']['id'] == a[2]['transaction']['id']
+
+
+def test_overlong_key_rejected():
+    client = wsgi.app.test_client()
+    response = wsgi_checkout(client, "k" * (wsgi.IDEMPOTENCY_KEY_MAX_LENGTH + 1))
+    assert response.status_code == 400
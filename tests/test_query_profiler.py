@@ -0,0 +1,24 @@
+# Log query lambat tidak boleh memuat nilai baris (params maupun pesan error)
+
+import json
+import os
+
+from mysql.connector import errors
+
+from conftest import WORKDIR
+from query_profiler import QueryProfiler
+
+
+def test_slow_log_redacts_params_and_error():
+    path = os.path.join(WORKDIR, "slow-redact.log")
+    profiler = QueryProfiler(slow_log_path=path, slow_threshold=10)
+    error = errors.IntegrityError("Duplicate entry 'Budi Santoso' for key 'name'", errno=1062, sqlstate='23000')
+    profiler.observe('execute', "INSERT INTO customers (name) VALUES (%s)", 0.001, 0,
+                     ('Budi Santoso',), error)
+
+    with open(path, encoding="utf-8") as f:
+        line = f.read()
+    assert 'Budi' not in line
+    entry = json.loads(line)
+    assert entry['params'] == ['str']
+    assert entry['error'] == {'type': 'IntegrityError', 'errno': 1062, 'sqlstate': '23000'}
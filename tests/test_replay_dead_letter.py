@@ -0,0 +1,35 @@
+# replay_dead_letter.py: transaksi yang berhasil keluar dari file, yang ditolak tetap
+
+import json
+import os
+
+from conftest import WORKDIR
+from db_config import create_database
+from replay_dead_letter import replay, read_dead_letters
+
+
+def dead_letter(path, transactions):
+    with open(path, "w", encoding="utf-8") as f:
+        for transaction in transactions:
+            f.write(json.dumps({'time': '2025-03-01 10:00:00', 'error': 'x', 'transaction': transaction}) + "\n")
+
+
+def test_replay_saves_and_keeps_rejected():
+    db = create_database()
+    assert db.connect()
+    path = os.path.join(WORKDIR, "replay.dead.jsonl")
+    good = {'id': "T-REPLAY-1", 'customer_name': 'Umum', 'payment_method': 'cash', 'total': 6600,
+            'items': [{'id': 5, 'name': 'Tea (Hangat)', 'price': 6000, 'quantity': 1, 'variant': 'Hangat'}]}
+    bad = {'id': "T-REPLAY-2", 'customer_name': 'Umum', 'payment_method': 'cash', 'total': 6600,
+           'items': [{'id': 5, 'name': 'Tea'}]}
+    dead_letter(path, [good, bad])
+
+    assert replay(db, path) == (1, 1)
+    assert db.fetch_one("SELECT transaction_id FROM transactions WHERE transaction_id = %s", ("T-REPLAY-1",))
+    assert [r['transaction']['id'] for r in read_dead_letters(path)] == ["T-REPLAY-2"]
+    assert not os.path.exists(path + ".replay")
+
+    # Sudah tersimpan: replay ulang tidak membuat transaksi ganda
+    dead_letter(path, [good])
+    assert replay(db, path) == (0, 0)
+    db.disconnect()
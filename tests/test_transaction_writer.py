@@ -0,0 +1,34 @@
+# TransactionWriter: statistik 'written' hanya menghitung transaksi yang benar-benar disimpan
+
+import os
+
+from conftest import WORKDIR
+from db_config import create_database, save_transactions_batch
+from transaction_writer import TransactionWriter
+
+
+def transaction(transaction_id):
+    return {'id': transaction_id, 'customer_name': 'Umum', 'payment_method': 'cash', 'total': 6600,
+            'items': [{'id': 5, 'name': 'Tea (Dingin)', 'price': 6000, 'quantity': 1, 'variant': 'Dingin'}]}
+
+
+def connect_db():
+    db = create_database()
+    return db if db.connect() else None
+
+
+def test_written_skips_already_saved():
+    db = connect_db()
+    # Sudah tersimpan di percobaan sebelumnya (mis. retry setelah error sementara)
+    save_transactions_batch(db, [transaction("T-WRITER-1")], raise_errors=True)
+
+    writer = TransactionWriter(connect_db, journal_path=os.path.join(WORKDIR, "writer.jsonl"),
+                               flush_interval=0.05)
+    writer.start()
+    writer.submit(transaction("T-WRITER-1"))
+    writer.submit(transaction("T-WRITER-2"))
+    writer.stop()
+
+    metrics = writer.metrics()
+    assert metrics['pending'] == 0
+    assert metrics['written'] == 1
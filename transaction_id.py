@@ -0,0 +1,96 @@
+# Generator ID transaksi Kedai Hauna
+# Format: YYYYMMDDHHMMSS-<terminal>.<pid>-<urutan>, contoh 20251129235723-K1.3f2-0001
+# Urut berdasarkan waktu, unik antar terminal/worker, tanpa query ke database.
+
+import hashlib
+import os
+import socket
+import threading
+import time
+import uuid
+from datetime import datetime
+
+MAX_SEQUENCE = 9999
+
+_BASE36 = "0123456789abcdefghijklmnopqrstuvwxyz"
+
+
+def _base36(number):
+    digits = ""
+    while True:
+        number, rem = divmod(number, 36)
+        digits = _BASE36[rem] + digits
+        if number == 0:
+            return digits
+
+
+def default_node_id():
+    """Node id for this process: terminal (KEDAI_TERMINAL_ID or host hash) + '.' + pid.
+
+    Without KEDAI_TERMINAL_ID the terminal part hashes the hostname and the
+    MAC address (40 bit), so cloned tills with the same hostname still
+    differ; set KEDAI_TERMINAL_ID to get short, readable ids.
+    """
+    terminal = os.environ.get('KEDAI_TERMINAL_ID')
+    if not terminal:
+        host = f"{socket.gethostname()}/{uuid.getnode():012x}"
+        terminal = hashlib.sha1(host.encode('utf-8')).hexdigest()[:10]
+    # PID membedakan worker yang berjalan bersamaan di terminal yang sama;
+    # pemisah '.' supaya terminal "K1" + pid "12" tidak sama dengan "K11" + "2"
+    return f"{terminal}.{_base36(os.getpid())}"
+
+
+class TransactionIdGenerator:
+    """Monotonic, time-sortable transaction IDs.
+
+    Each ID is the local second, a node id (terminal or worker) and a
+    per-second sequence. When the sequence runs out the generator waits
+    for the next second, and a clock that jumps backwards is ignored.
+    """
+
+    def __init__(self, node_id=None):
+        self._fixed_node = node_id
+        self._node = node_id or default_node_id()
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+        self._last_second = 0
+        self._sequence = 0
+
+    @property
+    def node_id(self):
+        return self._node
+
+    def next_id(self):
+        """Return the next transaction ID"""
+        with self._lock:
+            if os.getpid() != self._pid:
+                # Proses hasil fork (worker baru) butuh node id sendiri
+                self._pid = os.getpid()
+                self._node = self._fixed_node or default_node_id()
+                self._last_second = 0
+
+            second = max(int(time.time()), self._last_second)
+            if second == self._last_second:
+                self._sequence += 1
+                if self._sequence > MAX_SEQUENCE:
+                    if int(time.time()) < self._last_second:
+                        # Jam mundur: pinjam detik berikutnya daripada menunggu lama
+                        second = self._last_second + 1
+                    while second <= self._last_second:
+                        time.sleep(0.001)
+                        second = int(time.time())
+                    self._sequence = 1
+            else:
+                self._sequence = 1
+            self._last_second = second
+
+            stamp = datetime.fromtimestamp(second).strftime('%Y%m%d%H%M%S')
+            return f"{stamp}-{self._node}-{self._sequence:04d}"
+
+
+_default_generator = TransactionIdGenerator()
+
+
+def new_transaction_id():
+    """Return a new transaction ID from the process-wide generator"""
+    return _default_generator.next_id()
@@ -0,0 +1,304 @@
+# Write-behind untuk transaksi checkout Kedai Hauna
+# Checkout ditulis ke journal lokal (append-only + fsync), lalu thread
+# background menyimpannya ke MySQL secara batch. Dipakai web (app.py) dan
+# sebagai outbox offline kasir Tkinter (maxsize=0: antrian tanpa batas,
+# transaksi menunggu di journal sampai database tersedia lagi).
+# Hanya error koneksi/sementara yang dicoba ulang; transaksi yang ditolak
+# database (data tidak valid) dipindah ke file dead-letter supaya tidak
+# memblokir antrian.
+# Setiap proses (worker gunicorn dll.) punya journal sendiri:
+# checkout_journal.<pid>.jsonl, dikunci selama proses hidup. Journal proses
+# yang sudah mati diambil alih oleh proses lain saat start().
+
+import glob
+import json
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+from db_config import save_transactions_batch
+
+
+class QueueFull(Exception):
+    """Raised when the write-behind queue stays full past the enqueue timeout"""
+
+
+def _try_lock(path):
+    """Take an exclusive lock on path without waiting; return the open file, or None if held"""
+    f = open(path, "a+")
+    try:
+        if fcntl:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+        return f
+    except OSError:
+        f.close()
+        return None
+
+
+class TransactionWriter:
+    """Background writer that drains a bounded queue into the database.
+
+    submit() appends the transaction to a local journal and fsyncs it
+    before returning, so a checkout is durable as soon as it is queued.
+    The worker thread writes batches with save_transactions_batch() and
+    marks them committed in the journal. Uncommitted entries are
+    re-queued on start(). A batch the database rejects is split until the
+    failing transaction is isolated; that one goes to dead_letter_path.
+
+    The journal actually written is journal_path with the process id
+    inserted (checkout_journal.<pid>.jsonl), so workers sharing a directory
+    never truncate each other's entries.
+    """
+
+    def __init__(self, connect_db, journal_path="checkout_journal.jsonl",
+                 maxsize=1000, batch_size=50, flush_interval=0.5,
+                 enqueue_timeout=2.0, retry_interval=5.0, dead_letter_path=None):
+        self.connect_db = connect_db
+        base, ext = os.path.splitext(journal_path)
+        self.base_journal_path = journal_path
+        self.journal_path = f"{base}.{os.getpid()}{ext}"
+        self.dead_letter_path = dead_letter_path or f"{base}.dead{ext}"
+        self._journal_file_lock = None
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.enqueue_timeout = enqueue_timeout
+        self.retry_interval = retry_interval
+
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._journal_lock = threading.Lock()
+        self._pending_ids = set()
+        self._stop = threading.Event()
+        self._thread = None
+        self._db = None
+
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            'enqueued': 0,
+            'written': 0,
+            'rejected': 0,
+            'batches': 0,
+            'failed_flushes': 0,
+            'dead_lettered': 0,
+            'last_flush_ms': 0.0,
+            'max_flush_ms': 0.0,
+            'total_flush_ms': 0.0,
+        }
+
+    # ----- journal -----
+
+    def _append_journal(self, record):
+        line = json.dumps(record, separators=(',', ':'), default=str) + "\n"
+        with open(self.journal_path, "a", encoding="utf-8") as f:
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _read_pending(self, path=None):
+        """Return journaled transactions that were never marked committed"""
+        path = path or self.journal_path
+        if not os.path.exists(path):
+            return []
+        pending = {}
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # Baris terakhir bisa terpotong jika proses mati saat menulis
+                    continue
+                if 'committed' in record:
+                    for transaction_id in record['committed']:
+                        pending.pop(transaction_id, None)
+                else:
+                    pending[str(record['id'])] = record
+        return list(pending.values())
+
+    def _mark_committed(self, transaction_ids):
+        with self._journal_lock:
+            self._pending_ids.difference_update(transaction_ids)
+            if self._pending_ids:
+                self._append_journal({'committed': transaction_ids})
+            else:
+                # Semua sudah masuk DB, journal bisa dikosongkan
+                open(self.journal_path, "w").close()
+
+    def _orphan_journals(self):
+        """Journals of other processes (and the old shared journal) in the same directory"""
+        base, ext = os.path.splitext(self.base_journal_path)
+        paths = [self.base_journal_path] if os.path.exists(self.base_journal_path) else []
+        for path in glob.glob(f"{glob.escape(base)}.*{ext}"):
+            middle = path[len(base) + 1:len(path) - len(ext)]
+            if middle.isdigit() and path != self.journal_path:
+                paths.append(path)
+        return paths
+
+    def _adopt_orphans(self):
+        """Move pending entries of journals whose process is gone into this journal"""
+        for path in self._orphan_journals():
+            lock = _try_lock(path + ".lock")
+            if lock is None:
+                continue  # proses pemiliknya masih hidup
+            try:
+                pending = self._read_pending(path)
+                with self._journal_lock:
+                    for transaction in pending:
+                        self._append_journal(transaction)
+                if os.path.exists(path):
+                    os.remove(path)
+                if pending:
+                    print(f"✓ {len(pending)} transaksi dari {path} diambil alih")
+            finally:
+                lock.close()
+                try:
+                    os.remove(path + ".lock")
+                except OSError:
+                    pass
+
+    # ----- public API -----
+
+    def start(self):
+        """Lock this process's journal, adopt orphaned journals, re-queue
+        uncommitted entries and start the worker thread"""
+        self._journal_file_lock = _try_lock(self.journal_path + ".lock")
+        self._adopt_orphans()
+        for transaction in self._read_pending():
+            self._pending_ids.add(str(transaction['id']))
+            self._queue.put(transaction)
+        self._thread = threading.Thread(target=self._run, name="transaction-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=10):
+        """Flush what is queued and stop the worker thread"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def submit(self, transaction):
+        """Durably queue a transaction, raising QueueFull under backpressure"""
+        with self._journal_lock:
+            self._append_journal(transaction)
+            self._pending_ids.add(str(transaction['id']))
+        try:
+            self._queue.put(transaction, timeout=self.enqueue_timeout)
+        except queue.Full:
+            # Batalkan entri journal; keranjang tidak dikosongkan jadi klien bisa coba lagi
+            self._mark_committed([str(transaction['id'])])
+            with self._stats_lock:
+                self._stats['rejected'] += 1
+            raise QueueFull("Antrian penyimpanan transaksi penuh")
+        with self._stats_lock:
+            self._stats['enqueued'] += 1
+
+    def metrics(self):
+        """Return queue depth and flush latency statistics"""
+        with self._stats_lock:
+            stats = dict(self._stats)
+        total_flush_ms = stats.pop('total_flush_ms')
+        stats['avg_flush_ms'] = total_flush_ms / stats['batches'] if stats['batches'] else 0.0
+        stats['queue_depth'] = self._queue.qsize()
+        stats['queue_capacity'] = self._queue.maxsize
+        stats['pending'] = len(self._pending_ids)
+        return stats
+
+    def pool_stats(self):
+        """Return connection pool statistics of the writer's database"""
+        db = self._db
+        return db.pool_stats() if db is not None else {}
+
+    # ----- worker -----
+
+    def _next_batch(self):
+        try:
+            batch = [self._queue.get(timeout=self.flush_interval)]
+        except queue.Empty:
+            return []
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _flush(self, batch):
+        """Write one batch, retrying connection errors until it succeeds or the writer stops"""
+        while True:
+            if self._db is None:
+                self._db = self.connect_db()
+            if self._db is not None:
+                try:
+                    self._write(batch)
+                    return True
+                except Exception as e:
+                    print(f"Error flushing checkout batch, retrying: {e}")
+                    # Koneksi mungkin putus, buat ulang di percobaan berikutnya
+                    self._db.disconnect()
+                    self._db = None
+            with self._stats_lock:
+                self._stats['failed_flushes'] += 1
+            if self._stop.wait(self.retry_interval):
+                return False
+
+    def _write(self, batch):
+        """Save a batch; raises only errors worth retrying.
+
+        A data error splits the batch in halves (already saved transactions
+        are skipped by ID on the next attempt), down to the single
+        transaction that fails, which is moved to the dead-letter file.
+        """
+        start = time.perf_counter()
+        try:
+            saved = save_transactions_batch(self._db, batch, raise_errors=True)
+        except Exception as e:
+            if self._db.is_retryable(e):
+                raise
+            if len(batch) == 1:
+                self._dead_letter(batch[0], e)
+                return
+            middle = len(batch) // 2
+            self._write(batch[:middle])
+            self._write(batch[middle:])
+            return
+        elapsed = (time.perf_counter() - start) * 1000
+        with self._stats_lock:
+            # Hanya yang benar-benar disimpan; ID yang sudah ada (retry) tidak dihitung lagi
+            self._stats['written'] += len(saved)
+            self._stats['batches'] += 1
+            self._stats['last_flush_ms'] = elapsed
+            self._stats['max_flush_ms'] = max(self._stats['max_flush_ms'], elapsed)
+            self._stats['total_flush_ms'] += elapsed
+        self._mark_committed([str(t['id']) for t in batch])
+
+    def _dead_letter(self, transaction, error):
+        """Move a transaction the database rejects out of the queue and journal"""
+        print(f"Transaction {transaction.get('id')} rejected by database, moved to {self.dead_letter_path}: {error}")
+        record = {'time': datetime.now().strftime('%Y-%m-%d %H:%M:%S'), 'error': str(error),
+                  'transaction': transaction}
+        with self._journal_lock:
+            line = json.dumps(record, separators=(',', ':'), default=str) + "\n"
+            with open(self.dead_letter_path, "a", encoding="utf-8") as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+        with self._stats_lock:
+            self._stats['dead_lettered'] += 1
+        self._mark_committed([str(transaction['id'])])
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if batch:
+                if not self._flush(batch):
+                    return
+            elif self._stop.is_set():
+                return